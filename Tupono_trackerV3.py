@@ -1,186 +1,50 @@
+import io
 import json
+import multiprocessing
 import os
+import queue
 import sys
+import time
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
-from datetime import datetime, timedelta
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import matplotlib.pyplot as plt
+from datetime import datetime
+from itertools import islice
 from PIL import Image, ImageTk
 from tkinter import filedialog
-from fpdf import FPDF
-import tempfile
-import pandas as pd  # For crosstab in program-by-gender chart
+import threading
+from tupono.model import (
+    ADVOCACY_TYPES, KAIMAHI_LIST, Participant, ParticipantCollection,
+    manifest_list_rows, snapshot_columns, snapshot_list_rows, snapshot_participants, snapshot_strings,
+)
+from tupono.reports import (
+    SCREEN_DPI, STATISTICS_CHARTS, ChartCache, ReportExport, chart_has_data, write_batch_reports, write_pdf_report,
+)
+from tupono.repository import ParticipantRepository, ValidationError
+from tupono.schema import SCHEMA_VERSION
+from tupono.snapshot import SnapshotCache
+from tupono.stats import group_stats
+from tupono.storage import JsonArrayReader, SaveWorker, default_data_path, open_storage
+
+# Participants list: search this long after the last keystroke, then fill the
+# Listbox this many rows per event-loop turn
+SEARCH_DEBOUNCE_MS = 150
+LIST_RENDER_CHUNK = 500
 
-# Define advocacy types and their typical/max durations in weeks
-ADVOCACY_TYPES = ["Family harm", "Sexual harm", "Mental health", "Oranga Tamariki", "MSD", "Housing"]
-
-# List of Kaimahi
-KAIMAHI_LIST = [
-    "Shonny", "Mervyn", "Te rangi", "Ben", "Piwi", "Arianna", "Melissa", "Tipene Mary"
-]
-# Durations: Min 6 months (~26 weeks), Max 4 years (~208 weeks)
-ADVOCACY_MIN_WEEKS = 26
-ADVOCACY_MAX_WEEKS = 208
 
 JSON_PATH = os.path.join(os.path.dirname(__file__), "participants.json")
 print(f"JSON_PATH resolved to: {JSON_PATH}")
 print(f"File exists: {os.path.exists(JSON_PATH)}")
-
-class Participant:
-    def __init__(self, name, age, gender, location, iwi, hapu, signup_date, advocacy=None, kaimahi=None):
-        self.name = name
-        self.age = age
-        self.gender = gender
-        self.location = location
-        self.iwi = iwi
-        self.hapu = hapu
-        self.advocacy = advocacy if isinstance(advocacy, list) else []  # Always a list
-        self.kaimahi = kaimahi if kaimahi in KAIMAHI_LIST else None
-        self.signup_date = datetime.strptime(signup_date, "%Y-%m-%d").date()
-        self.phase = "red"  # red, orange, green, completed
-        self.weeks_completed = 0
-        self.programs = []  # Now supports multiple programs
-        self.weekly_progress = []  # For the 26-week program
-
-        # === Advocacy Tracking Attributes ===
-        self.advocacy_phase = "active" if self.advocacy else "none"  # 'none', 'active', 'completed'
-        self.advocacy_weeks_completed = 0
-        self.advocacy_weekly_progress = []  # For the long-term advocacy (up to 208 weeks)
-
-        self.red_phase_assessments = {
-            1: {"score": 0, "notes": ""},
-            2: {"score": 0, "notes": ""},
-            3: {"score": 0, "notes": ""},
-            4: {"score": 0, "notes": ""},
-            5: {"score": 0, "notes": ""},
-            6: {"score": 0, "notes": ""}
-        }
-
-    def update_progress(self):
-        today = datetime.now().date()
-        weeks_since_signup = (today - self.signup_date).days // 7
-        if weeks_since_signup < 0:
-            return  # hasn't started yet
-
-        # --- Update Standard 26-Week Program Progress ---
-        if self.phase == "red":
-            total_red_weeks = 6
-            if weeks_since_signup >= total_red_weeks:
-                self.phase = "orange"
-                self.weeks_completed = 0
-            else:
-                self.weeks_completed = weeks_since_signup
-        elif self.phase == "orange":
-            total_orange_weeks = 8
-            if weeks_since_signup >= 6 + total_orange_weeks:
-                self.phase = "green"
-                self.weeks_completed = 0
-            else:
-                self.weeks_completed = weeks_since_signup - 6
-        elif self.phase == "green":
-            total_green_weeks = 12
-            green_start_week = 6 + 8  # week 14
-            if weeks_since_signup >= green_start_week + total_green_weeks:
-                self.phase = "completed"
-                self.weeks_completed = 12
-            else:
-                self.weeks_completed = weeks_since_signup - green_start_week
-
-        # Update weekly_progress for full 26-week journey
-        total_weeks = 26
-        self.weekly_progress = []
-        for week in range(total_weeks):
-            if week < weeks_since_signup:
-                if week < 6:
-                    self.weekly_progress.append("red")
-                elif week < 14:
-                    self.weekly_progress.append("orange")
-                else:
-                    self.weekly_progress.append("green")
-            else:
-                self.weekly_progress.append("")
-
-        # --- Update Long-Term Advocacy Progress (if applicable) ---
-        if self.advocacy and len(self.advocacy) > 0:
-            self.advocacy_phase = "active"
-            self.advocacy_weeks_completed = min(weeks_since_signup, ADVOCACY_MAX_WEEKS)
-
-            # Build the advocacy progress bar (up to max duration)
-            self.advocacy_weekly_progress = []
-            for week in range(ADVOCACY_MAX_WEEKS):
-                if week < weeks_since_signup:
-                    self.advocacy_weekly_progress.append("advocacy_active")
-                else:
-                    self.advocacy_weekly_progress.append("")
-        else:
-            self.advocacy_phase = "none"
-            self.advocacy_weeks_completed = 0
-            self.advocacy_weekly_progress = []
-
-    def to_dict(self):
-        return {
-            "name": self.name,
-            "age": self.age,
-            "gender": self.gender,
-            "location": self.location,
-            "iwi": self.iwi,
-            "hapu": self.hapu,
-            "signup_date": self.signup_date.strftime("%Y-%m-%d"),
-            "phase": self.phase,
-            "weeks_completed": self.weeks_completed,
-            "programs": self.programs,
-            "weekly_progress": self.weekly_progress,
-            "red_phase_assessments": self.red_phase_assessments,
-            "advocacy": self.advocacy,  # List of strings
-            "advocacy_phase": self.advocacy_phase,
-            "advocacy_weeks_completed": self.advocacy_weeks_completed,
-            "advocacy_weekly_progress": self.advocacy_weekly_progress,
-            "kaimahi": self.kaimahi
-        }
-
-    @classmethod
-    def from_dict(cls, data):
-        try:
-            participant = cls(
-                data["name"],
-                data["age"],
-                data.get("gender", "Not specified"),
-                data["location"],
-                data["iwi"],
-                data["hapu"],
-                data["signup_date"],
-                data.get("advocacy", []),
-                data.get("kaimahi", None)
-            )
-            participant.phase = data.get("phase", "red")
-            participant.weeks_completed = data.get("weeks_completed", 0)
-            participant.programs = data.get("programs", [])
-            participant.weekly_progress = data.get("weekly_progress", [])
-            raw_assessments = data.get("red_phase_assessments", {})
-            # Convert string keys to int keys
-            red_phase_assessments = {}
-            for k, v in raw_assessments.items():
-                try:
-                    red_phase_assessments[int(k)] = v
-                except (ValueError, TypeError):
-                    pass  # Skip invalid keys
-            # Fill in missing weeks with defaults
-            default = {"score": 0, "notes": ""}
-            for week in range(1, 7):
-                if week not in red_phase_assessments:
-                    red_phase_assessments[week] = default.copy()
-            participant.red_phase_assessments = red_phase_assessments
-
-            # Load advocacy tracking data
-            participant.advocacy_phase = data.get("advocacy_phase", "none")
-            participant.advocacy_weeks_completed = data.get("advocacy_weeks_completed", 0)
-            participant.advocacy_weekly_progress = data.get("advocacy_weekly_progress", [])
-
-            return participant
-        except Exception as e:
-            print(f"FAILED to create Participant: {e}")
-            raise
+# Once participants.json has been migrated (python -m tupono.storage), the database
+# or the per-participant files directory is used instead
+DATA_PATH = default_data_path(os.path.dirname(__file__))
+# Binary snapshot of the caseload beside the data file, for fast startup
+SNAPSHOT_PATH = DATA_PATH + ".snapshot"
+# How often the UI checks the save worker for finished writes
+SAVE_POLL_MS = 200
+# Records parsed and built per event-loop turn while loading or importing
+IMPORT_BATCH_SIZE = 1000
+# How often the UI checks a running PDF export for progress
+EXPORT_POLL_MS = 100
 
 class ProgramTrackerApp:
     def __init__(self, root):
@@ -196,9 +60,14 @@ class ProgramTrackerApp:
         # Center window if not maximized
         self.center_window()
         
-        self.participants = []
+        self.repository = ParticipantRepository()
         self.current_participant = None
         self.statistics_window = None
+        self.statistics_images = []  # PhotoImages shown in the statistics window
+        self.chart_cache = ChartCache()  # Rendered charts, reused until the data changes
+        self.export_job = None  # ReportExport in progress
+        self.search_after_id = None  # Pending debounced search
+        self.list_render_generation = 0  # Bumped to cancel an in-flight chunked list render
         print("Basic attributes set...")
 
         # === Modern Tu Pono Brand Colours ===
@@ -221,7 +90,10 @@ class ProgramTrackerApp:
         print("Colors initialized...")
 
         print("Loading data...")
+        self.storage = open_storage(DATA_PATH, journal=True)
+        self.snapshot_cache = SnapshotCache(SNAPSHOT_PATH, self.storage, snapshot_columns)
         self.load_data()
+        self.save_worker = SaveWorker(self.storage, after_save=self.snapshot_cache.write)
         print("Creating widgets...")
         self.create_widgets()
         print("Updating participants list...")
@@ -232,15 +104,42 @@ class ProgramTrackerApp:
         # Setup window close protocol
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
 
+        # Keep phases current as weeks tick over while the app stays open
+        self.root.after(60000, self.schedule_progress_refresh)
+        self.root.after(SAVE_POLL_MS, self.poll_save_results)
+
+    @property
+    def participants(self):
+        """The caseload; the repository holds it and does every edit"""
+        return self.repository.participants
+
+    @participants.setter
+    def participants(self, collection):
+        self.repository.participants = collection
+
     def on_closing(self):
         """Handle application closing with confirmation"""
         if messagebox.askyesno("Exit TuPono Tracker", "Are you sure you want to exit?"):
-            # Save any pending changes
+            # Save any pending changes and wait for the write to finish
             try:
                 self.save_data()
-            except:
-                pass  # Don't block closing if save fails
+                error = self.save_worker.flush()
+                # A journal compaction runs on a daemon thread; let it finish rather than cut it off
+                self.storage.wait_for_compaction()
+            except Exception as e:
+                error = e
+            if error is not None and not messagebox.askyesno(
+                "Save Failed",
+                f"Your latest changes could not be saved:\n{error}\n\nClose anyway?"
+            ):
+                return
+            if error is None and self.caseload_loaded and not self.snapshot_cache.is_current():
+                # Incremental saves leave it stale; bring it up to date for the next startup
+                self.write_snapshot_cache(self.participants)
             
+            if self.export_job is not None:
+                self.export_job.cancel()
+
             # Close any open windows
             if hasattr(self, 'statistics_window') and self.statistics_window:
                 try:
@@ -377,7 +276,8 @@ class ProgramTrackerApp:
         if self.participants:
             if not messagebox.askyesno("Confirm", "This will clear all current data. Continue?"):
                 return
-        self.participants = []
+        self.participants = ParticipantCollection()
+        self.caseload_loaded = True
         self.update_participants_list()
         self.clear_inputs()
         messagebox.showinfo("New File", "Created new empty participant list")
@@ -392,13 +292,119 @@ class ProgramTrackerApp:
 
     def load_json(self, filepath):
         try:
-            with open(filepath, "r") as f:
-                data = json.load(f)
-            self.participants = [Participant.from_dict(item) for item in data]
-            self.update_participants_list()
-            messagebox.showinfo("Success", f"Loaded {len(self.participants)} participants")
+            reader = JsonArrayReader(filepath)
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load file:\n{str(e)}")
+            return
+
+        def loaded(collection, skipped):
+            collection.refresh_progress()
+            self.participants = collection
+            self.caseload_loaded = True
+            self.update_participants_list()
+            message = f"Loaded {len(self.participants)} participants"
+            if skipped:
+                message += f"\n\n{skipped} records could not be read and were skipped"
+            messagebox.showinfo("Success", message)
+
+        def stopped(error):
+            if error is None:
+                self.show_notification("Import cancelled - current data kept", "info")
+            else:
+                messagebox.showerror("Error", f"Failed to load file:\n{str(error)}")
+
+        self.import_records(reader, "Importing Participants", loaded, stopped)
+
+    def import_records(self, stream, title, on_complete, on_stop, note=None, build=Participant.from_dict):
+        """Build participants from a record stream, one batch per event-loop turn.
+
+        stream is iterable and has progress() (fraction of the source read), as
+        returned by Storage.iter_load(); build turns each record into a
+        Participant. Once an import runs past its first
+        batch a progress dialog shows records/sec, an ETA and a Cancel button.
+        on_complete(collection, skipped) gets the new ParticipantCollection and
+        the count of records that could not be read; on_stop(error) is called
+        with the exception if reading fails, or None if the user cancelled.
+        """
+        collection = ParticipantCollection()
+        records = iter(stream)
+        started = time.perf_counter()
+        state = {"count": 0, "skipped": 0, "cancelled": False, "dialog": None}
+
+        def cancel():
+            state["cancelled"] = True
+
+        def close_dialog():
+            if state["dialog"] is not None:
+                state["dialog"]["window"].destroy()
+
+        def step():
+            if state["cancelled"]:
+                close_dialog()
+                on_stop(None)
+                return
+            try:
+                batch = list(islice(records, IMPORT_BATCH_SIZE))
+            except Exception as e:
+                close_dialog()
+                on_stop(e)
+                return
+            for number, record in enumerate(batch, state["count"] + 1):
+                try:
+                    collection.add(build(record))
+                except Exception as e:
+                    state["skipped"] += 1
+                    print(f"Error loading participant {number}: {e}")
+            state["count"] += len(batch)
+
+            if len(batch) < IMPORT_BATCH_SIZE:
+                close_dialog()
+                on_complete(collection, state["skipped"])
+                return
+
+            if state["dialog"] is None:
+                state["dialog"] = self._create_progress_dialog(title, cancel, note)
+            fraction = stream.progress()
+            elapsed = time.perf_counter() - started
+            rate = state["count"] / elapsed if elapsed else 0
+            eta = elapsed * (1 - fraction) / fraction if fraction else 0
+            state["dialog"]["bar"]["value"] = fraction * 100
+            state["dialog"]["status"].config(
+                text=f"{state['count']:,} records  •  {rate:,.0f} records/sec  •  about {eta:.0f}s left"
+            )
+            self.root.after(1, step)
+
+        self.root.after(1, step)
+
+    def _create_progress_dialog(self, title, on_cancel, note=None):
+        """Progress dialog for imports and exports; closing it counts as Cancel"""
+        dialog = tk.Toplevel(self.root)
+        dialog.title(title)
+        dialog.geometry("420x150")
+        dialog.configure(bg=self.card_bg)
+        dialog.resizable(False, False)
+        dialog.transient(self.root)
+        dialog.grab_set()
+        dialog.protocol("WM_DELETE_WINDOW", on_cancel)
+
+        tk.Label(
+            dialog,
+            text=title,
+            font=("Segoe UI", 12, "bold"),
+            bg=self.card_bg,
+            fg=self.primary_color
+        ).pack(pady=(12, 6))
+
+        bar = ttk.Progressbar(dialog, mode="determinate", maximum=100, length=380)
+        bar.pack(padx=20)
+
+        status = tk.Label(dialog, text="Starting...", font=self.small_font, bg=self.card_bg, fg=self.fg_color)
+        status.pack(pady=6)
+        if note:
+            tk.Label(dialog, text=note, font=self.small_font, bg=self.card_bg, fg=self.danger_color).pack()
+
+        ttk.Button(dialog, text="Cancel", command=on_cancel).pack(pady=(0, 10))
+        return {"window": dialog, "bar": bar, "status": status}
 
     def save_json_dialog(self):
         if not self.participants:
@@ -434,228 +440,65 @@ class ProgramTrackerApp:
             if not filename:
                 return
 
-        # Show "Please Wait" dialog
-        wait_window = tk.Toplevel(self.root)
-        wait_window.title("Generating Report")
-        wait_window.geometry("300x100")
-        wait_window.resizable(False, False)
-        wait_window.transient(self.root)
-        wait_window.grab_set()
-        wait_window.focus_set()
-        label = ttk.Label(wait_window, text="Generating PDF...\nPlease wait", font=("Helvetica", 12))
-        label.pack(expand=True)
-        wait_window.protocol("WM_DELETE_WINDOW", lambda: None)
-        self.root.update_idletasks()
+        def saved(filename):
+            messagebox.showinfo("Success", f"Full report saved to:\n{filename}")
+            self._open_file(filename)
 
-        def do_export():
-            try:
-                pdf = FPDF(orientation='P', unit='mm', format='A4')
-                pdf.set_auto_page_break(auto=True, margin=15)
-
-                # Cover Page
-                pdf.add_page()
-                pdf.set_font("Helvetica", "B", 24)
-                pdf.set_text_color(0, 0, 0)
-                pdf.cell(0, 20, "Tu Pono IP - Full Report", 0, 1, "C")
-                pdf.ln(10)
-                pdf.set_font("Helvetica", "", 14)
-                pdf.cell(0, 10, f"Generated: {datetime.now().strftime('%d/%m/%Y %H:%M')}", 0, 1, "C")
-                pdf.ln(20)
-
-                # Charts
-                # Remove Advocacy Duration chart from export
-                charts = self._generate_all_charts()
-                for chart_name, fig in charts.items():
-                    if chart_name == "Advocacy: Duration":
-                        continue  # Skip the Advocacy Duration chart
-                    pdf.add_page()
-                    pdf.set_font("Helvetica", "B", 16)
-                    pdf.cell(0, 10, chart_name, 0, 1)
-                    temp_img = os.path.join(tempfile.gettempdir(), f"{chart_name.replace(' ', '_')}.png")
-                    fig.savefig(temp_img, dpi=300, bbox_inches='tight')
-                    plt.close(fig)
-                    pdf.image(temp_img, x=pdf.w / 2 - 80, w=160)
-                    os.remove(temp_img)
-
-                pdf.output(filename)
-                messagebox.showinfo("Success", f"Full report saved to:\n{filename}")
-                self._open_file(filename)
-            except Exception as e:
-                messagebox.showerror("Export Error", f"Failed to create PDF:\n{str(e)}")
-            finally:
-                try:
-                    wait_window.destroy()
-                except:
-                    pass
+        self.run_export("Generating PDF Report", saved, write_pdf_report,
+                        self.repository.statistics(), filename, self.chart_cache)
 
-        wait_window.after(100, do_export)
+    def export_batch_reports(self, dimension, folder=None):
+        """One PDF report per kaimahi or program (dimension "kaimahi" or "program") into a folder"""
+        if not self.participants:
+            messagebox.showwarning("No Data", "No participants to export")
+            return
+        if not folder:
+            folder = filedialog.askdirectory(title=f"Folder for Reports per {dimension.capitalize()}")
+            if not folder:
+                return
 
-    def _generate_all_charts(self):
-        charts = {}
-        programs = ["Ko wai au", "Mental Health and Well-being", "Anger Management", "Domestic Violence"]
-        allowed_genders = ["Male", "Female", "Non-binary"]
-
-        # 1. Program Distribution
-        program_counts = {p: sum(1 for part in self.participants if p in part.programs) for p in programs}
-        values = list(program_counts.values())
-        labels = list(program_counts.keys())
-        if sum(values) == 0:
-            values = [1]
-            labels = ["No Programs Assigned"]
-            autopct = None
-        else:
-            autopct = '%1.1f%%'
-        fig1, ax1 = plt.subplots(figsize=(8, 6))
-        ax1.pie(values, labels=labels, autopct=autopct, startangle=90)
-        ax1.axis('equal')
-        ax1.set_title("Program Distribution")
-        charts["Program Distribution"] = fig1
-
-        # 2. Gender Distribution
-        gender_counts = {g: sum(1 for part in self.participants if part.gender == g) for g in allowed_genders}
-        values = list(gender_counts.values())
-        labels = list(gender_counts.keys())
-        if sum(values) == 0:
-            values = [1]
-            labels = ["No Data"]
-            autopct = None
-        else:
-            autopct = '%1.1f%%'
-        fig2, ax2 = plt.subplots(figsize=(8, 6))
-        ax2.pie(values, labels=labels, autopct=autopct, startangle=90)
-        ax2.axis('equal')
-        ax2.set_title("Gender Distribution")
-        charts["Gender Distribution"] = fig2
-
-        # 3. Iwi Affiliation
-        iwi_counts = {}
-        for p in self.participants:
-            iwi = p.iwi if p.iwi else "Not specified"
-            iwi_counts[iwi] = iwi_counts.get(iwi, 0) + 1
-        if len(iwi_counts) > 8:
-            total = sum(iwi_counts.values())
-            threshold = total * 0.05
-            grouped = {k: v for k, v in iwi_counts.items() if v >= threshold}
-            other = sum(v for k, v in iwi_counts.items() if v < threshold)
-            if other > 0:
-                grouped["Other"] = other
-            iwi_counts = grouped
-        values = list(iwi_counts.values())
-        labels = list(iwi_counts.keys())
-        if sum(values) == 0:
-            values = [1]
-            labels = ["No Data"]
-            autopct = None
-        else:
-            autopct = '%1.1f%%'
-        fig3, ax3 = plt.subplots(figsize=(8, 6))
-        ax3.pie(values, labels=labels, autopct=autopct, startangle=90)
-        ax3.axis('equal')
-        ax3.set_title("Iwi Affiliation")
-        charts["Iwi Affiliation"] = fig3
-
-        # 4. Program by Gender
-        data_rows = []
-        for p in self.participants:
-            if p.gender in allowed_genders:
-                if p.programs:
-                    for prog in p.programs:
-                        data_rows.append({'gender': p.gender, 'program': prog})
-                else:
-                    data_rows.append({'gender': p.gender, 'program': 'No Program'})
-        df = pd.DataFrame(data_rows)
-        if not df.empty:
-            try:
-                gender_program_data = pd.crosstab(df['gender'], df['program'])
-                if not gender_program_data.empty:
-                    fig4, ax4 = plt.subplots(figsize=(10, 6))
-                    gender_program_data.plot(kind='bar', stacked=True, ax=ax4)
-                    ax4.set_title("Program Participation by Gender")
-                    ax4.set_ylabel("Count")
-                    ax4.legend(title="Program")
-                    charts["Program by Gender"] = fig4
-            except Exception as e:
-                print(f"Error generating Program by Gender chart: {e}")
-
-        # === 5. Advocacy Statistics ===
-        # With vs Without
-        total_with_advocacy = sum(1 for p in self.participants if p.advocacy and len(p.advocacy) > 0)
-        total_without_advocacy = len(self.participants) - total_with_advocacy
-        fig_adv1, ax_adv1 = plt.subplots(figsize=(6, 6))
-        labels = ['With Advocacy', 'Without Advocacy']
-        sizes = [total_with_advocacy, total_without_advocacy]
-        colors = ['#5D4037', '#BDBDBD']
-        if sum(sizes) == 0:
-            sizes = [1]
-            labels = ["No Data"]
-            autopct = None
-        else:
-            autopct = '%1.1f%%'
-        ax_adv1.pie(sizes, labels=labels, autopct=autopct, colors=colors, startangle=90)
-        ax_adv1.axis('equal')
-        ax_adv1.set_title("Participants with Advocacy")
-        charts["Advocacy: With vs Without"] = fig_adv1
-
-        # By Type
-        advocacy_type_counts = {atype: 0 for atype in ADVOCACY_TYPES}
-        for p in self.participants:
-            for atype in getattr(p, 'advocacy', []):
-                if atype in advocacy_type_counts:
-                    advocacy_type_counts[atype] += 1
-        fig_adv2, ax_adv2 = plt.subplots(figsize=(8, 6))
-        types = list(advocacy_type_counts.keys())
-        counts = list(advocacy_type_counts.values())
-        bars = ax_adv2.bar(types, counts, color='#5D4037')
-        ax_adv2.set_title("Advocacy Type Distribution")
-        ax_adv2.set_ylabel("Number of Participants")
-        ax_adv2.tick_params(axis='x', rotation=45)
-        for bar in bars:
-            height = bar.get_height()
-            ax_adv2.annotate(f'{int(height)}',
-                           xy=(bar.get_x() + bar.get_width() / 2, height),
-                           xytext=(0, 3),
-                           textcoords="offset points",
-                           ha='center', va='bottom', fontsize=10)
-        charts["Advocacy: By Type"] = fig_adv2
-
-        # Duration Distribution
-        duration_bins = {
-            "<1 Year": 0,
-            "1-2 Years": 0,
-            "2-3 Years": 0,
-            "3-4 Years": 0,
-            "4+ Years": 0
-        }
-        for p in self.participants:
-            if getattr(p, 'advocacy', None) and len(p.advocacy) > 0:
-                weeks = getattr(p, 'advocacy_weeks_completed', 0)
-                years = weeks / 52.0
-                if years < 1:
-                    duration_bins["<1 Year"] += 1
-                elif years < 2:
-                    duration_bins["1-2 Years"] += 1
-                elif years < 3:
-                    duration_bins["2-3 Years"] += 1
-                elif years < 4:
-                    duration_bins["3-4 Years"] += 1
-                else:
-                    duration_bins["4+ Years"] += 1
-        fig_adv3, ax_adv3 = plt.subplots(figsize=(6, 6))
-        labels = list(duration_bins.keys())
-        sizes = list(duration_bins.values())
-        colors_duration = ['#FFB347', '#FF8C00', '#E53935', '#B71C1C', '#5D4037']
-        if sum(sizes) == 0:
-            sizes = [1]
-            labels = ["No Advocacy Participants"]
-            autopct = None
-        else:
-            autopct = '%1.1f%%'
-        ax_adv3.pie(sizes, labels=labels, autopct=autopct, colors=colors_duration, startangle=90)
-        ax_adv3.axis('equal')
-        ax_adv3.set_title("Advocacy Duration Distribution")
-        charts["Advocacy: Duration"] = fig_adv3
+        def saved(index):
+            messagebox.showinfo("Success", f"Reports per {dimension} saved to:\n{folder}")
+            self._open_file(index)
+
+        # Grouped here, from the indexes: the writer thread only sees the immutable stats
+        self.run_export(f"Generating Reports per {dimension.capitalize()}", saved, write_batch_reports,
+                        group_stats(self.participants, dimension), dimension, folder)
+
+    def run_export(self, title, on_done, write, *args):
+        """Run a report writer on a background thread behind a progress dialog;
+        on_done gets what it returned (see ReportExport)"""
+        def cancel():
+            job.cancel()
+            dialog["status"].config(text="Cancelling...")
 
-        return charts
+        job = ReportExport(write, *args)
+        dialog = self._create_progress_dialog(title, cancel)
+        self.export_job = job
+        self.root.after(EXPORT_POLL_MS, self.poll_export, job, dialog, on_done)
+
+    def poll_export(self, job, dialog, on_done):
+        """Move an export's progress bar along, and report how it went once it finishes"""
+        try:
+            while True:
+                event = job.events.get_nowait()
+                if event[0] == "progress":
+                    _, done, total, message = event
+                    dialog["bar"].config(maximum=total, value=done)
+                    dialog["status"].config(text=message)
+                    continue
+                dialog["window"].destroy()
+                self.export_job = None
+                if event[0] == "done":
+                    on_done(event[1])
+                elif event[0] == "cancelled":
+                    self.show_notification("Export cancelled", "info")
+                else:
+                    messagebox.showerror("Export Error", f"Failed to create PDF:\n{str(event[1])}")
+                return
+        except queue.Empty:
+            pass
+        self.root.after(EXPORT_POLL_MS, self.poll_export, job, dialog, on_done)
 
     def _open_file(self, path):
         if sys.platform == "win32":
@@ -846,7 +689,11 @@ class ProgramTrackerApp:
             ("🆕 New Database", self.new_file, "Create a new empty participant database"),
             ("📂 Import Data", self.load_json_dialog, "Load participant data from JSON file"),
             ("💾 Export Data", self.save_json_dialog, "Save current data to JSON file"),
-            ("📄 Generate PDF Report", self.export_to_pdf, "Export comprehensive PDF report")
+            ("📄 Generate PDF Report", self.export_to_pdf, "Export comprehensive PDF report"),
+            ("🗂️ Reports per Kaimahi", lambda: self.export_batch_reports("kaimahi"),
+             "One PDF report per kaimahi, with a summary index"),
+            ("🗂️ Reports per Program", lambda: self.export_batch_reports("program"),
+             "One PDF report per program, with a summary index")
         ]
         
         for i, (text, command, description) in enumerate(file_buttons):
@@ -948,48 +795,44 @@ Last Updated: October 2024
 
     def on_progress_participant_change(self, event=None):
         """Handle selection change in progress tab participant dropdown"""
-        selected = self.progress_participant_var.get()
-        if selected and " - " in selected:
-            participant_name = selected.split(" - ")[0]
-            # Find and select the participant
-            for participant in self.participants:
-                if participant.name == participant_name:
-                    self.current_participant = participant
-                    self.current_participant.update_progress()
-                    self.update_progress_display()
-                    break
+        # Dropdown entries are built from sorted_participants, so the index maps straight back
+        index = self.progress_participant_dropdown.current()
+        if 0 <= index < len(self.sorted_participants):
+            self.current_participant = self.sorted_participants[index]
+            self.update_progress_display()
+
+    def quick_stats(self):
+        """(title, value, colour) for each quick statistics card"""
+        stats = self.repository.quick_stats()
+        return [
+            ("👥 Total Participants", str(stats["total"]), self.accent_color),
+            ("✅ Completed Program", str(stats["completed"]), self.accent_color),
+            ("🎯 With Advocacy", str(stats["with_advocacy"]), self.info_color),
+            ("📊 Completion Rate", f"{stats['completion_rate']:.1f}%" if stats["total"] > 0 else "0%", self.warning_color)
+        ]
 
     def create_quick_stats_cards(self, parent):
         """Create quick statistics cards for reports tab"""
         stats_container = tk.Frame(parent, bg=self.bg_color)
         stats_container.pack(fill="x")
         
-        # Calculate basic statistics
-        total_participants = len(self.participants)
-        completed_count = sum(1 for p in self.participants if p.phase == "completed")
-        advocacy_count = sum(1 for p in self.participants if p.advocacy and len(p.advocacy) > 0)
-        
-        stats_data = [
-            ("👥 Total Participants", str(total_participants), self.accent_color),
-            ("✅ Completed Program", str(completed_count), self.accent_color),
-            ("🎯 With Advocacy", str(advocacy_count), self.info_color),
-            ("📊 Completion Rate", f"{(completed_count/total_participants*100):.1f}%" if total_participants > 0 else "0%", self.warning_color)
-        ]
-        
-        for i, (title, value, color) in enumerate(stats_data):
+        self.quick_stat_labels = []
+        for i, (title, value, color) in enumerate(self.quick_stats()):
             card = tk.Frame(stats_container, bg=color, relief="solid", bd=1)
             card.pack(side="left", fill="both", expand=True, padx=5)
             
             card_inner = tk.Frame(card, bg=color)
             card_inner.pack(fill="both", expand=True, padx=15, pady=10)
             
-            tk.Label(
+            value_label = tk.Label(
                 card_inner,
                 text=value,
                 font=("Segoe UI", 18, "bold"),
                 bg=color,
                 fg="white"
-            ).pack()
+            )
+            value_label.pack()
+            self.quick_stat_labels.append(value_label)
             
             tk.Label(
                 card_inner,
@@ -999,6 +842,12 @@ Last Updated: October 2024
                 fg="white"
             ).pack()
 
+    def update_quick_stats(self):
+        """Refresh the quick statistics card values (counts come from the indexes)"""
+        if hasattr(self, 'quick_stat_labels'):
+            for label, (_, value, _) in zip(self.quick_stat_labels, self.quick_stats()):
+                label.config(text=value)
+
     def create_reports_buttons(self, parent):
         """Create report generation buttons - only functional ones"""
         reports_frame = tk.Frame(parent, bg=self.bg_color)
@@ -2116,7 +1965,7 @@ Last Updated: October 2024
             font=self.body_font
         )
         search_entry.pack(side="left", fill="x", expand=True)
-        self.search_var.trace("w", self.filter_participants)
+        self.search_var.trace("w", self.schedule_search)
         
         # List with scrollbar
         list_frame = tk.Frame(list_card, bg=self.card_bg)
@@ -2228,24 +2077,53 @@ Last Updated: October 2024
         )
         version_label.pack(side="right")
 
+    def schedule_search(self, *args):
+        """Debounce the search box: only search once typing pauses"""
+        if self.search_after_id is not None:
+            self.root.after_cancel(self.search_after_id)
+        self.search_after_id = self.root.after(SEARCH_DEBOUNCE_MS, self.filter_participants)
+
     def filter_participants(self, *args):
         """Filter participants list based on search term"""
-        search_term = self.search_var.get().lower()
+        self.search_after_id = None
+        search_term = self.search_var.get()
+        if search_term:
+            filtered_participants = self.participants.search(search_term)
+        else:
+            filtered_participants = self.sorted_participants
+        self.render_participants_list(filtered_participants)
+
+    def render_participants_list(self, participants, selectable=True):
+        """Show participants in the listbox, inserting a chunk of rows per event-loop turn.
+
+        filtered_participants is switched over at the same time as the listbox is
+        cleared, so a clicked row always maps to the record displayed on it.
+        Starting another render cancels any chunks still pending from this one.
+        With selectable=False (ListRows shown while loading) clicks are ignored.
+        """
+        self.list_render_generation += 1
+        generation = self.list_render_generation
+        self.filtered_participants = participants if selectable else ()
         self.participants_listbox.delete(0, tk.END)
-        
-        filtered_participants = []
-        for p in self.sorted_participants:
-            if (search_term in p.name.lower() or 
-                search_term in p.iwi.lower() or 
-                search_term in p.location.lower() or
-                search_term in p.phase.lower()):
-                filtered_participants.append(p)
-                status = f"{p.name} ({p.age}, {p.gender}) - {p.phase.upper()}"
-                if p.phase == "orange" and p.programs:
-                    status += f" - {', '.join(p.programs)}"
-                self.participants_listbox.insert(tk.END, status)
-        
-        self.filtered_participants = filtered_participants
+
+        def insert_chunk(start):
+            if generation != self.list_render_generation:
+                return  # A newer search or list update has taken over
+            rows = participants[start:start + LIST_RENDER_CHUNK]
+            if rows:
+                self.participants_listbox.insert(tk.END, *map(self._participant_row, rows))
+            if start + LIST_RENDER_CHUNK < len(participants):
+                self.root.after(1, insert_chunk, start + LIST_RENDER_CHUNK)
+
+        insert_chunk(0)
+
+    @staticmethod
+    def _participant_row(p):
+        """Listbox text for one participant"""
+        status = f"{p.name} ({p.age}, {p.gender}) - {p.phase.upper()}"
+        if p.phase == "orange" and p.programs:
+            status += f" - {', '.join(p.programs)}"
+        return status
 
     def add_participant(self):
         """Add a new participant with comprehensive validation"""
@@ -2260,66 +2138,14 @@ Last Updated: October 2024
         signup_date = self.date_entry.get().strip()
         kaimahi = self.kaimahi_var.get()
 
-        # Validation with specific error messages
-        validation_errors = []
-        
-        if not name:
-            validation_errors.append("• Name is required")
-        elif len(name) < 2:
-            validation_errors.append("• Name must be at least 2 characters long")
-        
-        if not age:
-            validation_errors.append("• Age is required")
-        else:
-            try:
-                age_int = int(age)
-                if age_int < 0 or age_int > 120:
-                    validation_errors.append("• Age must be between 0 and 120")
-            except ValueError:
-                validation_errors.append("• Age must be a valid number")
-        
-        if not gender:
-            validation_errors.append("• Gender selection is required")
-        
-        if not location:
-            validation_errors.append("• Location is required")
-        
-        if not iwi:
-            validation_errors.append("• Iwi affiliation is required")
-        
-        if not hapu:
-            validation_errors.append("• Hapū affiliation is required")
-        
-        if not signup_date:
-            validation_errors.append("• Signup date is required")
-        else:
-            try:
-                date_obj = datetime.strptime(signup_date, "%Y-%m-%d")
-                # Check if date is not too far in the future
-                if date_obj.date() > datetime.now().date() + timedelta(days=30):
-                    validation_errors.append("• Signup date cannot be more than 30 days in the future")
-            except ValueError:
-                validation_errors.append("• Invalid date format. Use YYYY-MM-DD (e.g., 2024-03-15)")
-        
-        if not kaimahi:
-            validation_errors.append("• Kaimahi assignment is required")
-        
-        # Check for duplicate names (case-insensitive)
-        existing_names = [p.name.lower() for p in self.participants]
-        if name.lower() in existing_names:
-            validation_errors.append("• A participant with this name already exists")
-        
-        if validation_errors:
-            error_message = "Please correct the following errors:\n\n" + "\n".join(validation_errors)
+        try:
+            self.repository.add(name, age, gender, location, iwi, hapu, signup_date, selected_advocacy, kaimahi)
+        except ValidationError as e:
+            error_message = "Please correct the following errors:\n\n" + "\n".join(e.errors)
             messagebox.showerror("Validation Error", error_message)
             return
 
         try:
-            # Create and add participant
-            participant = Participant(name, age, gender, location, iwi, hapu, signup_date, selected_advocacy, kaimahi)
-            participant.update_progress()
-            self.participants.append(participant)
-            
             # Save and update UI
             self.save_data()
             self.update_participants_list()
@@ -2346,30 +2172,13 @@ Last Updated: October 2024
         signup_date = self.date_entry.get()
         kaimahi = self.kaimahi_var.get()
 
-        if not all([name, age, gender, location, iwi, hapu, signup_date, kaimahi]):
-            messagebox.showerror("Error", "All fields are required (including Kaimahi)")
-            return
-        try:
-            datetime.strptime(signup_date, "%Y-%m-%d")
-        except ValueError:
-            messagebox.showerror("Error", "Invalid date format. Use YYYY-MM-DD")
-            return
-
-        for i, p in enumerate(self.participants):
-            if p.name == self.current_participant.name and p.signup_date == self.current_participant.signup_date:
-                new_p = Participant(name, age, gender, location, iwi, hapu, signup_date, selected_advocacy, kaimahi)
-                new_p.phase = self.current_participant.phase
-                new_p.weeks_completed = self.current_participant.weeks_completed
-                new_p.programs = self.current_participant.programs
-                new_p.weekly_progress = self.current_participant.weekly_progress
-                new_p.red_phase_assessments = self.current_participant.red_phase_assessments
-                new_p.advocacy_phase = self.current_participant.advocacy_phase
-                new_p.advocacy_weeks_completed = self.current_participant.advocacy_weeks_completed
-                new_p.advocacy_weekly_progress = self.current_participant.advocacy_weekly_progress
-                new_p.kaimahi = kaimahi
-                new_p.update_progress()
-                self.participants[i] = new_p
-                break
+        if self.current_participant.participant_id in self.participants:
+            try:
+                self.repository.update(self.current_participant.participant_id, name, age, gender, location, iwi,
+                                       hapu, signup_date, selected_advocacy, kaimahi)
+            except ValidationError as e:
+                messagebox.showerror("Error", "\n".join(e.errors))
+                return
 
         self.save_data()
         self.update_participants_list()
@@ -2380,10 +2189,8 @@ Last Updated: October 2024
     def delete_participant(self):
         if not self.current_participant:
             return
-        for i, p in enumerate(self.participants):
-            if p.name == self.current_participant.name and p.signup_date == self.current_participant.signup_date:
-                del self.participants[i]
-                break
+        if self.current_participant.participant_id in self.participants:
+            self.repository.delete(self.current_participant.participant_id)
         self.save_data()
         self.update_participants_list()
         self.clear_inputs()
@@ -2396,16 +2203,10 @@ Last Updated: October 2024
             return
         index = selection[0]
         
-        # Use filtered participants if search is active, otherwise sorted participants
-        if hasattr(self, 'filtered_participants') and self.search_var.get().strip():
-            if index < len(self.filtered_participants):
-                self.current_participant = self.filtered_participants[index]
-        elif hasattr(self, 'sorted_participants') and index < len(self.sorted_participants):
-            self.current_participant = self.sorted_participants[index]
-        else:
-            self.current_participant = self.participants[index]
-            
-        self.current_participant.update_progress()
+        # The listbox always shows filtered_participants (search results or everyone)
+        if index >= len(self.filtered_participants):
+            return
+        self.current_participant = self.filtered_participants[index]
 
         # Clear displays first (if they exist)
         if hasattr(self, 'status_label') and self.status_label:
@@ -2514,34 +2315,29 @@ Last Updated: October 2024
             # Original participants tab functionality
             selected_indices = self.program_listbox.curselection()
             selected_programs = [self.program_listbox.get(i) for i in selected_indices]
-            if not selected_programs:
-                messagebox.showerror("Error", "Please select at least one program")
+            if not self.save_programs(selected_programs):
                 return
 
-            for p in self.participants:
-                if p.name == self.current_participant.name and p.signup_date == self.current_participant.signup_date:
-                    p.programs = selected_programs
-                    break
-            self.current_participant.programs = selected_programs
-            self.save_data()
-            self.update_progress_display()
+    def save_programs(self, selected_programs):
+        """Set the current participant's programs and save; False if none were selected"""
+        try:
+            if self.current_participant.participant_id in self.participants:
+                self.repository.set_programs(self.current_participant.participant_id, selected_programs)
+            else:
+                self.current_participant.programs = selected_programs
+        except ValidationError as e:
+            messagebox.showerror("Error", "\n".join(e.errors))
+            return False
+        self.save_data()
+        self.update_progress_display()
+        return True
 
     def save_programs_from_progress_tab(self):
         """Save programs selected in progress tab"""
         selected_indices = self.progress_program_listbox.curselection()
         selected_programs = [self.progress_program_listbox.get(i) for i in selected_indices]
-        
-        if not selected_programs:
-            messagebox.showerror("Error", "Please select at least one program")
+        if not self.save_programs(selected_programs):
             return
-
-        for p in self.participants:
-            if p.name == self.current_participant.name and p.signup_date == self.current_participant.signup_date:
-                p.programs = selected_programs
-                break
-        self.current_participant.programs = selected_programs
-        self.save_data()
-        self.update_progress_display()
         
         # Hide selection frame and reset button
         self.program_selection_frame.pack_forget()
@@ -2766,18 +2562,8 @@ Last Updated: October 2024
                 ):
                     return
             
-            self.current_participant.red_phase_assessments[week] = {
-                "score": score, 
-                "notes": notes,
-                "date_completed": datetime.now().strftime("%Y-%m-%d %H:%M")
-            }
-            
-            # Update in main participants list
-            for i, p in enumerate(self.participants):
-                if (p.name == self.current_participant.name and 
-                    p.signup_date == self.current_participant.signup_date):
-                    p.red_phase_assessments[week] = self.current_participant.red_phase_assessments[week]
-                    break
+            if self.current_participant.participant_id in self.participants:
+                self.repository.save_assessment(self.current_participant.participant_id, week, score, notes)
             
             self.save_data()
             messagebox.showinfo(
@@ -3049,242 +2835,78 @@ Last Updated: October 2024
         notebook = ttk.Notebook(self.statistics_window)
         notebook.pack(fill="both", expand=True)
 
-        program_frame = ttk.Frame(notebook)
-        gender_frame = ttk.Frame(notebook)
-        gender_program_frame = ttk.Frame(notebook)
-        iwi_frame = ttk.Frame(notebook)
+        # Each tab's charts are drawn the first time it is selected, so the
+        # window opens as soon as the first tab is drawn. They are PNGs from
+        # the chart cache: reopening the window without edits in between
+        # renders nothing
+        stats = self.repository.statistics()
+        self.statistics_images = []  # Tk only shows a PhotoImage while a reference is held
+        pending_tabs = {}  # Tab frame path -> (frame, title, specs) until first shown
+        for tab_title, specs in STATISTICS_CHARTS.items():
+            frame = ttk.Frame(notebook)
+            notebook.add(frame, text=tab_title)
+            pending_tabs[str(frame)] = (frame, tab_title, specs)
+
+        def show_selected_tab(event=None):
+            tab = pending_tabs.pop(notebook.select(), None)
+            if tab is not None:
+                self.show_statistics_tab(*tab, stats)
+
+        notebook.bind("<<NotebookTabChanged>>", show_selected_tab)
+        show_selected_tab()
 
-        notebook.add(program_frame, text="Program Distribution")
-        notebook.add(gender_frame, text="Gender Distribution")
-        notebook.add(gender_program_frame, text="Program by Gender")
-        notebook.add(iwi_frame, text="Iwi Distribution")
-        advocacy_frame = ttk.Frame(notebook)
-        notebook.add(advocacy_frame, text="Advocacy Distribution")
+        self.statistics_window.protocol("WM_DELETE_WINDOW", lambda: self.on_stats_window_close())
 
-        programs = ["Ko wai au", "Mental Health and Well-being", "Anger Management", "Domestic Violence"]
-        genders = ["Male", "Female", "Non-binary"]
-
-        # Program Distribution
-        program_counts = {p: sum(1 for part in self.participants if p in part.programs) for p in programs}
-        values = list(program_counts.values())
-        labels = list(program_counts.keys())
-        if sum(values) == 0:
-            values = [1]
-            labels = ["No Programs Assigned"]
-            autopct = None
-        else:
-            autopct = '%1.1f%%'
-        fig1, ax1 = plt.subplots(figsize=(5, 4))
-        ax1.pie(values, labels=labels, autopct=autopct, startangle=90)
-        ax1.axis('equal')
-        canvas1 = FigureCanvasTkAgg(fig1, master=program_frame)
-        canvas1.draw()
-        canvas1.get_tk_widget().pack(fill="both", expand=True)
-
-        # Gender Distribution
-        gender_counts = {g: sum(1 for part in self.participants if part.gender == g) for g in genders}
-        values = list(gender_counts.values())
-        labels = list(gender_counts.keys())
-        if sum(values) == 0:
-            values = [1]
-            labels = ["No Data"]
-            autopct = None
-        else:
-            autopct = '%1.1f%%'
-        fig2, ax2 = plt.subplots(figsize=(5, 4))
-        ax2.pie(values, labels=labels, autopct=autopct, startangle=90)
-        ax2.axis('equal')
-        canvas2 = FigureCanvasTkAgg(fig2, master=gender_frame)
-        canvas2.draw()
-        canvas2.get_tk_widget().pack(fill="both", expand=True)
-
-        # Program by Gender
-        allowed_genders = ["Male", "Female", "Non-binary"]
-        data_rows = []
-        for p in self.participants:
-            if p.gender in allowed_genders:
-                if p.programs:
-                    for prog in p.programs:
-                        data_rows.append({'gender': p.gender, 'program': prog})
-                else:
-                    data_rows.append({'gender': p.gender, 'program': 'No Program'})
-        df = pd.DataFrame(data_rows)
-        if not df.empty:
+    def show_statistics_tab(self, frame, tab_title, specs, stats):
+        """Draw one statistics window tab's charts into its frame"""
+        for position, spec in enumerate(specs):
+            if not chart_has_data(spec, stats):
+                label = ttk.Label(frame, text="No data available", font=("Helvetica", 12))
+                label.pack(pady=20)
+                continue
             try:
-                gender_program_data = pd.crosstab(df['gender'], df['program'])
-                if not gender_program_data.empty:
-                    fig3, ax3 = plt.subplots(figsize=(8, 6))
-                    gender_program_data.plot(kind='bar', stacked=True, ax=ax3)
-                    ax3.set_ylabel("Count")
-                    ax3.set_title("Program Participation by Gender")
-                    ax3.legend(title="Program")
-                    canvas3 = FigureCanvasTkAgg(fig3, master=gender_program_frame)
-                    canvas3.draw()
-                    canvas3.get_tk_widget().pack(fill="both", expand=True)
-                else:
-                    label = ttk.Label(gender_program_frame, text="No program data to display", font=("Helvetica", 12))
-                    label.pack(pady=20)
+                png = self.chart_cache.png(spec, stats, SCREEN_DPI)
             except Exception as e:
-                print(f"Error generating Program by Gender chart in stats: {e}")
-                label = ttk.Label(gender_program_frame, text="Error generating chart", font=("Helvetica", 12))
+                print(f"Error generating {tab_title} chart in stats: {e}")
+                label = ttk.Label(frame, text="Error generating chart", font=("Helvetica", 12))
                 label.pack(pady=20)
-        else:
-            label = ttk.Label(gender_program_frame, text="No data available", font=("Helvetica", 12))
-            label.pack(pady=20)
-
-        # Iwi Distribution
-        iwi_counts = {}
-        for p in self.participants:
-            iwi = p.iwi if p.iwi else "Not specified"
-            iwi_counts[iwi] = iwi_counts.get(iwi, 0) + 1
-        if len(iwi_counts) > 8:
-            total = sum(iwi_counts.values())
-            threshold = total * 0.05
-            grouped = {k: v for k, v in iwi_counts.items() if v >= threshold}
-            other = sum(v for k, v in iwi_counts.items() if v < threshold)
-            if other > 0:
-                grouped["Other"] = other
-            iwi_counts = grouped
-        values = list(iwi_counts.values())
-        labels = list(iwi_counts.keys())
-        if sum(values) == 0:
-            values = [1]
-            labels = ["No Data"]
-            autopct = None
-        else:
-            autopct = '%1.1f%%'
-        fig4, ax4 = plt.subplots(figsize=(8, 6))
-        ax4.pie(values, labels=labels, autopct=autopct, startangle=90)
-        ax4.axis('equal')
-        ax4.set_title("Participants by Iwi Affiliation")
-        canvas4 = FigureCanvasTkAgg(fig4, master=iwi_frame)
-        canvas4.draw()
-        canvas4.get_tk_widget().pack(fill="both", expand=True)
-
-        # ===== 5. Advocacy Distribution =====
-        # Count total participants with advocacy
-        total_with_advocacy = sum(1 for p in self.participants if p.advocacy and len(p.advocacy) > 0)
-        total_without_advocacy = len(self.participants) - total_with_advocacy
-
-        # Pie chart: With vs Without Advocacy
-        fig5, ax5 = plt.subplots(figsize=(5, 4))
-        labels = ['With Advocacy', 'Without Advocacy']
-        sizes = [total_with_advocacy, total_without_advocacy]
-        colors = ['#5D4037', '#BDBDBD']  # Brown for advocacy, gray for none
-        if sum(sizes) == 0:
-            sizes = [1]
-            labels = ["No Data"]
-            autopct = None
-        else:
-            autopct = '%1.1f%%'
-        ax5.pie(sizes, labels=labels, autopct=autopct, colors=colors, startangle=90)
-        ax5.axis('equal')
-        ax5.set_title("Participants with Advocacy")
-        canvas5 = FigureCanvasTkAgg(fig5, master=advocacy_frame)
-        canvas5.draw()
-        canvas5.get_tk_widget().pack(fill="both", expand=True)
-
-        # Breakdown by Advocacy Type
-        advocacy_type_counts = {atype: 0 for atype in ADVOCACY_TYPES}
-        for p in self.participants:
-            for atype in getattr(p, 'advocacy', []):
-                if atype in advocacy_type_counts:
-                    advocacy_type_counts[atype] += 1
-
-        # Bar chart: Advocacy Type Distribution
-        # Use 'OT' instead of 'Oranga Tamariki' for label clarity
-        types = [t if t != 'Oranga Tamariki' else 'OT' for t in advocacy_type_counts.keys()]
-        counts = list(advocacy_type_counts.values())
-        fig6, ax6 = plt.subplots(figsize=(10, 5))
-        bars = ax6.bar(types, counts, color='#5D4037')
-        ax6.set_title("Advocacy Type Distribution")
-        ax6.set_ylabel("Number of Participants")
-        ax6.tick_params(axis='x', rotation=30, labelsize=11)
-        ax6.margins(x=0.05)
-        fig6.tight_layout()
-
-        # (No value labels on top of bars)
-
-        canvas6 = FigureCanvasTkAgg(fig6, master=advocacy_frame)
-        canvas6.draw()
-        canvas6.get_tk_widget().pack(fill="both", expand=True, pady=(20, 0))
-
-        # Duration Distribution (for those with advocacy)
-        duration_bins = {
-            "<1 Year": 0,
-            "1-2 Years": 0,
-            "2-3 Years": 0,
-            "3-4 Years": 0,
-            "4+ Years": 0
-        }
-
-        for p in self.participants:
-            if getattr(p, 'advocacy', None) and len(p.advocacy) > 0:
-                weeks = getattr(p, 'advocacy_weeks_completed', 0)
-                years = weeks / 52.0
-                if years < 1:
-                    duration_bins["<1 Year"] += 1
-                elif years < 2:
-                    duration_bins["1-2 Years"] += 1
-                elif years < 3:
-                    duration_bins["2-3 Years"] += 1
-                elif years < 4:
-                    duration_bins["3-4 Years"] += 1
-                else:
-                    duration_bins["4+ Years"] += 1
-
-        # Pie chart: Duration Distribution
-        fig7, ax7 = plt.subplots(figsize=(5, 4))
-        labels = list(duration_bins.keys())
-        sizes = list(duration_bins.values())
-        colors_duration = ['#FFB347', '#FF8C00', '#E53935', '#B71C1C', '#5D4037']
-        if sum(sizes) == 0:
-            sizes = [1]
-            labels = ["No Advocacy Participants"]
-            autopct = None
-        else:
-            autopct = '%1.1f%%'
-        ax7.pie(sizes, labels=labels, autopct=autopct, colors=colors_duration, startangle=90)
-        ax7.axis('equal')
-        ax7.set_title("Advocacy Duration Distribution")
-        canvas7 = FigureCanvasTkAgg(fig7, master=advocacy_frame)
-        canvas7.draw()
-        canvas7.get_tk_widget().pack(fill="both", expand=True, pady=(20, 0))
-
-        self.statistics_window.protocol("WM_DELETE_WINDOW", lambda: self.on_stats_window_close())
+                continue
+            image = ImageTk.PhotoImage(Image.open(io.BytesIO(png)), master=frame)
+            self.statistics_images.append(image)
+            tk.Label(frame, image=image).pack(fill="both", expand=True, pady=(20 if position else 0, 0))
 
     def on_stats_window_close(self):
         if self.statistics_window:
             self.statistics_window.destroy()
         self.statistics_window = None
+        self.statistics_images = []
 
     def update_participants_list(self):
         print(f"Updating participants list with {len(self.participants)} participants")
         
-        # Store sorted list for correct selection mapping
-        self.sorted_participants = sorted(self.participants, key=lambda x: x.signup_date)
-        self.filtered_participants = self.sorted_participants.copy()
-        print(f"Sorted participants: {[p.name for p in self.sorted_participants]}")
+        # Everyone in signup order, for correct selection mapping; the collection keeps
+        # that order through edits, so this doesn't sort the caseload again
+        self.sorted_participants = self.repository.search("")
+        self.filtered_participants = self.sorted_participants
         
         # Update header count
         if hasattr(self, 'header_status'):
-            self.header_status.config(text=f"Participants: {len(self.participants)}")
+            status = f"Participants: {len(self.participants)}"
+            if not self.caseload_loaded:
+                status += "  •  Saved participants not loaded - changes aren't saved"
+            self.header_status.config(text=status)
+        self.update_quick_stats()
         
         # Clear search and repopulate
         if hasattr(self, 'search_var'):
             self.search_var.set("")
+            if self.search_after_id is not None:
+                # Clearing the box scheduled a search; the full list is rendered below instead
+                self.root.after_cancel(self.search_after_id)
+                self.search_after_id = None
             
         if hasattr(self, 'participants_listbox'):
-            self.participants_listbox.delete(0, tk.END)
-            
-            for p in self.sorted_participants:
-                status = f"{p.name} ({p.age}, {p.gender}) - {p.phase.upper()}"
-                if p.phase == "orange" and p.programs:
-                    status += f" - {', '.join(p.programs)}"
-                self.participants_listbox.insert(tk.END, status)
-                print(f"Added to list: {status}")
-                
-            print(f"Final listbox size: {self.participants_listbox.size()}")
+            self.render_participants_list(self.sorted_participants)
             
             # Also update progress tab dropdown if it exists
             self.update_progress_participant_dropdown()
@@ -3304,49 +2926,150 @@ Last Updated: October 2024
         self.date_entry.delete(0, tk.END)
         self.disable_participant_buttons()
 
-    def load_data(self):
+    def load_data(self, use_cache=True):
+        """Start loading the saved caseload; batches are built once the event loop runs.
+
+        A current snapshot cache is used when there is one: its list rows are
+        shown straight away and the participants decoded from it without
+        parsing the data file. Otherwise the data file is streamed (showing
+        the backend's manifest rows first, if it has them) and the cache
+        rewritten once it has loaded. Records from an older schema version
+        are upgraded as they load and the whole file is then saved once at
+        the current version.
+        """
+        # Empty until loading finishes; marked saved so a save in the meantime writes nothing,
+        # and saves are held back altogether unless it finishes (see save_data)
+        self.participants = ParticipantCollection()
+        self.participants.mark_saved()
+        self.caseload_loaded = False
+        columns = None
+        outdated = {"count": 0}
+
+        def build_record(record):
+            if record.get("schema_version") != SCHEMA_VERSION:
+                outdated["count"] += 1
+            return Participant.from_dict(record)
+
+        build = build_record
         try:
-            print(f"Attempting to load data from: {JSON_PATH}")
-            print(f"File exists: {os.path.exists(JSON_PATH)}")
-            
-            if os.path.exists(JSON_PATH):
-                with open(JSON_PATH, "r") as f:
-                    data = json.load(f)
-                print(f"Raw data loaded, found {len(data)} items")
-                
-                self.participants = []
-                for i, item in enumerate(data):
-                    try:
-                        participant = Participant.from_dict(item)
-                        self.participants.append(participant)
-                    except Exception as e:
-                        print(f"Error loading participant {i}: {e}")
-                        
-                print(f"Successfully loaded {len(self.participants)} participants")
-                
-                # Make sure to update the list after loading
-                if hasattr(self, 'participants_listbox'):
-                    self.update_participants_list()
-                    
+            print(f"Attempting to load data from: {self.storage.path}")
+            print(f"File exists: {self.storage.exists()}")
+            if not self.storage.exists():
+                print("Data file does not exist, starting with empty list")
+                self.caseload_loaded = True
+                return
+            # Recovery changes the files the cache is stamped with, so a cache
+            # that predates an interrupted save comes out stale
+            self.storage.recover()
+            columns = self.snapshot_cache.open() if use_cache else None
+            if columns is not None:
+                print(f"Loading from snapshot cache: {self.snapshot_cache.path}")
+                strings = snapshot_strings(columns)
+                rows = snapshot_list_rows(columns, strings)
+                stream = snapshot_participants(columns, strings)
+                build = lambda participant: participant
+                self.root.after(1, lambda: self.render_participants_list(rows, selectable=False))
             else:
-                print("JSON file does not exist, starting with empty list")
-                self.participants = []
+                stream = self.storage.iter_load()
+                if stream.rows:
+                    # The backend has a manifest: show it while the records are read
+                    rows = manifest_list_rows(stream.rows.values())
+                    self.root.after(1, lambda: self.render_participants_list(rows, selectable=False))
         except Exception as e:
             print(f"Error loading data: {e}")
             import traceback
             traceback.print_exc()
-            self.participants = []
+            if columns is not None:
+                columns.close()
+            return
 
-    def save_data(self):
-        """Save participant data with error handling"""
+        def loaded(collection, skipped):
+            collection.refresh_progress()
+            self.participants = collection
+            self.caseload_loaded = True
+            print(f"Successfully loaded {len(self.participants)} participants ({skipped} skipped)")
+            if columns is not None:
+                columns.close()
+                collection.mark_saved()
+            elif outdated["count"]:
+                # Left unsaved, so this writes everything (and then the snapshot cache)
+                print(f"Upgrading {outdated['count']} records to schema version {SCHEMA_VERSION}")
+                self.save_data()
+            else:
+                collection.mark_saved()
+                if collection.pending_changes().rewrite:
+                    # Duplicated IDs in the file were replaced; save them now (and then the snapshot cache)
+                    print("Saving participants whose duplicated IDs were replaced")
+                    self.save_data()
+                else:
+                    threading.Thread(target=self.write_snapshot_cache, args=(collection.snapshot(),),
+                                     daemon=True).start()
+            if hasattr(self, 'participants_listbox'):
+                self.update_participants_list()
+
+        def stopped(error):
+            if columns is not None:
+                columns.close()
+                if error is not None:
+                    print(f"Snapshot cache could not be read ({error}), loading {self.storage.path} instead")
+                    self.load_data(use_cache=False)
+                    return
+            if hasattr(self, 'participants_listbox'):
+                self.update_participants_list()
+            if error is None:
+                # Keep the window, without the caseload: running on part of it would risk
+                # saving over the rest, so nothing is saved until it loads
+                print("Loading cancelled")
+                self.show_notification("Loading cancelled - restart to load your participants", "warning")
+                return
+            print(f"Error loading data: {error}")
+            import traceback
+            traceback.print_exception(type(error), error, error.__traceback__)
+
+        self.import_records(stream, "Loading Participants", loaded, stopped,
+                            note="Cancel opens TuPono Tracker without your participants", build=build)
+
+    def write_snapshot_cache(self, participants):
+        """Rewrite the snapshot cache (after a full load, or on close); it is only an optimisation"""
         try:
-            data = [p.to_dict() for p in self.participants]
-            with open("participants.json", "w") as f:
-                json.dump(data, f, indent=2)
-            self.show_notification("Data saved successfully", "success")
+            self.snapshot_cache.write(participants)
         except Exception as e:
-            self.show_notification(f"Failed to save data: {str(e)}", "error")
-            print(f"Save error: {e}")
+            print(f"Could not write snapshot cache: {e}")
+
+    def schedule_progress_refresh(self):
+        """Recompute everyone's progress when the day rolls over, then check again in a minute"""
+        if self.participants.needs_refresh():
+            self.participants.refresh_progress()
+            self.update_participants_list()
+            if self.current_participant:
+                self.update_progress_display()
+        self.root.after(60000, self.schedule_progress_refresh)
+
+    def save_data(self):
+        """Queue a save of everything edited since the last one.
+
+        The write happens on the save worker thread; poll_save_results reports
+        how it went. Nothing is saved if the saved caseload didn't load, as
+        that would write over it.
+        """
+        if not self.caseload_loaded:
+            self.show_notification("Not saved - your saved participants haven't loaded", "warning")
+            return
+        self.save_worker.request(self.participants.snapshot(), self.participants.take_changes())
+
+    def poll_save_results(self):
+        """Show a notification for each write the save worker has finished"""
+        try:
+            while True:
+                ok, error = self.save_worker.results.get_nowait()
+                if ok:
+                    self.show_notification("Data saved successfully", "success")
+                else:
+                    self.show_notification(f"Failed to save data: {str(error)}", "error")
+                    print(f"Save error: {error}")
+        except queue.Empty:
+            pass
+        self.root.after(SAVE_POLL_MS, self.poll_save_results)
 
     def show_notification(self, message, type="info"):
         """Show a temporary notification to the user"""
@@ -3725,6 +3448,9 @@ Last Updated: October 2024
                 create_hover_effect(button, hover_color, original_color)
 
 if __name__ == "__main__":
+    # PDF charts render in worker processes; a frozen (PyInstaller) build must
+    # let those start here rather than open another copy of the app
+    multiprocessing.freeze_support()
     root = tk.Tk()
     root.withdraw()
 
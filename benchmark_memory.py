@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark for the TuPono Tracker participant model
+
+Loads the same seeded synthetic caseload (tupono.synthetic, as the other
+benchmarks use) into the original dict-based participant layout and into the
+compact __slots__ Participant, and reports the bytes used per participant for
+each.
+"""
+
+import argparse
+import gc
+import json
+import tracemalloc
+from datetime import date
+
+from tupono.model import Participant, ParticipantCollection
+from tupono.synthetic import generate_participants
+
+
+class LegacyParticipant:
+    """The participant layout before the compact model: a plain __dict__ per record"""
+
+    def __init__(self, data):
+        self.name = data["name"]
+        self.age = data["age"]
+        self.gender = data["gender"]
+        self.location = data["location"]
+        self.iwi = data["iwi"]
+        self.hapu = data["hapu"]
+        self.advocacy = data["advocacy"]
+        self.kaimahi = data["kaimahi"]
+        self.signup_date = date.fromisoformat(data["signup_date"])
+        self.phase = data["phase"]
+        self.weeks_completed = data["weeks_completed"]
+        self.programs = data["programs"]
+        self.weekly_progress = data["weekly_progress"]
+        self.advocacy_phase = data["advocacy_phase"]
+        self.advocacy_weeks_completed = data["advocacy_weeks_completed"]
+        self.advocacy_weekly_progress = data["advocacy_weekly_progress"]
+        self.red_phase_assessments = {int(k): v for k, v in data["red_phase_assessments"].items()}
+
+
+def legacy_record(participant):
+    """A participant in the original participants.json layout (no schema_version,
+    weekly progress lists stored with the record)"""
+    record = participant.to_dict()
+    del record["schema_version"]
+    record["weekly_progress"] = list(participant.weekly_progress)
+    record["advocacy_weekly_progress"] = list(participant.advocacy_weekly_progress)
+    return record
+
+
+def measure(texts, build):
+    """Bytes still allocated per record after building every record from its JSON text"""
+    gc.collect()
+    tracemalloc.start()
+    records = [build(json.loads(text)) for text in texts]
+    if isinstance(records[0], Participant):
+        ParticipantCollection(records).refresh_progress()
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current / len(records)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bytes-per-participant memory benchmark")
+    parser.add_argument("--count", type=int, default=100_000, help="number of participants (default 100000)")
+    parser.add_argument("--seed", type=int, default=42, help="random seed for the synthetic caseload")
+    args = parser.parse_args()
+
+    print(f"Generating {args.count:,} synthetic participants...")
+    texts = [json.dumps(legacy_record(participant))
+             for participant in generate_participants(args.count, args.seed)]
+
+    before = measure(texts, LegacyParticipant)
+    print(f"✓ Original layout:  {before:,.0f} bytes/participant")
+    after = measure(texts, Participant.from_dict)
+    print(f"✓ Compact layout:   {after:,.0f} bytes/participant")
+    print(f"  Reduction:        {before / after:.1f}x "
+          f"({(before - after) * args.count / 1024 / 1024:,.1f} MB saved at {args.count:,} participants)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Operations benchmark for the TuPono Tracker participant repository
+
+Times the edits and queries behind the app's buttons (add, update, delete,
+set programs, save an assessment, search, statistics) through
+ParticipantRepository, with no GUI, at several caseload sizes.
+"""
+
+import argparse
+import random
+import time
+from datetime import date
+
+from tupono.model import ADVOCACY_TYPES, KAIMAHI_LIST
+from tupono.stats import REPORT_PROGRAMS
+from tupono.repository import ParticipantRepository
+from tupono.synthetic import IWI_HAPU, LOCATIONS, generate_collection
+
+IWI = list(IWI_HAPU)
+
+
+def build_repository(count, seed, today):
+    """A repository holding count synthetic participants, with progress up to date"""
+    collection = generate_collection(count, seed, today)
+    collection.mark_saved()
+    return ParticipantRepository(collection)
+
+
+def form_values(rng, name, today):
+    """Arguments for ParticipantRepository.add / update, as the form would give them"""
+    iwi = rng.choice(IWI)
+    return dict(
+        name=name,
+        age=str(rng.randint(16, 80)),
+        gender=rng.choice(["Male", "Female", "Non-binary"]),
+        location=rng.choice(LOCATIONS),
+        iwi=iwi,
+        hapu=rng.choice(IWI_HAPU[iwi]),
+        signup_date=today.isoformat(),
+        advocacy=rng.sample(ADVOCACY_TYPES, rng.choice([0, 1, 2])),
+        kaimahi=rng.choice(KAIMAHI_LIST),
+    )
+
+
+def timed(operation, repeat):
+    """Mean milliseconds per call of operation(i) over repeat calls"""
+    started = time.perf_counter()
+    for i in range(repeat):
+        operation(i)
+    return (time.perf_counter() - started) * 1000 / repeat
+
+
+def benchmark(count, repeat, seed):
+    """{operation: mean ms per call} at one caseload size"""
+    rng = random.Random(seed)
+    today = date.today()
+    repository = build_repository(count, seed, today)
+    ids = [p.participant_id for p in rng.sample(list(repository.participants), repeat)]
+    results = {}
+
+    added = []
+    results["add"] = timed(
+        lambda i: added.append(repository.add(**form_values(rng, f"New Participant {i}", today)).participant_id),
+        repeat)
+    results["update"] = timed(
+        lambda i: repository.update(ids[i], **form_values(rng, f"Renamed Participant {i}", today)), repeat)
+    results["set_programs"] = timed(
+        lambda i: repository.set_programs(ids[i], rng.sample(REPORT_PROGRAMS, rng.randint(1, 2))), repeat)
+    results["save_assessment"] = timed(
+        lambda i: repository.save_assessment(ids[i], rng.randint(1, 6), rng.randint(1, 10), "Benchmark notes"),
+        repeat)
+    results["search"] = timed(lambda i: repository.search(rng.choice(IWI)[:4]), repeat)
+    results["quick_stats"] = timed(lambda i: repository.quick_stats(), repeat)
+    results["statistics"] = timed(lambda i: repository.statistics(), max(repeat // 10, 1))
+    results["delete"] = timed(lambda i: repository.delete(added[i]), repeat)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Participant operations benchmark (no GUI)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000],
+                        help="caseload sizes to run at (default 1000 10000 100000)")
+    parser.add_argument("--repeat", type=int, default=100, help="calls timed per operation (default 100)")
+    parser.add_argument("--seed", type=int, default=42, help="random seed for the synthetic caseload")
+    args = parser.parse_args()
+
+    results = {}
+    for count in args.sizes:
+        print(f"Benchmarking {count:,} participants...")
+        results[count] = benchmark(count, args.repeat, args.seed)
+
+    print()
+    print(f"{'ms per call':<18}" + "".join(f"{count:>12,}" for count in args.sizes))
+    for operation in results[args.sizes[0]]:
+        print(f"{operation:<18}" + "".join(f"{results[count][operation]:>12.3f}" for count in args.sizes))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark for the TuPono Tracker at several caseload sizes
+
+For each size a synthetic participants.json is written (tupono.synthetic,
+fixed seed) and the app's heavy paths are timed headlessly, the way the app
+runs them:
+
+    load       stream the file, build the collection, refresh progress (load_data)
+    save_full  rewrite the whole file (save_data after an import)
+    save_edit  save one assessment edit through the journal (save_data)
+    search     type a few search terms a character at a time (filter_participants)
+    charts     build the report charts and render them to PNG (the PDF's charts)
+    pdf        write the full PDF report (export_to_pdf)
+
+Results are written as JSON (for comparing runs) and as a markdown table:
+
+    python benchmark_suite.py --sizes 1000 10000 100000 --output benchmark_results
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import tempfile
+import time
+from datetime import date, datetime
+
+from tupono.cli import build_collection
+from tupono.reports import report_charts, write_pdf_report
+from tupono.stats import caseload_stats
+from tupono.storage import JournalStorage
+from tupono.synthetic import write_caseload
+
+SEARCH_TERMS = ["aroha", "ngāti", "tauranga", "green"]
+CHART_DPI = 300  # What the PDF report renders at
+STEPS = ("load", "save_full", "save_edit", "search", "charts", "pdf")
+
+
+def timed(operation):
+    """(seconds, result) for one call"""
+    started = time.perf_counter()
+    result = operation()
+    return time.perf_counter() - started, result
+
+
+def load(path):
+    collection, _ = build_collection(JournalStorage(path).iter_load())
+    collection.refresh_progress()
+    collection.mark_saved()
+    return collection
+
+
+def save_full(storage, collection):
+    storage.write_all(p.to_dict() for p in collection.snapshot())
+
+
+def save_edit(storage, collection):
+    participant = collection[len(collection) // 2]
+    participant.red_phase_assessments[1] = {
+        "score": 7, "notes": "Benchmark edit", "date_completed": "2026-01-01 10:00"
+    }
+    collection.mark_assessment(participant.participant_id, 1)
+    storage.save(collection.snapshot(), collection.take_changes())
+
+
+def search(collection):
+    matches = 0
+    for term in SEARCH_TERMS:
+        for length in range(1, len(term) + 1):
+            matches = len(collection.search(term[:length]))
+    return matches
+
+
+def render_charts(collection):
+    sizes = []
+    for fig in report_charts(caseload_stats(collection)).values():
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format="png", dpi=CHART_DPI, bbox_inches="tight")
+        sizes.append(buffer.tell())
+    return sizes
+
+
+def run_size(count, seed, repeat, directory):
+    """{step: [seconds per run]} for one caseload size"""
+    path = os.path.join(directory, f"participants_{count}.json")
+    print(f"Generating {count:,} participants...")
+    write_caseload(path, count, seed)
+    storage = JournalStorage(path)
+    timings = {step: [] for step in STEPS}
+    for run in range(repeat):
+        seconds, collection = timed(lambda: load(path))
+        timings["load"].append(seconds)
+        timings["save_full"].append(timed(lambda: save_full(storage, collection))[0])
+        timings["save_edit"].append(timed(lambda: save_edit(storage, collection))[0])
+        storage.wait_for_compaction()
+        timings["search"].append(timed(lambda: search(collection))[0])
+        timings["charts"].append(timed(lambda: render_charts(collection))[0])
+        pdf_path = os.path.join(directory, f"report_{count}.pdf")
+        timings["pdf"].append(timed(lambda: write_pdf_report(caseload_stats(collection), pdf_path))[0])
+        print(f"  run {run + 1}: " + ", ".join(f"{step} {values[-1]:.2f}s" for step, values in timings.items()))
+    return timings
+
+
+def write_markdown(path, report):
+    sizes = list(report["results"])
+    lines = [
+        "# TuPono benchmark",
+        "",
+        f"{report['generated']} - Python {report['python']} on {report['platform']}, "
+        f"{report['cpus']} CPUs, seed {report['seed']}, median of {report['repeat']} runs",
+        "",
+        "| step | " + " | ".join(f"{int(size):,}" for size in sizes) + " |",
+        "|---|" + "---:|" * len(sizes),
+    ]
+    for step in STEPS:
+        lines.append(f"| {step} | " + " | ".join(
+            f"{report['results'][size][step]['median']:.3f}s" for size in sizes) + " |")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load/save/search/charts/PDF benchmark on synthetic caseloads")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000],
+                        help="caseload sizes (default 1000 10000 100000)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per size; the median is reported (default 3)")
+    parser.add_argument("--seed", type=int, default=42, help="random seed for the synthetic caseloads")
+    parser.add_argument("--output", default="benchmark_results",
+                        help="write OUTPUT.json and OUTPUT.md (default benchmark_results)")
+    args = parser.parse_args()
+
+    report = {
+        "generated": datetime.now().strftime("%Y-%m-%d %H:%M"),
+        "as_of": date.today().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "results": {},
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        for count in args.sizes:
+            timings = run_size(count, args.seed, args.repeat, directory)
+            report["results"][str(count)] = {
+                step: {"median": statistics.median(values), "min": min(values), "runs": values}
+                for step, values in timings.items()
+            }
+
+    with open(args.output + ".json", "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    write_markdown(args.output + ".md", report)
+    print(f"✓ Results written to {args.output}.json and {args.output}.md")
+
+
+if __name__ == "__main__":
+    main()
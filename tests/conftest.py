@@ -0,0 +1,143 @@
+"""
+Shared fixtures: seeded synthetic caseloads, saved caseloads to edit and
+reload, and operation timings
+
+Tests that time an operation record it with the timed fixture; the timings
+are listed at the end of the run, so `python -m pytest -q` doubles as a
+headless benchmark of the repository operations. The 100k caseloads are
+marked slow and skipped by default (run them with -m slow).
+"""
+
+import json
+import time
+from collections import defaultdict
+from datetime import date
+
+import pytest
+
+from tupono.model import ADVOCACY_TYPES, KAIMAHI_LIST, Participant, ParticipantCollection
+from tupono.repository import ParticipantRepository
+from tupono.storage import JournalStorage
+from tupono.synthetic import IWI_HAPU, LOCATIONS, generate_collection
+
+SEED = 42
+# Fixed, so synthetic caseloads (and so their counts) are the same on every run
+AS_OF = date(2026, 1, 31)
+CASELOAD_SIZES = [1000, 10000, pytest.param(100000, marks=pytest.mark.slow)]
+
+_timings = defaultdict(dict)  # operation -> {caseload size: seconds}
+
+
+@pytest.fixture
+def as_of():
+    """The date synthetic caseloads are generated and refreshed for"""
+    return AS_OF
+
+
+@pytest.fixture
+def caseload():
+    """caseload(count, seed=SEED): a seeded synthetic ParticipantCollection, progress as of AS_OF"""
+    def build(count, seed=SEED):
+        return generate_collection(count, seed, AS_OF)
+    return build
+
+
+@pytest.fixture
+def by_id():
+    """by_id(records): records sorted by ID, as they read back from JSON (assessment weeks as strings)"""
+    def sort(records):
+        return sorted(json.loads(json.dumps(list(records))), key=lambda record: record["id"])
+    return sort
+
+
+@pytest.fixture
+def saved_caseload(tmp_path, caseload):
+    """saved_caseload(count=20, **options): (JournalStorage, collection) with the
+    collection written to a fresh participants.json snapshot"""
+    def save(count=20, **options):
+        storage = JournalStorage(str(tmp_path / "participants.json"), **options)
+        collection = caseload(count)
+        storage.save(collection, collection.take_changes())
+        return storage, collection
+    return save
+
+
+@pytest.fixture
+def edit():
+    """edit(collection): one of each journal entry - add, update, delete and an in-place assessment"""
+    def apply(collection):
+        collection.add(Participant("Journal Added", "30", "Female", "Rotorua", "Te Arawa", "Ngāti Whakaue",
+                                   AS_OF.isoformat(), ["Housing"], "Ben"))
+        updated = Participant.from_dict(collection[1].to_dict())
+        updated.name = "Journal Updated"
+        collection.replace(updated)
+        collection.remove(collection[2].participant_id)
+        participant = collection[3]
+        participant.red_phase_assessments[2] = {"score": 8, "notes": "journalled",
+                                                "date_completed": "2026-01-02 10:00"}
+        collection.mark_assessment(participant.participant_id, 2)
+    return apply
+
+
+@pytest.fixture
+def form_values():
+    """form_values(rng, name): arguments for ParticipantRepository.add / update,
+    as the form would give them, signed up today"""
+    def values(rng, name):
+        iwi = rng.choice(list(IWI_HAPU))
+        return dict(
+            name=name,
+            age=str(rng.randint(16, 80)),
+            gender=rng.choice(["Male", "Female", "Non-binary"]),
+            location=rng.choice(LOCATIONS),
+            iwi=iwi,
+            hapu=rng.choice(IWI_HAPU[iwi]),
+            signup_date=date.today().isoformat(),
+            advocacy=rng.sample(ADVOCACY_TYPES, rng.choice([0, 1, 2])),
+            kaimahi=rng.choice(KAIMAHI_LIST),
+        )
+    return values
+
+
+@pytest.fixture(scope="module", params=CASELOAD_SIZES, ids=lambda size: f"{size // 1000}k")
+def caseload_size(request):
+    return request.param
+
+
+@pytest.fixture(scope="module")
+def caseload_json(caseload_size):
+    """The seeded caseload of caseload_size as saved JSON, generated once per module"""
+    return json.dumps([p.to_dict() for p in generate_collection(caseload_size, SEED, AS_OF)])
+
+
+@pytest.fixture
+def repository(caseload_json):
+    """A ParticipantRepository of its own for each test, loaded from caseload_json,
+    so no test sees another's edits"""
+    collection = ParticipantCollection(Participant.from_dict(record) for record in json.loads(caseload_json))
+    collection.refresh_progress(AS_OF)
+    collection.mark_saved()
+    return ParticipantRepository(collection)
+
+
+@pytest.fixture
+def timed(caseload_size):
+    """timed(operation, fn, *args): run fn(*args), record how long it took at
+    this caseload size, and return its result"""
+    def run(operation, fn, *args):
+        started = time.perf_counter()
+        result = fn(*args)
+        _timings[operation][caseload_size] = time.perf_counter() - started
+        return result
+    return run
+
+
+def pytest_terminal_summary(terminalreporter):
+    if not _timings:
+        return
+    sizes = sorted({size for by_size in _timings.values() for size in by_size})
+    terminalreporter.section("repository operation timings (ms)")
+    terminalreporter.write_line(f"{'operation':<28}" + "".join(f"{size:>12,}" for size in sizes))
+    for operation, by_size in _timings.items():
+        terminalreporter.write_line(f"{operation:<28}" + "".join(
+            f"{by_size[size] * 1000:>12.2f}" if size in by_size else f"{'':>12}" for size in sizes))
@@ -0,0 +1,131 @@
+"""
+ParticipantCollection edits: remove swaps the last record into the removed
+one's slot, and every position-aligned structure, index and the kept
+signup order must follow add, replace and remove
+"""
+
+import random
+from collections import Counter
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from tupono.model import INDEX_DIMENSIONS, Participant, ParticipantCollection
+
+
+def assert_consistent(collection):
+    """Everything edits maintain matches a collection built from scratch"""
+    ids = [participant.participant_id for participant in collection]
+    assert np.array_equal(collection.positions(ids), np.arange(len(ids)))
+    assert all(collection.get(participant_id) is collection[i] for i, participant_id in enumerate(ids))
+
+    fresh = ParticipantCollection(list(collection))
+    assert np.array_equal(collection.signup_ordinals(), fresh.signup_ordinals())
+    assert np.array_equal(collection.signup_order(), fresh.signup_order())
+    assert np.array_equal(collection.search_columns()["name"], fresh.search_columns()["name"])
+    assert np.array_equal(collection.search_columns()["phase"], fresh.search_columns()["phase"])
+    for dimension in INDEX_DIMENSIONS:
+        recount = Counter(key for participant in collection
+                          for key in ParticipantCollection._index_keys(participant, dimension))
+        assert collection.counts(dimension) == dict(recount)
+    for term in ("", "a", "ngāti", "red", "Participant"):
+        assert [p.participant_id for p in collection.search(term)] == \
+               [p.participant_id for p in fresh.search(term)]
+
+
+@pytest.fixture
+def collection(caseload):
+    collection = caseload(200)
+    # Build the cached arrays, so remove() has to keep them aligned rather than rebuild them
+    collection.signup_ordinals()
+    collection.search_columns()
+    return collection
+
+
+@pytest.mark.parametrize("position", [0, 100, -1], ids=["first", "middle", "last"])
+def test_remove_swaps_the_last_record_in(collection, position):
+    removed = collection[position]
+    last = collection[-1]
+    collection.remove(removed.participant_id)
+
+    assert len(collection) == 199
+    assert removed.participant_id not in collection
+    if removed is not last:
+        assert collection[position] is last
+    assert_consistent(collection)
+
+    for dimension in INDEX_DIMENSIONS:
+        for key in ParticipantCollection._index_keys(removed, dimension):
+            assert removed.participant_id not in collection.ids(dimension, key)
+    names = [p.name for p in collection.search(last.name)]
+    assert last.name in names or last is removed
+    assert removed.name not in [p.name for p in collection.search(removed.name)]
+
+
+def test_remove_many_then_add(collection, caseload):
+    for participant in list(collection)[::3]:
+        collection.remove(participant.participant_id)
+    assert_consistent(collection)
+
+    for participant in caseload(10, seed=1):
+        collection.add(participant)
+    assert_consistent(collection)
+
+
+def test_remove_everyone(collection):
+    for participant in list(collection):
+        collection.remove(participant.participant_id)
+    assert len(collection) == 0
+    assert all(collection.counts(dimension) == {} for dimension in INDEX_DIMENSIONS)
+    assert list(collection.search("")) == []
+
+
+def test_remove_without_cached_arrays(caseload):
+    collection = ParticipantCollection(list(caseload(50)))  # Nothing cached yet
+    collection.remove(collection[0].participant_id)
+    collection.remove(collection[-1].participant_id)
+    assert_consistent(collection)
+
+
+def test_remove_is_recorded_for_the_next_save(collection):
+    collection.take_changes()
+    participant = collection[5]
+    collection.mark_changed(participant.participant_id)
+    collection.mark_assessment(participant.participant_id, 2)
+    collection.remove(participant.participant_id)
+    changes = collection.pending_changes()
+    assert changes.deleted == {participant.participant_id}
+    assert not changes.changed and not changes.assessments
+    with pytest.raises(KeyError):
+        collection.remove(participant.participant_id)
+
+
+def test_signup_order_is_kept_through_edits(collection):
+    # Few distinct dates, so most edits land among same-day signups
+    rng = random.Random(7)
+    dates = [date(2025, 1, 1) + timedelta(days=day) for day in range(5)]
+    collection.signup_order()
+    for step in range(300):
+        action = rng.random()
+        if action < 0.4:
+            collection.add(Participant(f"Order Check {step}", "30", "Female", "Rotorua", "Te Arawa",
+                                       "Ngāti Whakaue", rng.choice(dates).isoformat(), ["Housing"], "Ben"))
+        elif action < 0.7:
+            updated = Participant.from_dict(rng.choice(collection).to_dict())
+            updated.signup_date = rng.choice(dates + [updated.signup_date])
+            updated.name = f"Order Check Renamed With A Much Longer Name Than Before {step}"
+            collection.replace(updated)
+        elif len(collection) > 1:
+            collection.remove(rng.choice(collection).participant_id)
+        if step % 50 == 0:
+            assert_consistent(collection)
+    assert_consistent(collection)
+    assert [p.name for p in collection.search("much longer name")] == \
+           [p.name for p in sorted(collection, key=lambda p: p.signup_ordinal) if "Much Longer" in p.name]
+
+
+def test_empty_search_is_the_signup_order(collection):
+    everyone = collection.search("")
+    assert len(everyone) == len(collection)
+    assert list(everyone) == sorted(collection, key=lambda participant: participant.signup_ordinal)
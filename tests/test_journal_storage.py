@@ -0,0 +1,129 @@
+"""
+JournalStorage: snapshot plus append-only journal, replay, torn-line
+recovery and compaction through <path>.journal.compacting
+"""
+
+import json
+import os
+
+from tupono.model import Participant, ParticipantCollection
+from tupono.storage import JournalStorage, read_journal
+
+
+def test_edits_are_journalled_and_replayed(tmp_path, saved_caseload, edit, by_id):
+    storage, collection = saved_caseload()
+    snapshot = (tmp_path / "participants.json").read_bytes()
+    edit(collection)
+    storage.save(collection, collection.take_changes())
+
+    assert (tmp_path / "participants.json").read_bytes() == snapshot
+    entries, _ = read_journal(storage.journal_path)
+    assert sorted(entry["op"] for entry in entries) == ["add", "assessment", "delete", "update"]
+    assert by_id(JournalStorage(storage.path).load()) == by_id(p.to_dict() for p in collection)
+
+
+def test_torn_trailing_line_is_trimmed(saved_caseload, edit, by_id):
+    storage, collection = saved_caseload()
+    edit(collection)
+    storage.save(collection, collection.take_changes())
+    intact = os.path.getsize(storage.journal_path)
+    with open(storage.journal_path, "ab") as f:
+        f.write(b'{"op": "delete", "id": "' + collection[0].participant_id.encode())  # Crash mid-append
+
+    reopened = JournalStorage(storage.path)
+    assert by_id(reopened.load()) == by_id(p.to_dict() for p in collection)
+    assert os.path.getsize(storage.journal_path) == intact
+
+    # Appends after recovery start on a clean line
+    collection.remove(collection[0].participant_id)
+    reopened.save(collection, collection.take_changes())
+    assert by_id(JournalStorage(storage.path).load()) == by_id(p.to_dict() for p in collection)
+
+
+def test_unparseable_line_ends_the_journal(saved_caseload, by_id):
+    storage, collection = saved_caseload()
+    expected = by_id(p.to_dict() for p in collection)
+    with open(storage.journal_path, "ab") as f:
+        f.write(b"not json\n")
+        f.write(json.dumps({"op": "delete", "id": collection[0].participant_id}).encode() + b"\n")
+    assert by_id(JournalStorage(storage.path).load()) == expected
+
+
+def test_compaction_folds_the_journal_into_the_snapshot(saved_caseload, edit, by_id):
+    storage, collection = saved_caseload(compact_bytes=1)
+    edit(collection)
+    storage.save(collection, collection.take_changes())  # Past compact_bytes: compacts in the background
+    storage.wait_for_compaction()
+
+    assert not os.path.exists(storage.journal_path)
+    assert not os.path.exists(storage.compacting_path)
+    with open(storage.path) as f:
+        assert by_id(json.load(f)) == by_id(p.to_dict() for p in collection)
+    assert storage.rewrites == 2  # The first full save, then the compaction
+
+
+def test_edits_during_compaction_go_to_a_fresh_journal(saved_caseload, edit, by_id):
+    storage, collection = saved_caseload()
+    edit(collection)
+    storage.save(collection, collection.take_changes())
+    os.replace(storage.journal_path, storage.compacting_path)  # Compaction started, then the app stopped
+    collection.remove(collection[0].participant_id)
+    storage.save(collection, collection.take_changes())
+
+    reopened = JournalStorage(storage.path)
+    assert by_id(reopened.load()) == by_id(p.to_dict() for p in collection)
+    # The interrupted compaction's journal was put back in front of the new one
+    assert not os.path.exists(storage.compacting_path)
+    assert [entry["op"] for entry in read_journal(storage.journal_path)[0]][-1] == "delete"
+    assert by_id(JournalStorage(storage.path).load()) == by_id(p.to_dict() for p in collection)
+
+
+def test_compaction_keeps_an_interrupted_compactions_edits(saved_caseload, edit, by_id):
+    storage, collection = saved_caseload()
+    edit(collection)
+    storage.save(collection, collection.take_changes())
+    os.replace(storage.journal_path, storage.compacting_path)  # Compaction cut off at exit
+
+    # Next session saves before anything loads, and compacts straight away
+    reopened = JournalStorage(storage.path, compact_bytes=1)
+    collection.remove(collection[0].participant_id)
+    reopened.save(collection, collection.take_changes())
+    reopened.wait_for_compaction()
+
+    assert not os.path.exists(storage.compacting_path)
+    assert not os.path.exists(storage.journal_path)
+    assert by_id(JournalStorage(storage.path).load()) == by_id(p.to_dict() for p in collection)
+
+
+def test_duplicated_ids_are_saved_under_their_new_ids(saved_caseload, by_id):
+    storage, collection = saved_caseload()
+    with open(storage.path) as f:
+        records = json.load(f)
+    records.append(dict(records[0], name="Copied Participant"))  # Same ID, e.g. pasted into the file
+    with open(storage.path, "w") as f:
+        json.dump(records, f)
+
+    loaded = ParticipantCollection(Participant.from_dict(record) for record in storage.load())
+    loaded.mark_saved()
+    copy = loaded[-1]
+    assert copy.participant_id != records[0]["id"]
+    assert loaded.pending_changes().rewrite  # Storage only has the copy under the old ID
+
+    copy.name = "Copied Participant Renamed"
+    loaded.mark_changed(copy.participant_id)
+    storage.save(loaded, loaded.take_changes())
+    reloaded = by_id(JournalStorage(storage.path).load())
+    assert len(reloaded) == len(records)
+    assert reloaded == by_id(p.to_dict() for p in loaded)
+    assert not loaded.pending_changes().rewrite
+
+
+def test_full_save_clears_the_journal(saved_caseload, edit, by_id):
+    storage, collection = saved_caseload()
+    edit(collection)
+    storage.save(collection, collection.take_changes())
+    changes = collection.take_changes()._replace(rewrite=True)
+    storage.save(collection, changes)
+    assert not os.path.exists(storage.journal_path)
+    with open(storage.path) as f:
+        assert by_id(json.load(f)) == by_id(p.to_dict() for p in collection)
@@ -0,0 +1,85 @@
+"""
+JsonArrayReader: items decoded a chunk at a time, whatever the chunk
+boundaries split, and clear errors for anything that isn't a JSON array
+"""
+
+import json
+
+import pytest
+
+from tupono.storage import JsonArrayReader
+
+ITEMS = [
+    {"name": "Aroha Ngata", "iwi": "Ngāti Porou", "hapu": "Te Whānau a Ruataupare", "age": "34"},
+    {"name": "Mere \"Quoted\" Tipene", "notes": "comma, ] bracket } brace", "programs": []},
+    12345,
+    -0.5e3,
+    "plain string with ümlauts and emoji 🌿",
+    [1, [2, [3]]],
+    None,
+    True,
+    {"nested": {"list": [{"a": 1}, {"b": [True, False, None]}]}},
+    987654321,
+]
+CHUNK_SIZES = [1, 2, 3, 5, 7, 16, 64, 1 << 16]
+
+
+def write(tmp_path, text, encoding="utf-8"):
+    path = tmp_path / "participants.json"
+    path.write_bytes(text.encode(encoding))
+    return str(path)
+
+
+@pytest.mark.parametrize("chunk_bytes", CHUNK_SIZES)
+@pytest.mark.parametrize("indent", [None, 2])
+def test_items_across_chunk_boundaries(tmp_path, chunk_bytes, indent):
+    path = write(tmp_path, json.dumps(ITEMS, indent=indent, ensure_ascii=False))
+    reader = JsonArrayReader(path, chunk_bytes=chunk_bytes)
+    assert list(reader) == ITEMS
+    assert reader.progress() == 1.0
+
+
+@pytest.mark.parametrize("chunk_bytes", [1, 3, 1 << 16])
+def test_byte_order_mark_and_whitespace(tmp_path, chunk_bytes):
+    path = write(tmp_path, " \n[ 1 ,\t2 ,\r\n 3 ] \n", encoding="utf-8-sig")
+    assert list(JsonArrayReader(path, chunk_bytes=chunk_bytes)) == [1, 2, 3]
+
+
+@pytest.mark.parametrize("text", ["[]", " [ \n ] "])
+def test_empty_array(tmp_path, text):
+    assert list(JsonArrayReader(write(tmp_path, text), chunk_bytes=1)) == []
+
+
+@pytest.mark.parametrize("text, number", [("[12345]", 12345), ("[-0.5e3]", -500.0), ("[1.25, 7]", 1.25)])
+@pytest.mark.parametrize("chunk_bytes", [1, 2, 3])
+def test_number_at_a_chunk_boundary_is_read_whole(tmp_path, text, number, chunk_bytes):
+    # With 2-byte chunks "[-0.5e3]" arrives as "[-", "0.", "5e", "3]": "-0" alone already parses
+    assert list(JsonArrayReader(write(tmp_path, text), chunk_bytes=chunk_bytes))[0] == number
+
+
+def test_items_stream_before_the_file_is_read(tmp_path):
+    path = write(tmp_path, json.dumps([{"id": str(i)} for i in range(1000)]))
+    reader = JsonArrayReader(path, chunk_bytes=256)
+    items = iter(reader)
+    assert next(items) == {"id": "0"}
+    assert 0 < reader.progress() < 0.1
+
+
+@pytest.mark.parametrize("text, message", [
+    ('{"name": "not an array"}', "expected a JSON array"),
+    ("", "unexpected end of file"),
+    ('[{"a": 1} {"b": 2}]', "expected ',' or ']'"),
+    ('[{"a": 1}, ', "unexpected end of file"),
+    ('[{"a": 1}', "unexpected end of file"),
+])
+@pytest.mark.parametrize("chunk_bytes", [1, 4, 1 << 16])
+def test_malformed_structure(tmp_path, text, message, chunk_bytes):
+    with pytest.raises(ValueError, match=message):
+        list(JsonArrayReader(write(tmp_path, text), chunk_bytes=chunk_bytes))
+
+
+@pytest.mark.parametrize("text", ['[{"a": ', '[{"a": 1,}]', "[1,]", '[{"a": tru}]'])
+@pytest.mark.parametrize("chunk_bytes", [1, 4, 1 << 16])
+def test_malformed_items(tmp_path, text, chunk_bytes):
+    with pytest.raises(json.JSONDecodeError):
+        list(JsonArrayReader(write(tmp_path, text), chunk_bytes=chunk_bytes))
@@ -0,0 +1,181 @@
+"""
+ParticipantRepository operations on seeded caseloads of 1k, 10k and 100k
+participants: what each edit does to the caseload, and how long it takes
+(listed at the end of the run)
+"""
+
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from tupono.repository import MAX_FUTURE_SIGNUP_DAYS, ValidationError
+
+# Edits timed per operation
+BATCH = 100
+TODAY = date.today()
+
+
+def sample_ids(repository, count, seed):
+    rng = random.Random(seed)
+    return [participant.participant_id for participant in rng.sample(list(repository.participants), count)]
+
+
+def test_add(repository, timed, form_values):
+    rng = random.Random(1)
+    before = len(repository)
+    added = timed("add x100", lambda: [
+        repository.add(**form_values(rng, f"Added Participant {i}")) for i in range(BATCH)
+    ])
+    assert len(repository) == before + BATCH
+    assert all(repository.get(participant.participant_id) is participant for participant in added)
+    assert "Added Participant 42" in [participant.name for participant in repository.search("added participant 42")]
+    assert set(repository.participants.pending_changes().added) >= {p.participant_id for p in added}
+
+
+def test_add_rejects_duplicate_names(repository, form_values):
+    existing = repository.participants[0].name
+    before = len(repository)
+    with pytest.raises(ValidationError) as error:
+        repository.add(**form_values(random.Random(2), existing.upper()))
+    assert error.value.errors == ["• A participant with this name already exists"]
+    assert len(repository) == before
+
+
+def test_add_reports_every_invalid_field(repository, form_values):
+    with pytest.raises(ValidationError) as error:
+        repository.add("A", "abc", "", "", "Waikato", "Ngāti Hauā", "15/03/2024", kaimahi="")
+    assert error.value.errors == [
+        "• Name must be at least 2 characters long",
+        "• Age must be a valid number",
+        "• Gender selection is required",
+        "• Location is required",
+        "• Invalid date format. Use YYYY-MM-DD (e.g., 2024-03-15)",
+        "• Kaimahi assignment is required",
+    ]
+    assert str(error.value) == "\n".join(error.value.errors)
+
+    values = form_values(random.Random(3), "Future Signup")
+    values["signup_date"] = (TODAY + timedelta(days=MAX_FUTURE_SIGNUP_DAYS + 1)).isoformat()
+    with pytest.raises(ValidationError) as error:
+        repository.add(**values)
+    assert error.value.errors == [
+        f"• Signup date cannot be more than {MAX_FUTURE_SIGNUP_DAYS} days in the future"]
+
+
+def test_update(repository, timed, form_values):
+    rng = random.Random(4)
+    ids = sample_ids(repository, BATCH, 4)
+    kept = {participant_id: (list(repository.get(participant_id).programs),
+                             dict(repository.get(participant_id).red_phase_assessments))
+            for participant_id in ids}
+    before = len(repository)
+    timed("update x100", lambda: [
+        repository.update(participant_id, **form_values(rng, f"Renamed Participant {i}"))
+        for i, participant_id in enumerate(ids)
+    ])
+    assert len(repository) == before
+    for i, participant_id in enumerate(ids):
+        participant = repository.get(participant_id)
+        assert participant.name == f"Renamed Participant {i}"
+        assert (list(participant.programs), dict(participant.red_phase_assessments)) == kept[participant_id]
+    assert [p.participant_id for p in repository.search("renamed participant 7")
+            if p.name == "Renamed Participant 7"] == [ids[7]]
+
+
+def test_update_rejects_invalid_values(repository, form_values):
+    participant_id = sample_ids(repository, 1, 5)[0]
+    values = form_values(random.Random(5), "Still Valid")
+    with pytest.raises(ValidationError) as error:
+        repository.update(participant_id, **dict(values, kaimahi=None))
+    assert error.value.errors == ["All fields are required (including Kaimahi)"]
+    with pytest.raises(ValidationError) as error:
+        repository.update(participant_id, **dict(values, signup_date="2024-13-01"))
+    assert error.value.errors == ["Invalid date format. Use YYYY-MM-DD"]
+    with pytest.raises(KeyError):
+        repository.update("no-such-id", **values)
+
+
+def test_delete(repository, timed):
+    ids = sample_ids(repository, BATCH, 6)
+    before = len(repository)
+    kaimahi_before = repository.participants.counts("kaimahi")
+    removed_by_kaimahi = {}
+    for participant_id in ids:
+        kaimahi = repository.get(participant_id).kaimahi
+        removed_by_kaimahi[kaimahi] = removed_by_kaimahi.get(kaimahi, 0) + 1
+
+    timed("delete x100", lambda: [repository.delete(participant_id) for participant_id in ids])
+
+    assert len(repository) == before - BATCH
+    for participant_id in ids:
+        assert participant_id not in repository.participants
+        with pytest.raises(KeyError):
+            repository.get(participant_id)
+    kaimahi_after = repository.participants.counts("kaimahi")
+    for kaimahi, count in kaimahi_before.items():
+        assert kaimahi_after.get(kaimahi, 0) == count - removed_by_kaimahi.get(kaimahi, 0)
+    assert repository.quick_stats()["total"] == len(repository)
+    assert repository.statistics().total == len(repository)
+    assert set(repository.participants.pending_changes().deleted) >= set(ids)
+    with pytest.raises(KeyError):
+        repository.delete(ids[0])
+
+
+def test_set_programs(repository, timed):
+    ids = sample_ids(repository, BATCH, 7)
+    program = "Anger Management"
+    before = repository.participants.count("program", program)
+    newly_in = sum(program not in repository.get(participant_id).programs for participant_id in ids)
+    leaving_other = {}
+    for participant_id in ids:
+        for other in repository.get(participant_id).programs:
+            if other != program:
+                leaving_other[other] = leaving_other.get(other, 0) + 1
+    other_before = {other: repository.participants.count("program", other) for other in leaving_other}
+
+    timed("set_programs x100", lambda: [repository.set_programs(participant_id, [program]) for participant_id in ids])
+
+    assert repository.participants.count("program", program) == before + newly_in
+    for other, count in other_before.items():
+        assert repository.participants.count("program", other) == count - leaving_other[other]
+    assert all(list(repository.get(participant_id).programs) == [program] for participant_id in ids)
+    with pytest.raises(ValidationError) as error:
+        repository.set_programs(ids[0], [])
+    assert error.value.errors == ["Please select at least one program"]
+    assert list(repository.get(ids[0]).programs) == [program]
+
+
+def test_save_assessment(repository, timed):
+    ids = sample_ids(repository, BATCH, 8)
+    saved = timed("save_assessment x100", lambda: [
+        repository.save_assessment(participant_id, i % 6 + 1, str(i % 10 + 1), f"Notes {i}")
+        for i, participant_id in enumerate(ids)
+    ])
+    pending = repository.participants.pending_changes().assessments
+    for i, (participant_id, assessment) in enumerate(zip(ids, saved)):
+        week = i % 6 + 1
+        assert assessment["score"] == i % 10 + 1 and assessment["notes"] == f"Notes {i}"
+        assert repository.get(participant_id).red_phase_assessments[week] == assessment
+        assert (participant_id, week) in pending
+    with pytest.raises(ValidationError) as error:
+        repository.save_assessment(ids[0], 7, 5, "")
+    assert error.value.errors == ["Week 7 is not a red phase assessment week"]
+
+
+def test_statistics(repository, timed):
+    participants = repository.participants
+    stats = timed("statistics", repository.statistics)
+    assert timed("statistics (unchanged)", repository.statistics) is stats
+    assert stats.version == participants.version
+    assert stats.total == len(participants)
+    assert stats.completed == participants.count("phase", "completed")
+    assert sum(stats.advocacy.values()) == stats.total
+    assert stats.advocacy["With Advocacy"] == repository.quick_stats()["with_advocacy"]
+    assert sum(stats.advocacy_durations.values()) == stats.advocacy["With Advocacy"]
+    assert sum(stats.iwi.values()) == stats.total
+
+    repository.set_programs(sample_ids(repository, 1, 9)[0], ["Ko wai au", "Domestic Violence"])
+    changed = repository.statistics()
+    assert changed is not stats and changed.version == participants.version
+    assert changed.programs == dict(participants.counts("program", list(changed.programs)))
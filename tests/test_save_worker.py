@@ -0,0 +1,67 @@
+"""
+merge_changes, and SaveWorker folding queued and failed saves into the next
+write
+"""
+
+from tupono.model import ChangeSet
+from tupono.storage import JournalStorage, SaveWorker, merge_changes
+
+
+def change_set(rewrite=False, changed=(), added=(), deleted=(), assessments=()):
+    return ChangeSet(rewrite, frozenset(changed), frozenset(added), frozenset(deleted), frozenset(assessments))
+
+
+def test_merge_changes_unions_each_set():
+    earlier = change_set(changed={"a", "b"}, added={"b"}, deleted={"x"}, assessments={("a", 1)})
+    later = change_set(changed={"c"}, added={"c"}, deleted={"b", "y"}, assessments={("a", 1), ("c", 2)})
+    assert merge_changes(earlier, later) == change_set(
+        changed={"a", "b", "c"}, added={"b", "c"}, deleted={"b", "x", "y"},
+        assessments={("a", 1), ("c", 2)}
+    )
+
+
+def test_merge_changes_keeps_a_rewrite_from_either_side():
+    rewrite, edits = change_set(rewrite=True), change_set(changed={"a"})
+    assert merge_changes(rewrite, edits).rewrite
+    assert merge_changes(edits, rewrite).rewrite
+    assert not merge_changes(edits, edits).rewrite
+    assert merge_changes(change_set(), change_set()) == change_set()
+
+
+class FlakyJournalStorage(JournalStorage):
+    """Fails the first `failures` incremental writes"""
+
+    def __init__(self, path, failures):
+        super().__init__(path)
+        self.failures = failures
+        self.written = []
+
+    def write_changes(self, participants, changes):
+        if self.failures:
+            self.failures -= 1
+            raise OSError("disk full")
+        self.written.append(changes)
+        super().write_changes(participants, changes)
+
+
+def test_failed_save_is_carried_into_the_next(tmp_path, caseload, edit, by_id):
+    collection = caseload(20)
+    storage = FlakyJournalStorage(str(tmp_path / "participants.json"), failures=1)
+    storage.save(collection, collection.take_changes())
+    worker = SaveWorker(storage)
+
+    edit(collection)
+    failed = collection.take_changes()
+    worker.request(collection.snapshot(), failed)
+    assert isinstance(worker.flush(5), OSError)
+    assert worker.results.get_nowait()[0] is False
+
+    removed = collection[0].participant_id
+    collection.remove(removed)
+    worker.request(collection.snapshot(), collection.take_changes())
+    assert worker.flush(5) is None
+    assert worker.results.get_nowait() == (True, None)
+
+    # One write holding the failed edits and the new delete
+    assert storage.written == [merge_changes(failed, change_set(deleted={removed}))]
+    assert by_id(JournalStorage(storage.path).load()) == by_id(p.to_dict() for p in collection)
@@ -0,0 +1,79 @@
+"""
+Record schema: upgrading unversioned (version 1) records, and reading them
+"""
+
+from datetime import date
+
+import pytest
+
+from tupono.model import Participant
+from tupono.schema import SCHEMA_VERSION, default_assessment_weeks, record_version, upgrade_record
+
+# As an early file saved it: no ID, gender or phase, an unpadded date, the
+# weekly progress lists since dropped, and assessment weeks keyed any old way
+VERSION_1_RECORD = {
+    "name": "Aroha Ngata",
+    "age": "34",
+    "location": "Gisborne",
+    "iwi": "Ngāti Porou",
+    "hapu": "Te Whānau a Ruataupare",
+    "signup_date": "2024-1-5",
+    "programs": None,
+    "advocacy": "yes",
+    "weekly_progress": [True, False],
+    "advocacy_weekly_progress": [],
+    "red_phase_assessments": {
+        1: {"score": 7, "notes": "int key"},
+        "2": {"score": 5, "notes": "string key", "date_completed": "2024-01-19 10:00"},
+        "week 3": {"score": 9, "notes": "invalid key"},
+        None: {"score": 1, "notes": "no key"},
+    },
+}
+
+
+def test_version_1_record_is_upgraded():
+    source = dict(VERSION_1_RECORD)
+    record = upgrade_record(source)
+
+    assert source == VERSION_1_RECORD  # The caller's record is left alone
+    assert record["schema_version"] == record_version(record) == SCHEMA_VERSION
+    assert len(record["id"]) == 32
+    assert record["signup_date"] == "2024-01-05"
+    assert (record["gender"], record["phase"], record["weeks_completed"]) == ("Not specified", "red", 0)
+    assert (record["programs"], record["advocacy"], record["kaimahi"]) == ([], [], None)
+    assert (record["advocacy_phase"], record["advocacy_weeks_completed"]) == ("none", 0)
+    assert "weekly_progress" not in record and "advocacy_weekly_progress" not in record
+
+    expected = default_assessment_weeks()
+    expected["1"] = {"score": 7, "notes": "int key"}
+    expected["2"] = VERSION_1_RECORD["red_phase_assessments"]["2"]
+    assert record["red_phase_assessments"] == expected
+
+
+def test_version_1_record_keeps_what_it_has():
+    record = upgrade_record(dict(VERSION_1_RECORD, id="abc123", gender="Female", phase="orange",
+                                 kaimahi="Ben", advocacy=["Housing"], programs=["Ko wai au"]))
+    assert (record["id"], record["gender"], record["phase"]) == ("abc123", "Female", "orange")
+    assert (record["kaimahi"], record["advocacy"], record["programs"]) == ("Ben", ["Housing"], ["Ko wai au"])
+
+
+def test_current_record_is_unchanged():
+    record = upgrade_record(VERSION_1_RECORD)
+    assert upgrade_record(dict(record)) == record
+
+
+def test_newer_record_is_refused():
+    with pytest.raises(ValueError, match="newer than this app"):
+        upgrade_record(dict(VERSION_1_RECORD, schema_version=SCHEMA_VERSION + 1))
+
+
+def test_participant_reads_a_version_1_record():
+    participant = Participant.from_dict(VERSION_1_RECORD)
+    assert participant.signup_date == date(2024, 1, 5)
+    assert participant.gender == "Not specified"
+    assert participant.red_phase_assessments[1] == {"score": 7, "notes": "int key"}
+    assert participant.red_phase_assessments[3] == {"score": 0, "notes": ""}
+
+    saved = participant.to_dict()
+    assert saved["schema_version"] == SCHEMA_VERSION
+    assert Participant.from_dict(saved).to_dict() == saved
@@ -0,0 +1,119 @@
+"""
+Snapshot cache: column files, the caseload round trip through them, and
+the stamp check that keeps a stale or foreign cache from being used
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+from tupono.model import ParticipantCollection, snapshot_columns, snapshot_participants, snapshot_strings
+from tupono.snapshot import ColumnFile, SnapshotCache, pack_strings, unpack_strings, write_column_file
+from tupono.storage import JournalStorage, JsonStorage, SaveWorker
+
+
+@pytest.fixture
+def saved_cache(tmp_path, caseload):
+    """saved_cache(storage_class=JsonStorage): (cache, storage, collection) with a
+    50-participant collection saved and its cache written"""
+    def save(storage_class=JsonStorage):
+        storage = storage_class(str(tmp_path / "participants.json"))
+        collection = caseload(50)
+        storage.save(collection, collection.take_changes())
+        cache = SnapshotCache(storage.path + ".snapshot", storage, snapshot_columns)
+        cache.write(collection)
+        return cache, storage, collection
+    return save
+
+
+def test_column_file_round_trip(tmp_path):
+    strings = ["", "Aroha", "Ngāti Whakaue", "emoji 🌿", "Aroha"]
+    offsets, data = pack_strings(strings)
+    arrays = {
+        "ordinals": np.arange(7, dtype=np.int32),  # 28 bytes: the next array starts padded
+        "flags": np.array([1, 0, 1], dtype=np.uint8),
+        "string_offsets": offsets,
+        "strings": data,
+        "empty": np.array([], dtype=np.uint32),
+    }
+    path = str(tmp_path / "columns")
+    write_column_file(path, arrays, {"count": 7})
+
+    columns = ColumnFile(path)
+    assert columns.meta == {"count": 7}
+    for name, values in arrays.items():
+        assert columns[name].dtype == values.dtype
+        assert np.array_equal(columns[name], values)
+    assert unpack_strings(columns["string_offsets"], columns["strings"]) == strings
+    columns.close()
+
+
+def test_caseload_round_trip(saved_cache, as_of):
+    cache, _, collection = saved_cache()
+    columns = cache.open()
+    assert columns.meta["count"] == len(collection)
+
+    loaded = ParticipantCollection(snapshot_participants(columns, snapshot_strings(columns)))
+    loaded.refresh_progress(as_of)
+    assert [p.to_dict() for p in loaded] == [p.to_dict() for p in collection]
+    columns.close()
+
+
+def test_cache_goes_stale_when_the_data_file_changes(saved_cache):
+    cache, storage, collection = saved_cache(JournalStorage)
+    assert cache.is_current()
+
+    collection.remove(collection[0].participant_id)
+    storage.save(collection, collection.take_changes())  # Appends to the journal
+    assert cache.open() is None
+    assert not cache.is_current()
+
+    cache.write(collection)
+    assert cache.is_current()
+
+
+def test_recovering_an_interrupted_compaction_makes_the_cache_stale(saved_cache, edit, by_id):
+    cache, storage, collection = saved_cache(JournalStorage)
+    edit(collection)
+    storage.save(collection, collection.take_changes())
+    os.replace(storage.journal_path, storage.compacting_path)  # Compaction under way...
+    cache.write(collection)  # ...when the cache is written on close, and then cut off
+    assert cache.is_current()
+
+    storage.recover()
+    assert not os.path.exists(storage.compacting_path)
+    assert not cache.is_current()
+    assert by_id(storage.load()) == by_id(p.to_dict() for p in collection)
+
+
+def test_foreign_or_unreadable_cache_is_ignored(tmp_path, saved_cache, capsys):
+    cache, _, _ = saved_cache()
+    other = SnapshotCache(cache.path, JsonStorage(str(tmp_path / "other.json")), snapshot_columns)
+    assert other.open() is None  # Written for a different data file
+
+    with open(cache.path, "wb") as f:
+        f.write(b"not a column file")
+    assert cache.open() is None
+    assert "Ignoring unreadable snapshot cache" in capsys.readouterr().out
+
+
+def test_save_worker_refreshes_the_cache_only_after_rewrites(saved_cache):
+    cache, storage, collection = saved_cache(JournalStorage)
+    refreshed = []
+
+    def after_save(participants):
+        refreshed.append(len(participants))
+        cache.write(participants)
+
+    worker = SaveWorker(storage, after_save=after_save)
+    collection.remove(collection[0].participant_id)
+    worker.request(collection.snapshot(), collection.take_changes())
+    assert worker.flush(5) is None
+    assert refreshed == []  # Incremental: only the journal grew
+    assert not cache.is_current()
+
+    worker.request(collection.snapshot(), collection.take_changes()._replace(rewrite=True))
+    assert worker.flush(5) is None
+    assert refreshed == [len(collection)]
+    assert cache.is_current()
@@ -0,0 +1,3 @@
+"""
+TuPono Tracker core modules shared by the desktop app and tools
+"""
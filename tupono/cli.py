@@ -0,0 +1,197 @@
+"""
+Headless command line for batch jobs (cron, scheduled tasks)
+
+    python -m tupono validate
+    python -m tupono recompute-progress [--as-of YYYY-MM-DD]
+    python -m tupono export-csv participants.csv
+    python -m tupono export-pdf report.pdf [--profile screen|print]
+    python -m tupono export-batch reports/ --by kaimahi|program [--profile screen|print]
+    python -m tupono import other_participants.json
+
+Every command takes --data to point at a caseload; by default it is the one
+the app uses (participants.db, participants.shards or participants.json next
+to Tupono_trackerV3.py). Records are streamed, so large files are fine, and
+nothing imported here touches tkinter, so no display is needed.
+"""
+
+import argparse
+import csv
+import os
+import sys
+import time
+from datetime import date
+
+from tupono.model import KAIMAHI_LIST, PHASE_NAMES, Participant, ParticipantCollection
+from tupono.reports import DEFAULT_EXPORT_PROFILE, EXPORT_PROFILES, write_batch_reports, write_pdf_report
+from tupono.schema import SCHEMA_VERSION, record_version
+from tupono.stats import BATCH_GROUPS, caseload_stats, group_stats
+from tupono.storage import JsonArrayReader, default_data_path, open_storage
+
+APP_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CSV_COLUMNS = [
+    "id", "name", "age", "gender", "location", "iwi", "hapu", "kaimahi", "signup_date", "phase",
+    "weeks_completed", "programs", "advocacy", "advocacy_phase", "advocacy_weeks_completed",
+] + [f"assessment_week_{week}" for week in range(1, 7)]
+
+
+def build_collection(records):
+    """Participants from a stream of records; returns (collection, skipped) like the app's import"""
+    collection = ParticipantCollection()
+    skipped = 0
+    for index, record in enumerate(records):
+        try:
+            collection.add(Participant.from_dict(record))
+        except Exception as e:
+            skipped += 1
+            print(f"Error loading participant {index}: {e}", file=sys.stderr)
+    return collection, skipped
+
+
+def load_caseload(path, as_of_date=None):
+    """Open the storage at path and load it with progress brought up to date"""
+    storage = open_storage(path, journal=True)
+    if not storage.exists():
+        raise SystemExit(f"No participant data at {path}")
+    started = time.perf_counter()
+    collection, skipped = build_collection(storage.iter_load())
+    collection.refresh_progress(as_of_date)
+    print(f"Loaded {len(collection):,} participants from {path} in {time.perf_counter() - started:.1f}s"
+          + (f" ({skipped} skipped)" if skipped else ""))
+    return storage, collection
+
+
+def validate(args):
+    """Check every record loads cleanly; exit status 1 if any has errors"""
+    storage = open_storage(args.data, journal=True)
+    if not storage.exists():
+        raise SystemExit(f"No participant data at {args.data}")
+    errors = []
+    warnings = []
+    seen = set()
+    outdated = 0
+    count = 0
+    for index, record in enumerate(storage.iter_load()):
+        count += 1
+        label = f"record {index} ({record.get('name', 'no name')})"
+        version = record_version(record)
+        if version > SCHEMA_VERSION:
+            errors.append(f"{label}: schema version {version} is newer than this tool ({SCHEMA_VERSION})")
+            continue
+        outdated += version < SCHEMA_VERSION
+        try:
+            participant = Participant.from_dict(record)
+        except Exception as e:
+            errors.append(f"{label}: {e!r}")
+            continue
+        if record.get("id") and record["id"] in seen:
+            errors.append(f"{label}: duplicate id {record['id']}")
+        seen.add(participant.participant_id)
+        if record.get("kaimahi") and record["kaimahi"] not in KAIMAHI_LIST:
+            warnings.append(f"{label}: unknown kaimahi {record['kaimahi']!r} will be dropped")
+        if participant.signup_date > date.today():
+            warnings.append(f"{label}: signup date {participant.signup_date} is in the future")
+
+    for message in warnings:
+        print(f"warning: {message}")
+    for message in errors:
+        print(f"error: {message}")
+    if outdated:
+        print(f"{outdated:,} records are from an older schema version; the app upgrades them on next load")
+    print(f"Checked {count:,} records: {len(errors)} errors, {len(warnings)} warnings")
+    return 1 if errors else 0
+
+
+def recompute_progress(args):
+    """Recompute every participant's phase and weeks and save them back"""
+    as_of_date = date.fromisoformat(args.as_of) if args.as_of else None
+    storage, collection = load_caseload(args.data, as_of_date)
+    storage.save(collection.snapshot(), collection.take_changes())
+    for phase in PHASE_NAMES:
+        print(f"  {phase:<10} {collection.count('phase', phase):,}")
+    print(f"✓ Saved progress as of {collection.as_of_date} to {args.data}")
+    return 0
+
+
+def export_csv(args):
+    """One row per participant in signup order, lists joined with "; " """
+    _, collection = load_caseload(args.data)
+    with open(args.output, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS, extrasaction="ignore")
+        writer.writeheader()
+        for position in collection.signup_order().tolist():
+            row = collection[position].to_dict()
+            row["programs"] = "; ".join(row["programs"])
+            row["advocacy"] = "; ".join(row["advocacy"])
+            for week, assessment in row["red_phase_assessments"].items():
+                row[f"assessment_week_{week}"] = assessment.get("score", 0)
+            writer.writerow(row)
+    print(f"✓ Exported {len(collection):,} participants to {args.output}")
+    return 0
+
+
+def export_pdf(args):
+    """The app's full PDF report"""
+    _, collection = load_caseload(args.data)
+    write_pdf_report(caseload_stats(collection), args.output, profile=args.profile)
+    print(f"✓ Full report saved to {args.output}")
+    return 0
+
+
+def export_batch(args):
+    """One PDF report per kaimahi or program, plus an index of them"""
+    _, collection = load_caseload(args.data)
+    index = write_batch_reports(group_stats(collection, args.by), args.by, args.output, profile=args.profile)
+    print(f"✓ Reports per {args.by} saved to {args.output} (summary: {os.path.basename(index)})")
+    return 0
+
+
+def import_json(args):
+    """Replace the caseload with a participants JSON file, as Import JSON does in the app"""
+    started = time.perf_counter()
+    collection, skipped = build_collection(JsonArrayReader(args.source))
+    collection.refresh_progress()
+    storage = open_storage(args.data, journal=True)
+    storage.save(collection.snapshot(), collection.take_changes())
+    print(f"✓ Imported {len(collection):,} participants into {args.data} in {time.perf_counter() - started:.1f}s"
+          + (f" ({skipped} records could not be read and were skipped)" if skipped else ""))
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m tupono", description="TuPono Tracker batch operations")
+    parser.add_argument("--data", default=default_data_path(APP_DIRECTORY),
+                        help="participants.json, .db or .shards to work on (default: the app's)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("validate", help="check every record loads cleanly").set_defaults(run=validate)
+
+    command = commands.add_parser("recompute-progress", help="recompute phases and weeks and save them")
+    command.add_argument("--as-of", help="date to compute progress for, YYYY-MM-DD (default today)")
+    command.set_defaults(run=recompute_progress)
+
+    command = commands.add_parser("export-csv", help="write participants to a CSV file")
+    command.add_argument("output")
+    command.set_defaults(run=export_csv)
+
+    command = commands.add_parser("export-pdf", help="write the full PDF report")
+    command.add_argument("output")
+    command.add_argument("--profile", choices=list(EXPORT_PROFILES), default=DEFAULT_EXPORT_PROFILE,
+                         help="chart resolution: "
+                         + ", ".join(f"{name} {dpi} dpi" for name, dpi in EXPORT_PROFILES.items())
+                         + f" (default {DEFAULT_EXPORT_PROFILE})")
+    command.set_defaults(run=export_pdf)
+
+    command = commands.add_parser("export-batch", help="write one PDF report per kaimahi or program")
+    command.add_argument("output", help="folder for the reports (created if missing)")
+    command.add_argument("--by", choices=list(BATCH_GROUPS), required=True)
+    command.add_argument("--profile", choices=list(EXPORT_PROFILES), default=DEFAULT_EXPORT_PROFILE,
+                         help=f"chart resolution, as for export-pdf (default {DEFAULT_EXPORT_PROFILE})")
+    command.set_defaults(run=export_batch)
+
+    command = commands.add_parser("import", help="replace the caseload with a participants JSON file")
+    command.add_argument("source")
+    command.set_defaults(run=import_json)
+
+    args = parser.parse_args(argv)
+    return args.run(args)
@@ -0,0 +1,980 @@
+"""
+Participant model: the compact Participant record and the indexed ParticipantCollection
+
+Shared by the Tk app and the headless command line (python -m tupono), so
+nothing here imports tkinter. Also holds the binary snapshot encoding of a
+caseload (see tupono.snapshot) and the list rows shown while one loads.
+"""
+
+import itertools
+import json
+import sys
+import uuid
+from collections import namedtuple
+from datetime import date, datetime
+from functools import lru_cache
+
+import numpy as np
+
+from tupono.schema import SCHEMA_VERSION, upgrade_record
+from tupono.snapshot import pack_blobs, pack_strings, unpack_strings
+from tupono.storage import RecordStream
+
+# Define advocacy types and their typical/max durations in weeks
+ADVOCACY_TYPES = ["Family harm", "Sexual harm", "Mental health", "Oranga Tamariki", "MSD", "Housing"]
+
+# List of Kaimahi
+KAIMAHI_LIST = [
+    "Shonny", "Mervyn", "Te rangi", "Ben", "Piwi", "Arianna", "Melissa", "Tipene Mary"
+]
+# Enum codes for the categorical Participant fields
+KAIMAHI_CODES = {name: code for code, name in enumerate(KAIMAHI_LIST)}
+ADVOCACY_FLAGS = {advocacy_type: 1 << bit for bit, advocacy_type in enumerate(ADVOCACY_TYPES)}
+ADVOCACY_PHASES = ("none", "active", "completed")
+ADVOCACY_PHASE_CODES = {phase: code for code, phase in enumerate(ADVOCACY_PHASES)}
+# Durations: Min 6 months (~26 weeks), Max 4 years (~208 weeks)
+ADVOCACY_MIN_WEEKS = 26
+ADVOCACY_MAX_WEEKS = 208
+
+# 26-week program: Red weeks 1-6, Orange weeks 7-14, Green weeks 15-26
+PROGRAM_PHASES = [("red", 6), ("orange", 8), ("green", 12)]
+PROGRAM_TOTAL_WEEKS = sum(length for _, length in PROGRAM_PHASES)
+
+
+def _build_phase_table():
+    """Precompute (phase, weeks_completed) for every week since signup (0..26)"""
+    table = []
+    for phase, length in PROGRAM_PHASES:
+        table.extend((phase, week) for week in range(length))
+    table.append(("completed", PROGRAM_PHASES[-1][1]))
+    return tuple(table)
+
+
+# Lookup tables indexed by weeks since signup, clamped to the table length
+PHASE_BY_WEEK = _build_phase_table()
+PHASE_NAMES = ("red", "orange", "green", "completed")
+PHASE_CODES = {phase: code for code, phase in enumerate(PHASE_NAMES)}
+PHASE_CODE_BY_WEEK = np.array([PHASE_NAMES.index(phase) for phase, _ in PHASE_BY_WEEK], dtype=np.int8)
+WEEKS_COMPLETED_BY_WEEK = np.array([weeks for _, weeks in PHASE_BY_WEEK], dtype=np.int16)
+WEEKLY_PROGRESS_BY_WEEK = tuple(
+    tuple(PHASE_BY_WEEK[week][0] if week < elapsed else "" for week in range(PROGRAM_TOTAL_WEEKS))
+    for elapsed in range(PROGRAM_TOTAL_WEEKS + 1)
+)
+
+
+@lru_cache(maxsize=None)
+def advocacy_progress_view(active_weeks):
+    """Advocacy bar colour keys for a number of active weeks, built once on first use"""
+    return ("advocacy_active",) * active_weeks + ("",) * (ADVOCACY_MAX_WEEKS - active_weeks)
+
+
+@lru_cache(maxsize=None)
+def advocacy_types_for_flags(flags):
+    """Decode an advocacy bit mask into a tuple of advocacy types"""
+    return tuple(advocacy_type for advocacy_type, bit in ADVOCACY_FLAGS.items() if flags & bit)
+
+
+# Red phase weekly assessments before anything has been recorded
+DEFAULT_ASSESSMENTS = {week: {"score": 0, "notes": ""} for week in range(1, 7)}
+
+
+# DEFAULT_ASSESSMENTS as it appears in a saved record
+DEFAULT_ASSESSMENTS_RECORD = {str(week): assessment for week, assessment in DEFAULT_ASSESSMENTS.items()}
+
+
+def default_assessments():
+    return {week: dict(assessment) for week, assessment in DEFAULT_ASSESSMENTS.items()}
+
+
+def new_participant_id():
+    return uuid.uuid4().hex
+
+
+def intern_value(value):
+    """Share one copy of repeated strings (iwi, location, gender...) across participants"""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def parse_date(value):
+    """Parse a YYYY-MM-DD date, taking the fast ISO path when the string is zero-padded"""
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+def weeks_since(signup_date, as_of_date=None):
+    """Whole weeks between signup and the as-of date (negative if not started yet)"""
+    as_of_date = as_of_date or datetime.now().date()
+    return (as_of_date - signup_date).days // 7
+
+
+def phase_for_week(weeks_since_signup):
+    """Return (phase, weeks_completed) for a number of weeks since signup"""
+    index = min(max(weeks_since_signup, 0), PROGRAM_TOTAL_WEEKS)
+    return PHASE_BY_WEEK[index]
+
+
+# Participant fields ParticipantCollection keeps secondary indexes for
+INDEX_DIMENSIONS = ("kaimahi", "iwi", "gender", "phase", "program", "advocacy")
+
+
+# Source of ParticipantCollection.version: unique across collections, so a
+# version also tells a reloaded caseload from the one it replaced
+DATA_VERSIONS = itertools.count(1)
+
+
+# Edits since the last save: IDs changed (of which added), IDs deleted and
+# (ID, week) red phase assessments edited in place. rewrite means nothing has
+# been saved yet
+ChangeSet = namedtuple("ChangeSet", ["rewrite", "changed", "added", "deleted", "assessments"])
+
+class Participant:
+    """One participant, stored compactly so large caseloads stay small in memory.
+
+    Categorical fields are interned or enum-coded (phase, kaimahi, advocacy as bit
+    flags), the signup date is kept as an integer ordinal and the red phase
+    assessments are only allocated once something is recorded.
+    """
+
+    __slots__ = (
+        "participant_id", "name", "age", "gender", "location", "iwi", "hapu",
+        "signup_ordinal", "weeks_completed", "advocacy_weeks_completed",
+        "_programs", "_kaimahi_code", "_phase_code", "_advocacy_phase_code",
+        "_advocacy_flags", "_advocacy_extra", "_assessments", "_weeks_since_signup",
+    )
+
+    def __init__(self, name, age, gender, location, iwi, hapu, signup_date, advocacy=None, kaimahi=None,
+                 participant_id=None):
+        self.participant_id = participant_id or new_participant_id()  # Stable, persisted in the JSON
+        self.name = name
+        self.age = intern_value(age)
+        self.gender = intern_value(gender)
+        self.location = intern_value(location)
+        self.iwi = intern_value(iwi)
+        self.hapu = intern_value(hapu)
+        self.advocacy = advocacy if isinstance(advocacy, list) else []  # Always a list
+        self.kaimahi = kaimahi if kaimahi in KAIMAHI_LIST else None
+        self.signup_ordinal = parse_date(signup_date).toordinal()
+        self.phase = "red"  # red, orange, green, completed
+        self.weeks_completed = 0
+        self.programs = []  # Now supports multiple programs
+        self._weeks_since_signup = None  # Set by update_progress; drives the progress views
+
+        # === Advocacy Tracking Attributes ===
+        self.advocacy_phase = "active" if self._advocacy_flags or self._advocacy_extra else "none"
+        self.advocacy_weeks_completed = 0
+
+        self._assessments = None  # Default (unscored) assessments until one is recorded
+
+    # === Compact field accessors ===
+    @property
+    def signup_date(self):
+        return date.fromordinal(self.signup_ordinal)
+
+    @signup_date.setter
+    def signup_date(self, value):
+        self.signup_ordinal = value.toordinal()
+
+    @property
+    def phase(self):
+        return PHASE_NAMES[self._phase_code]
+
+    @phase.setter
+    def phase(self, value):
+        self._phase_code = PHASE_CODES.get(value, 0)
+
+    @property
+    def advocacy_phase(self):
+        return ADVOCACY_PHASES[self._advocacy_phase_code]
+
+    @advocacy_phase.setter
+    def advocacy_phase(self, value):
+        self._advocacy_phase_code = ADVOCACY_PHASE_CODES.get(value, 0)
+
+    @property
+    def kaimahi(self):
+        return KAIMAHI_LIST[self._kaimahi_code] if self._kaimahi_code >= 0 else None
+
+    @kaimahi.setter
+    def kaimahi(self, value):
+        self._kaimahi_code = KAIMAHI_CODES.get(value, -1)
+
+    @property
+    def programs(self):
+        return self._programs
+
+    @programs.setter
+    def programs(self, value):
+        self._programs = tuple(intern_value(program) for program in value) if value else ()
+
+    @property
+    def advocacy(self):
+        """Advocacy types as a list (known types in ADVOCACY_TYPES order, then any others)"""
+        selected = list(advocacy_types_for_flags(self._advocacy_flags))
+        if self._advocacy_extra:
+            selected.extend(self._advocacy_extra)
+        return selected
+
+    @advocacy.setter
+    def advocacy(self, value):
+        flags = 0
+        extra = []
+        for advocacy_type in value or []:
+            bit = ADVOCACY_FLAGS.get(advocacy_type)
+            if bit is not None:
+                flags |= bit
+            elif advocacy_type not in extra:
+                extra.append(intern_value(advocacy_type))
+        self._advocacy_flags = flags
+        self._advocacy_extra = tuple(extra) if extra else None
+
+    @property
+    def red_phase_assessments(self):
+        """Week number (1-6) -> {"score", "notes"[, "date_completed"]}, allocated on first use"""
+        if self._assessments is None:
+            self._assessments = default_assessments()
+        elif isinstance(self._assessments, bytes):
+            # Still the JSON text from a snapshot cache; parse it now it is needed
+            self._assessments = {int(week): value for week, value in json.loads(self._assessments).items()}
+        return self._assessments
+
+    @red_phase_assessments.setter
+    def red_phase_assessments(self, value):
+        self._assessments = None if value == DEFAULT_ASSESSMENTS else value
+
+    def update_progress(self, as_of_date=None):
+        """Work out phase and progress directly from signup date and as-of date (default today)"""
+        weeks_since_signup = weeks_since(self.signup_date, as_of_date)
+        phase, weeks_completed = phase_for_week(weeks_since_signup)
+        self.apply_progress(weeks_since_signup, phase, weeks_completed)
+
+    def apply_progress(self, weeks_since_signup, phase, weeks_completed):
+        """Store progress already worked out by update_progress or ParticipantCollection.refresh_progress"""
+        self._weeks_since_signup = weeks_since_signup
+
+        # --- Standard 26-Week Program Progress ---
+        self.phase = phase
+        self.weeks_completed = weeks_completed
+
+        # --- Long-Term Advocacy Progress (if applicable) ---
+        if self._advocacy_flags or self._advocacy_extra:
+            self.advocacy_phase = "active"
+            self.advocacy_weeks_completed = min(max(weeks_since_signup, 0), ADVOCACY_MAX_WEEKS)
+        else:
+            self.advocacy_phase = "none"
+            self.advocacy_weeks_completed = 0
+
+    @property
+    def weekly_progress(self):
+        """26-week colour keys ("red", "orange", "green" or "") derived from the last progress update"""
+        if self._weeks_since_signup is None:
+            return ()
+        elapsed = min(max(self._weeks_since_signup, 0), PROGRAM_TOTAL_WEEKS)
+        return WEEKLY_PROGRESS_BY_WEEK[elapsed]
+
+    @property
+    def advocacy_weekly_progress(self):
+        """Advocacy colour keys (up to 208 weeks) derived from the last progress update"""
+        if self._weeks_since_signup is None or not (self._advocacy_flags or self._advocacy_extra):
+            return ()
+        return advocacy_progress_view(self.advocacy_weeks_completed)
+
+    def to_dict(self):
+        return {
+            "schema_version": SCHEMA_VERSION,
+            "id": self.participant_id,
+            "name": self.name,
+            "age": self.age,
+            "gender": self.gender,
+            "location": self.location,
+            "iwi": self.iwi,
+            "hapu": self.hapu,
+            "signup_date": self.signup_date.strftime("%Y-%m-%d"),
+            "phase": self.phase,
+            "weeks_completed": self.weeks_completed,
+            "programs": list(self.programs),
+            "red_phase_assessments": (self.red_phase_assessments if self._assessments is not None
+                                      else default_assessments()),
+            "advocacy": self.advocacy,  # List of strings
+            "advocacy_phase": self.advocacy_phase,
+            "advocacy_weeks_completed": self.advocacy_weeks_completed,
+            "kaimahi": self.kaimahi
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a participant from a record; records from older files are upgraded first
+        (tupono.schema), current ones are read as they are"""
+        try:
+            if data.get("schema_version") != SCHEMA_VERSION:
+                data = upgrade_record(data)
+            participant = cls.__new__(cls)
+            participant.participant_id = data["id"]
+            participant.name = data["name"]
+            participant.age = intern_value(data["age"])
+            participant.gender = intern_value(data["gender"])
+            participant.location = intern_value(data["location"])
+            participant.iwi = intern_value(data["iwi"])
+            participant.hapu = intern_value(data["hapu"])
+            participant.signup_ordinal = date.fromisoformat(data["signup_date"]).toordinal()
+            participant.kaimahi = data["kaimahi"]
+            participant.advocacy = data["advocacy"]
+            participant.programs = data["programs"]
+            participant.phase = data["phase"]
+            participant.weeks_completed = data["weeks_completed"]
+            participant.advocacy_phase = data["advocacy_phase"]
+            participant.advocacy_weeks_completed = data["advocacy_weeks_completed"]
+            participant._weeks_since_signup = None
+            assessments = data["red_phase_assessments"]
+            if assessments == DEFAULT_ASSESSMENTS_RECORD:
+                participant._assessments = None
+            else:
+                participant.red_phase_assessments = {int(week): value for week, value in assessments.items()}
+            return participant
+        except Exception as e:
+            print(f"FAILED to create Participant: {e}")
+            raise
+
+    @classmethod
+    def from_snapshot(cls, participant_id, name, age, gender, location, iwi, hapu, signup_ordinal,
+                      kaimahi_code, advocacy_flags, advocacy_extra, programs, assessments):
+        """Rebuild a participant from snapshot cache fields, which are already in compact form.
+
+        assessments is the recorded assessments' JSON text (parsed on first use)
+        or None for defaults. Progress is left for refresh_progress to fill in.
+        """
+        participant = cls.__new__(cls)
+        participant.participant_id = participant_id
+        participant.name = name
+        participant.age = age
+        participant.gender = gender
+        participant.location = location
+        participant.iwi = iwi
+        participant.hapu = hapu
+        participant.signup_ordinal = signup_ordinal
+        participant.weeks_completed = 0
+        participant.advocacy_weeks_completed = 0
+        participant._programs = programs
+        participant._kaimahi_code = kaimahi_code
+        participant._phase_code = 0
+        participant._advocacy_flags = advocacy_flags
+        participant._advocacy_extra = advocacy_extra
+        participant._advocacy_phase_code = 1 if advocacy_flags or advocacy_extra else 0
+        participant._assessments = assessments
+        participant._weeks_since_signup = None
+        return participant
+
+
+def _with_room(values, count, dtype=None):
+    """values, or a copy of it with room for count entries (and/or a wider dtype).
+    Capacity doubles when it runs out, so appending one entry at a time costs
+    amortised O(1); callers keep the live length themselves."""
+    dtype = values.dtype if dtype is None else np.dtype(dtype)
+    if count <= len(values) and dtype == values.dtype:
+        return values
+    grown = np.empty(max(count, 2 * len(values)), dtype=dtype)
+    grown[:len(values)] = values
+    return grown
+
+
+class ParticipantView:
+    """Read-only sequence of participants picked out of a collection by position.
+
+    Built from a NumPy array of record positions so large search results are
+    not materialised as lists; valid until the collection next changes.
+    """
+
+    __slots__ = ("_items", "_positions")
+
+    def __init__(self, items, positions):
+        self._items = items
+        self._positions = positions
+
+    def __len__(self):
+        return len(self._positions)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._items[i] for i in self._positions[index].tolist()]
+        return self._items[self._positions[index]]
+
+    def __iter__(self):
+        items = self._items
+        return (items[i] for i in self._positions.tolist())
+
+
+class ParticipantSnapshot:
+    """The records of a ParticipantCollection at one moment, for reading on another thread.
+
+    Only the list and ID map are copied; the Participant objects are shared.
+    """
+
+    __slots__ = ("_items", "_by_id")
+
+    def __init__(self, items, by_id):
+        self._items = items
+        self._by_id = by_id
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, participant_id):
+        return participant_id in self._by_id
+
+    def get(self, participant_id):
+        return self._by_id.get(participant_id)
+
+
+class ParticipantCollection:
+    """All participants, indexed by participant ID, with signup dates kept as a
+    NumPy ordinal array for batch updates.
+
+    Records are looked up, replaced and removed by ID in O(1); removal swaps the
+    last record into the freed slot, so iteration order is not signup order
+    (use sorted views for display).
+
+    Secondary indexes (dimension -> value -> set of participant IDs) are kept
+    up to date on every change, so counts and filtered lists for kaimahi, iwi,
+    gender, phase, program and advocacy type never rescan the caseload.
+    Participants with no program or no advocacy are indexed under None.
+
+    Edits made through the collection are recorded as a ChangeSet so storage
+    backends can write only what changed (see pending_changes()), and each
+    one moves version on, so caches of anything derived from the caseload
+    (statistics, charts) can tell when they are stale.
+
+    search() serves the participants search box from columnar search arrays
+    aligned with the records (lowercased names plus iwi, location and phase
+    codes), scanned with NumPy string operations. When the new term extends
+    the previous one only the previous matches are rescanned.
+    """
+
+    def __init__(self, participants=None):
+        self._items = []
+        self._by_id = {}  # participant_id -> Participant
+        self._positions = {}  # participant_id -> index in _items
+        self._indexes = {dimension: {} for dimension in INDEX_DIMENSIONS}
+        # Signup ordinals and search columns are built on first use, then kept in step
+        # with edits in arrays with spare capacity (only the first len(self) entries are live)
+        self._signup_ordinals = None
+        self._search_columns = None
+        # Positions in signup order (stable) and their ordinals, kept sorted through edits
+        self._signup_order = None
+        self._sorted_ordinals = None
+        self._search_values = {"iwi": {}, "location": {}}  # lowercased value -> code
+        self._last_search = None  # (term, matching positions) for incremental narrowing
+        self._changed = set()  # IDs added or edited since the last save
+        self._added = set()  # IDs added since the last save
+        self._deleted = set()  # IDs removed since the last save
+        self._assessments = set()  # (ID, week) assessments edited since the last save
+        self._rewrite = True  # A new collection has never been saved as a whole
+        self._reassigned = False  # A record added under a taken ID was given a new one
+        self.as_of_date = None  # Date progress was last recomputed for
+        self.version = next(DATA_VERSIONS)  # Changes on every edit
+        for participant in participants or []:
+            self.add(participant)
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __getitem__(self, index):
+        return self._items[index]
+
+    def __contains__(self, participant_id):
+        return participant_id in self._by_id
+
+    def get(self, participant_id):
+        return self._by_id.get(participant_id)
+
+    def add(self, participant):
+        if participant.participant_id in self._by_id:
+            # Duplicated record (e.g. copied in an imported file) - give it its own identity
+            participant.participant_id = new_participant_id()
+            self._reassigned = True
+        position = len(self._items)
+        self._positions[participant.participant_id] = position
+        self._by_id[participant.participant_id] = participant
+        self._items.append(participant)
+        self._index(participant)
+        self._changed.add(participant.participant_id)
+        self._added.add(participant.participant_id)
+        self._deleted.discard(participant.participant_id)
+        self.version = next(DATA_VERSIONS)
+        if self._signup_ordinals is not None:
+            self._signup_ordinals = _with_room(self._signup_ordinals, position + 1)
+            self._signup_ordinals[position] = participant.signup_ordinal
+        if self._signup_order is not None:
+            self._order_insert(position, participant.signup_ordinal)
+        if self._search_columns is not None:
+            self._store_search_row(position, participant)
+        self._last_search = None
+
+    def replace(self, participant):
+        """Swap in a new version of an existing record (matched on participant_id)"""
+        position = self._positions[participant.participant_id]
+        self._unindex(self._items[position])
+        self._items[position] = participant
+        self._by_id[participant.participant_id] = participant
+        self._index(participant)
+        self._changed.add(participant.participant_id)
+        self.version = next(DATA_VERSIONS)
+        if self._signup_ordinals is not None:
+            previous = int(self._signup_ordinals[position])
+            self._signup_ordinals[position] = participant.signup_ordinal
+            if self._signup_order is not None and previous != participant.signup_ordinal:
+                self._order_remove(position, previous)
+                self._order_insert(position, participant.signup_ordinal)
+        if self._search_columns is not None:
+            self._store_search_row(position, participant)
+        self._last_search = None
+
+    def remove(self, participant_id):
+        """Remove a record by ID, moving the last record into its slot"""
+        position = self._positions.pop(participant_id)
+        self._unindex(self._by_id.pop(participant_id))
+        self._changed.discard(participant_id)
+        self._added.discard(participant_id)
+        self._deleted.add(participant_id)
+        self._assessments = {key for key in self._assessments if key[0] != participant_id}
+        self.version = next(DATA_VERSIONS)
+        last = self._items.pop()
+        count = len(self._items)  # The last record's old position
+        if self._signup_order is not None:
+            self._order_remove(position, int(self._signup_ordinals[position]))
+            if position < count:
+                # The last record moves to position, which decides its place among same-day signups
+                self._order_remove(count, int(self._signup_ordinals[count]))
+                self._order_insert(position, int(self._signup_ordinals[count]))
+        if position < count:
+            self._items[position] = last
+            self._positions[last.participant_id] = position
+            if self._signup_ordinals is not None:
+                self._signup_ordinals[position] = self._signup_ordinals[count]
+            if self._search_columns is not None:
+                for values in self._search_columns.values():
+                    values[position] = values[count]
+        self._last_search = None
+
+    def set_programs(self, participant_id, programs):
+        """Change a participant's programs in place, keeping the program index current"""
+        participant = self._by_id[participant_id]
+        self._unindex(participant, ("program",))
+        participant.programs = programs
+        self._index(participant, ("program",))
+        self._changed.add(participant_id)
+        self.version = next(DATA_VERSIONS)
+
+    # === Change tracking ===
+    def mark_changed(self, participant_id):
+        """Record an in-place edit to a participant for the next save"""
+        self._changed.add(participant_id)
+        self.version = next(DATA_VERSIONS)
+
+    def mark_assessment(self, participant_id, week):
+        """Record an in-place edit to one red phase assessment for the next save"""
+        self._assessments.add((participant_id, week))
+        self.version = next(DATA_VERSIONS)
+
+    def pending_changes(self):
+        """ChangeSet of everything edited since the last save"""
+        return ChangeSet(
+            self._rewrite,
+            frozenset(self._changed),
+            frozenset(self._added),
+            frozenset(self._deleted),
+            frozenset(self._assessments)
+        )
+
+    def clear_changes(self, changes):
+        """Forget changes once they have been saved; later edits stay pending"""
+        if changes.rewrite:
+            self._rewrite = False
+        self._changed -= changes.changed
+        self._added -= changes.added
+        self._deleted -= changes.deleted
+        self._assessments -= changes.assessments
+
+    def take_changes(self):
+        """pending_changes(), cleared straight away (the caller owns saving them)"""
+        changes = self.pending_changes()
+        self.clear_changes(changes)
+        return changes
+
+    def mark_saved(self):
+        """Everything held now matches storage (e.g. just loaded from it).
+
+        Records given a new ID because theirs was taken are the exception:
+        storage only has them under the old ID, and journal entries written
+        under the new one would load as a second record. So then the next
+        save still rewrites everything.
+        """
+        self.take_changes()
+        if self._reassigned:
+            self._rewrite = True
+            self._reassigned = False
+
+    def snapshot(self):
+        """A ParticipantSnapshot that a save thread can read while edits carry on"""
+        return ParticipantSnapshot(list(self._items), dict(self._by_id))
+
+    # === Secondary indexes ===
+    @staticmethod
+    def _index_keys(participant, dimension):
+        if dimension == "program":
+            return participant.programs or (None,)
+        if dimension == "advocacy":
+            return participant.advocacy or (None,)
+        return (getattr(participant, dimension),)
+
+    def _index(self, participant, dimensions=INDEX_DIMENSIONS):
+        for dimension in dimensions:
+            index = self._indexes[dimension]
+            for key in self._index_keys(participant, dimension):
+                index.setdefault(key, set()).add(participant.participant_id)
+
+    def _unindex(self, participant, dimensions=INDEX_DIMENSIONS):
+        for dimension in dimensions:
+            index = self._indexes[dimension]
+            for key in self._index_keys(participant, dimension):
+                ids = index.get(key)
+                if ids is not None:
+                    ids.discard(participant.participant_id)
+                    if not ids:
+                        del index[key]
+
+    def ids(self, dimension, value):
+        """IDs of participants with this value (treat the returned set as read-only)"""
+        return self._indexes[dimension].get(value, frozenset())
+
+    def ids_with_any(self, dimension):
+        """IDs of participants with at least one non-empty value, e.g. any advocacy"""
+        return set().union(*(ids for key, ids in self._indexes[dimension].items() if key is not None))
+
+    def positions(self, participant_ids):
+        """Record positions (an int array, aligned with signup_ordinals()) for these IDs"""
+        positions = self._positions
+        return np.fromiter((positions[participant_id] for participant_id in participant_ids),
+                           dtype=np.intp, count=len(participant_ids))
+
+    def partition(self, dimension, values):
+        """{value: ParticipantCollection} of the participants with each value, taken
+        straight from the index and kept in record order.
+
+        The groups share this collection's Participant objects (treat them as
+        read-only) and its as_of_date; a participant is in every group it has
+        a value for (e.g. each of their programs).
+        """
+        positions = self._positions
+        groups = {}
+        for value in values:
+            group = ParticipantCollection(self._by_id[participant_id] for participant_id in
+                                          sorted(self.ids(dimension, value), key=positions.__getitem__))
+            group.as_of_date = self.as_of_date
+            groups[value] = group
+        return groups
+
+    def count(self, dimension, value):
+        return len(self._indexes[dimension].get(value, ()))
+
+    def counts(self, dimension, values=None):
+        """value -> count, for the given values (in that order) or every indexed value"""
+        index = self._indexes[dimension]
+        if values is None:
+            return {key: len(ids) for key, ids in index.items()}
+        return {value: len(index.get(value, ())) for value in values}
+
+    def cross_counts(self, row_dimension, row_values, column_dimension):
+        """{row value: {column value: count}} from index intersections (None = no value)"""
+        columns = self._indexes[column_dimension]
+        table = {}
+        for row_value in row_values:
+            row_ids = self.ids(row_dimension, row_value)
+            table[row_value] = {column: len(row_ids & ids) for column, ids in columns.items()}
+        return table
+
+    # === Search ===
+    def _search_code(self, dimension, value):
+        codes = self._search_values[dimension]
+        return codes.setdefault(value.lower(), len(codes))
+
+    def _search_row(self, participant):
+        return {
+            "name": participant.name.lower(),
+            "iwi": self._search_code("iwi", participant.iwi),
+            "location": self._search_code("location", participant.location),
+            "phase": participant._phase_code,
+        }
+
+    def _store_search_row(self, position, participant):
+        """Write a participant's row into the search columns, making room (or a wider
+        name column) first if needed"""
+        count = len(self._items)
+        for column, value in self._search_row(participant).items():
+            values = self._search_columns[column]
+            dtype = None
+            if column == "name" and len(value) > values.itemsize // 4:  # 4 bytes per character
+                dtype = f"<U{len(value)}"
+            values = self._search_columns[column] = _with_room(values, count, dtype)
+            values[position] = value
+
+    def search_columns(self):
+        """Lowercased names and iwi/location/phase codes as arrays aligned with the records"""
+        count = len(self._items)
+        if self._search_columns is None:
+            rows = [self._search_row(p) for p in self._items]
+            self._search_columns = {
+                "name": np.array([row["name"] for row in rows] or [""], dtype=str),
+                "iwi": np.fromiter((row["iwi"] for row in rows), dtype=np.int32, count=count),
+                "location": np.fromiter((row["location"] for row in rows), dtype=np.int32, count=count),
+                "phase": np.fromiter((row["phase"] for row in rows), dtype=np.int8, count=count),
+            }
+        return {column: values[:count] for column, values in self._search_columns.items()}
+
+    def search(self, term):
+        """Participants whose name, iwi, location or phase contains term
+        (case-insensitive), in signup date order, as a ParticipantView"""
+        if not term:
+            return ParticipantView(self._items, self.signup_order())
+        term = term.lower()
+        columns = self.search_columns()
+        last = self._last_search
+        # Typing one more character can only drop records from the previous matches;
+        # rescan just those unless they are most of the caseload anyway
+        narrowing = last is not None and last[0] in term and len(last[1]) * 2 < len(self._items)
+        if narrowing:
+            positions = last[1]
+            columns = {column: values[positions] for column, values in columns.items()}
+
+        matched = np.char.find(columns["name"], term) >= 0
+        for column, codes in (("iwi", self._search_values["iwi"]),
+                              ("location", self._search_values["location"]),
+                              ("phase", PHASE_CODES)):
+            hits = [code for value, code in codes.items() if term in value]
+            if hits:
+                matched |= np.isin(columns[column], hits)
+
+        if narrowing:
+            matches = positions[matched]
+        else:
+            order = self.signup_order()
+            matches = order[matched[order]]
+        self._last_search = (term, matches)
+        return ParticipantView(self._items, matches)
+
+    def has_name(self, name):
+        """True if a participant already has this name (case-insensitive)"""
+        return bool(np.any(self.search_columns()["name"] == name.lower()))
+
+    def signup_ordinals(self):
+        """Signup dates as an int64 array of proleptic Gregorian ordinals"""
+        if self._signup_ordinals is None:
+            self._signup_ordinals = np.fromiter(
+                (p.signup_ordinal for p in self._items),
+                dtype=np.int64,
+                count=len(self._items)
+            )
+        return self._signup_ordinals[:len(self._items)]
+
+    def signup_order(self):
+        """Record positions sorted by signup date (stable, like sorted() on the records).
+
+        Sorted once, then kept in order through edits by binary search, so a
+        search after an edit doesn't sort the caseload again.
+        """
+        if self._signup_order is None:
+            ordinals = self.signup_ordinals()
+            self._signup_order = np.argsort(ordinals, kind="stable")
+            self._sorted_ordinals = ordinals[self._signup_order]
+        return self._signup_order
+
+    def _order_slot(self, position, ordinal):
+        """Where position goes in the signup order: after earlier signups, and by
+        position among those on the same day (as the stable sort has them)"""
+        start = np.searchsorted(self._sorted_ordinals, ordinal, side="left")
+        end = np.searchsorted(self._sorted_ordinals, ordinal, side="right")
+        return start + int(np.searchsorted(self._signup_order[start:end], position))
+
+    def _order_insert(self, position, ordinal):
+        slot = self._order_slot(position, ordinal)
+        self._signup_order = np.insert(self._signup_order, slot, position)
+        self._sorted_ordinals = np.insert(self._sorted_ordinals, slot, ordinal)
+
+    def _order_remove(self, position, ordinal):
+        slot = self._order_slot(position, ordinal)
+        self._signup_order = np.delete(self._signup_order, slot)
+        self._sorted_ordinals = np.delete(self._sorted_ordinals, slot)
+
+    def refresh_progress(self, as_of_date=None):
+        """Recompute phase, week and advocacy weeks for every participant in one vectorized pass"""
+        as_of_date = as_of_date or datetime.now().date()
+        weeks = (as_of_date.toordinal() - self.signup_ordinals()) // 7
+        elapsed = np.clip(weeks, 0, PROGRAM_TOTAL_WEEKS)
+        phase_codes = PHASE_CODE_BY_WEEK[elapsed]
+        weeks_completed = WEEKS_COMPLETED_BY_WEEK[elapsed]
+
+        phase_index = {}
+        for participant, week, code, completed in zip(
+            self._items, weeks.tolist(), phase_codes.tolist(), weeks_completed.tolist()
+        ):
+            participant.apply_progress(week, PHASE_NAMES[code], completed)
+            phase_index.setdefault(PHASE_NAMES[code], set()).add(participant.participant_id)
+        self._indexes["phase"] = phase_index
+        if self._search_columns is not None:
+            self._search_columns["phase"][:len(self._items)] = phase_codes
+        self._last_search = None
+        self.as_of_date = as_of_date
+        self.version = next(DATA_VERSIONS)
+
+    def needs_refresh(self, as_of_date=None):
+        """True if progress was last computed for a different day"""
+        return self.as_of_date != (as_of_date or datetime.now().date())
+
+# What a participants list row needs, for rows shown before the Participants are built
+ListRow = namedtuple("ListRow", ["name", "age", "gender", "phase", "programs"])
+
+
+def snapshot_columns(participants):
+    """Arrays for a SnapshotCache (tupono.snapshot) of these participants.
+
+    Text (IDs, names, categories, programs, advocacy extras) goes into one
+    string table referenced by index; per-participant lists are offsets into
+    flat arrays. Recorded assessments are kept as JSON text, so loading the
+    snapshot never parses them.
+    """
+    strings = {}
+    text_columns = {column: [] for column in ("id", "name", "age", "gender", "location", "iwi", "hapu")}
+    signup_ordinals, kaimahi_codes, advocacy_flags = [], [], []
+    programs, program_ends, extras, extra_ends, assessments = [], [], [], [], []
+
+    for p in participants:
+        for column, value in (("id", p.participant_id), ("name", p.name), ("age", p.age),
+                              ("gender", p.gender), ("location", p.location), ("iwi", p.iwi),
+                              ("hapu", p.hapu)):
+            text_columns[column].append(strings.setdefault(str(value), len(strings)))
+        signup_ordinals.append(p.signup_ordinal)
+        kaimahi_codes.append(p._kaimahi_code)
+        advocacy_flags.append(p._advocacy_flags)
+        programs.extend(strings.setdefault(program, len(strings)) for program in p._programs)
+        program_ends.append(len(programs))
+        extras.extend(strings.setdefault(extra, len(strings)) for extra in p._advocacy_extra or ())
+        extra_ends.append(len(extras))
+        if p._assessments is None:
+            assessments.append(b"")
+        elif isinstance(p._assessments, bytes):
+            assessments.append(p._assessments)
+        else:
+            assessments.append(json.dumps(p._assessments, separators=(",", ":")).encode("utf-8"))
+
+    string_offsets, string_data = pack_strings(list(strings))
+    assessment_offsets, assessment_data = pack_blobs(assessments)
+    arrays = {column: np.array(refs, dtype=np.uint32) for column, refs in text_columns.items()}
+    arrays.update({
+        "signup_ordinal": np.array(signup_ordinals, dtype=np.int32),
+        "kaimahi": np.array(kaimahi_codes, dtype=np.int8),
+        "advocacy_flags": np.array(advocacy_flags, dtype=np.uint8),
+        "program_ends": np.array(program_ends, dtype=np.uint32),
+        "programs": np.array(programs, dtype=np.uint32),
+        "advocacy_extra_ends": np.array(extra_ends, dtype=np.uint32),
+        "advocacy_extra": np.array(extras, dtype=np.uint32),
+        "assessment_offsets": assessment_offsets,
+        "assessments": assessment_data,
+        "string_offsets": string_offsets,
+        "strings": string_data,
+    })
+    return arrays
+
+
+def snapshot_strings(columns):
+    """The string table of snapshot columns, with the shared categorical values interned"""
+    strings = unpack_strings(columns["string_offsets"], columns["strings"])
+    for column in ("age", "gender", "location", "iwi", "hapu", "programs", "advocacy_extra"):
+        for ref in np.unique(columns[column]).tolist():
+            strings[ref] = sys.intern(strings[ref])
+    return strings
+
+
+def _snapshot_lists(strings, refs, ends):
+    """Per-participant tuples of strings from flat string refs and end offsets; equal tuples are shared"""
+    refs = refs.tolist()
+    shared = {}
+    lists = []
+    start = 0
+    for end in ends.tolist():
+        key = tuple(refs[start:end])
+        value = shared.get(key)
+        if value is None:
+            value = shared[key] = tuple(strings[ref] for ref in key)
+        lists.append(value)
+        start = end
+    return lists
+
+
+def preview_list_rows(signup_ordinals, names, ages, genders, programs, as_of_date=None):
+    """ListRows in signup order from per-participant fields, for showing the
+    list before the Participants have been built.
+
+    signup_ordinals is a NumPy array, the other fields are aligned lists.
+    """
+    as_of_date = as_of_date or datetime.now().date()
+    order = np.argsort(signup_ordinals, kind="stable")
+    elapsed = np.clip((as_of_date.toordinal() - signup_ordinals[order]) // 7, 0, PROGRAM_TOTAL_WEEKS)
+    orange = PHASE_CODES["orange"]
+    return [
+        ListRow(names[i], ages[i], genders[i], PHASE_NAMES[code], programs[i] if code == orange else ())
+        for i, code in zip(order.tolist(), PHASE_CODE_BY_WEEK[elapsed].tolist())
+    ]
+
+
+def snapshot_list_rows(columns, strings, as_of_date=None):
+    """preview_list_rows() straight from snapshot columns"""
+    names, ages, genders = ([strings[ref] for ref in columns[column].tolist()]
+                            for column in ("name", "age", "gender"))
+    return preview_list_rows(
+        columns["signup_ordinal"].astype(np.int64), names, ages, genders,
+        _snapshot_lists(strings, columns["programs"], columns["program_ends"]), as_of_date
+    )
+
+
+def manifest_list_rows(rows, as_of_date=None):
+    """preview_list_rows() from the list rows a storage backend read up front (RecordStream.rows)"""
+    rows = list(rows)
+    return preview_list_rows(
+        np.fromiter((parse_date(row[3]).toordinal() for row in rows), dtype=np.int64, count=len(rows)),
+        [row[0] for row in rows], [row[1] for row in rows], [row[2] for row in rows],
+        [tuple(row[4]) for row in rows], as_of_date
+    )
+
+
+def snapshot_participants(columns, strings):
+    """Participants built from snapshot columns, as a RecordStream (for import_records)"""
+    count = len(columns["signup_ordinal"])
+    position = [0]
+
+    def records():
+        # Nothing is decoded until the first batch is asked for, so the list preview shows first
+        text = [
+            [strings[ref] for ref in columns[column].tolist()]
+            for column in ("id", "name", "age", "gender", "location", "iwi", "hapu")
+        ]
+        programs = _snapshot_lists(strings, columns["programs"], columns["program_ends"])
+        extras = _snapshot_lists(strings, columns["advocacy_extra"], columns["advocacy_extra_ends"])
+        offsets = columns["assessment_offsets"].tolist()
+        assessments = columns["assessments"].tobytes()
+        for i, fields in enumerate(zip(
+            *text, columns["signup_ordinal"].tolist(), columns["kaimahi"].tolist(),
+            columns["advocacy_flags"].tolist(), extras, programs
+        )):
+            position[0] = i
+            start, end = offsets[i], offsets[i + 1]
+            yield Participant.from_snapshot(
+                *fields[:-2], fields[-2] or None, fields[-1], assessments[start:end] if end > start else None
+            )
+
+    return RecordStream(records(), lambda: position[0] / count if count else 1.0)
@@ -0,0 +1,522 @@
+"""
+Report charts and the full PDF report, built without a GUI
+
+Charts are matplotlib Figure objects created directly (not through pyplot),
+so they render with Agg and nothing here needs a display or imports tkinter.
+Each chart is a ChartSpec (a draw function plus its size and options) drawn
+from a CaseloadStats. The Tk statistics window and the PDF report show them
+as PNG images, which a ChartCache keeps per data version so unchanged charts
+are never rendered twice.
+
+Specs and stats pickle, so render_pngs() can draw a batch of charts in
+separate processes on the Agg backend; PDF export uses it to render its
+charts in parallel, and write_batch_reports() to write one report per
+kaimahi or program (from stats.group_stats()) side by side. ReportExport runs either on a background
+thread, reporting progress and taking a cancel request from the UI.
+"""
+
+import io
+import multiprocessing
+import os
+import queue
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from collections import OrderedDict, namedtuple
+from contextlib import closing
+from datetime import datetime
+
+import numpy as np
+from fpdf import FPDF
+from matplotlib.figure import Figure
+
+DURATION_COLORS = ['#FFB347', '#FF8C00', '#E53935', '#B71C1C', '#5D4037']
+ADVOCACY_COLORS = ['#5D4037', '#BDBDBD']
+
+# Figure.dpi default: what the statistics window shows charts at
+SCREEN_DPI = 100
+PRINT_DPI = 300
+# PDF export profiles: the dpi charts are embedded at
+EXPORT_PROFILES = {"screen": SCREEN_DPI, "print": PRINT_DPI}
+DEFAULT_EXPORT_PROFILE = "print"
+# Rendered PNGs kept by a ChartCache by default
+CHART_CACHE_BYTES = 64 * 1024 * 1024
+FULL_REPORT_TITLE = "Tu Pono IP - Full Report"
+# The summary write_batch_reports() puts beside the reports
+BATCH_INDEX_NAME = "index.pdf"
+
+
+def draw_pie(ax, counts, title, empty_label="No Data", colors=None):
+    """Pie of a {label: count} dict, or a single placeholder slice when every count is 0"""
+    values = list(counts.values())
+    labels = list(counts.keys())
+    if sum(values) == 0:
+        values = [1]
+        labels = [empty_label]
+        autopct = None
+    else:
+        autopct = '%1.1f%%'
+    ax.pie(values, labels=labels, autopct=autopct, colors=colors, startangle=90)
+    ax.axis('equal')
+    if title:
+        ax.set_title(title)
+
+
+def draw_stacked_bars(ax, table, programs, title):
+    """Stacked bars from CaseloadStats.program_by_gender, one colour per program"""
+    genders = list(table)
+    bottom = np.zeros(len(genders))
+    for program in programs:
+        values = np.array([table[gender][program] for gender in genders])
+        ax.bar(genders, values, bottom=bottom, label=program)
+        bottom += values
+    ax.tick_params(axis='x', rotation=90)
+    ax.set_title(title)
+    ax.set_ylabel("Count")
+    ax.legend(title="Program")
+
+
+# === Charts: draw(fig, stats, **options) ===
+def program_chart(fig, stats, title=None):
+    draw_pie(fig.subplots(), stats.programs, title, empty_label="No Programs Assigned")
+
+
+def gender_chart(fig, stats, title=None):
+    draw_pie(fig.subplots(), stats.genders, title)
+
+
+def iwi_chart(fig, stats, title=None):
+    draw_pie(fig.subplots(), stats.iwi, title)
+
+
+def program_by_gender_chart(fig, stats):
+    draw_stacked_bars(fig.subplots(), stats.program_by_gender, stats.gender_programs,
+                      "Program Participation by Gender")
+
+
+def advocacy_chart(fig, stats):
+    draw_pie(fig.subplots(), stats.advocacy, "Participants with Advocacy", colors=ADVOCACY_COLORS)
+
+
+def advocacy_type_chart(fig, stats, compact=False):
+    """Bars per advocacy type; compact (the statistics window) abbreviates Oranga Tamariki
+    and leaves off the value labels"""
+    ax = fig.subplots()
+    types = list(stats.advocacy_types.keys())
+    if compact:
+        # Use 'OT' instead of 'Oranga Tamariki' for label clarity
+        types = [t if t != 'Oranga Tamariki' else 'OT' for t in types]
+    bars = ax.bar(types, list(stats.advocacy_types.values()), color='#5D4037')
+    ax.set_title("Advocacy Type Distribution")
+    ax.set_ylabel("Number of Participants")
+    if compact:
+        ax.tick_params(axis='x', rotation=30, labelsize=11)
+        ax.margins(x=0.05)
+        fig.tight_layout()
+        return
+    ax.tick_params(axis='x', rotation=45)
+    for bar in bars:
+        height = bar.get_height()
+        ax.annotate(f'{int(height)}',
+                    xy=(bar.get_x() + bar.get_width() / 2, height),
+                    xytext=(0, 3),
+                    textcoords="offset points",
+                    ha='center', va='bottom', fontsize=10)
+
+
+def advocacy_duration_chart(fig, stats):
+    draw_pie(fig.subplots(), stats.advocacy_durations, "Advocacy Duration Distribution",
+             empty_label="No Advocacy Participants", colors=DURATION_COLORS)
+
+
+# chart_id is unique per variant (it keys the ChartCache); requires names a
+# CaseloadStats field that must be non-empty for the chart to be drawn
+ChartSpec = namedtuple("ChartSpec", ["chart_id", "draw", "figsize", "options", "requires"], defaults=({}, None))
+
+# The full report: PDF page heading -> chart
+REPORT_CHARTS = {
+    "Program Distribution": ChartSpec("report.programs", program_chart, (8, 6), {"title": "Program Distribution"}),
+    "Gender Distribution": ChartSpec("report.genders", gender_chart, (8, 6), {"title": "Gender Distribution"}),
+    "Iwi Affiliation": ChartSpec("report.iwi", iwi_chart, (8, 6), {"title": "Iwi Affiliation"}),
+    "Program by Gender": ChartSpec("report.program_by_gender", program_by_gender_chart, (10, 6),
+                                   requires="program_by_gender"),
+    "Advocacy: With vs Without": ChartSpec("report.advocacy", advocacy_chart, (6, 6)),
+    "Advocacy: By Type": ChartSpec("report.advocacy_types", advocacy_type_chart, (8, 6)),
+    "Advocacy: Duration": ChartSpec("report.advocacy_durations", advocacy_duration_chart, (6, 6)),
+}
+# Charts the full PDF report leaves out
+PDF_EXCLUDED_CHARTS = ("Advocacy: Duration",)
+
+# The statistics window: tab title -> charts shown in it, top to bottom
+STATISTICS_CHARTS = {
+    "Program Distribution": [ChartSpec("window.programs", program_chart, (5, 4))],
+    "Gender Distribution": [ChartSpec("window.genders", gender_chart, (5, 4))],
+    "Program by Gender": [ChartSpec("window.program_by_gender", program_by_gender_chart, (8, 6),
+                                    requires="program_by_gender")],
+    "Iwi Distribution": [ChartSpec("window.iwi", iwi_chart, (8, 6), {"title": "Participants by Iwi Affiliation"})],
+    "Advocacy Distribution": [
+        ChartSpec("window.advocacy", advocacy_chart, (5, 4)),
+        ChartSpec("window.advocacy_types", advocacy_type_chart, (10, 5), {"compact": True}),
+        ChartSpec("window.advocacy_durations", advocacy_duration_chart, (5, 4)),
+    ],
+}
+
+
+def chart_has_data(spec, stats):
+    return spec.requires is None or bool(getattr(stats, spec.requires))
+
+
+def render_chart(spec, stats):
+    """The chart as a Figure"""
+    fig = Figure(figsize=spec.figsize)
+    spec.draw(fig, stats, **spec.options)
+    return fig
+
+
+def render_png(spec, stats, dpi):
+    """The chart as PNG bytes"""
+    buffer = io.BytesIO()
+    render_chart(spec, stats).savefig(buffer, format="png", dpi=dpi, bbox_inches='tight')
+    return buffer.getvalue()
+
+
+class ChartCache:
+    """Rendered chart PNGs keyed by (chart id, data version, size, dpi), least
+    recently used dropped first once they add up to more than max_bytes.
+
+    The data version is CaseloadStats.version, which changes with every edit
+    to the caseload, so a hit is always current. Storing a chart drops its
+    older versions at the same size and dpi straight away. Safe to share
+    between threads; rendering happens outside the lock.
+    """
+
+    def __init__(self, max_bytes=CHART_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._pngs = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._pngs)
+
+    @staticmethod
+    def key(spec, stats, dpi):
+        return (spec.chart_id, stats.version, spec.figsize, dpi)
+
+    def get(self, spec, stats, dpi):
+        """The cached PNG bytes for this data version, or None"""
+        key = self.key(spec, stats, dpi)
+        with self._lock:
+            png = self._pngs.get(key)
+            if png is None:
+                self.misses += 1
+                return None
+            self._pngs.move_to_end(key)
+            self.hits += 1
+            return png
+
+    def png(self, spec, stats, dpi):
+        """The chart's PNG bytes, rendered only if not cached for this data version"""
+        png = self.get(spec, stats, dpi)
+        if png is None:
+            png = render_png(spec, stats, dpi)
+            self.put(spec, stats, dpi, png)
+        return png
+
+    def put(self, spec, stats, dpi, png):
+        chart_id, version, figsize, dpi = key = self.key(spec, stats, dpi)
+        with self._lock:
+            for old_key in [k for k in self._pngs
+                            if k[0] == chart_id and k[1] < version and k[2:] == (figsize, dpi)]:
+                self._bytes -= len(self._pngs.pop(old_key))
+            self._pngs[key] = png
+            self._bytes += len(png)
+            while self._bytes > self.max_bytes and len(self._pngs) > 1:
+                _, evicted = self._pngs.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._pngs.clear()
+            self._bytes = 0
+
+
+_in_render_process = False
+
+
+def _init_render_process():
+    global _in_render_process
+    import matplotlib
+    matplotlib.use("Agg")  # Never a GUI backend in a rendering process
+    _in_render_process = True  # Work sent here runs serially, never in a pool of its own
+
+
+_render_pool = None
+_render_pool_lock = threading.Lock()
+
+
+def render_pool():
+    """The shared rendering process pool, one worker per CPU, started on first
+    use and kept for later exports (starting workers costs more than
+    rendering a chart)"""
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is None:
+            # spawn on every platform: forking a process that is running Tk is unsafe
+            _render_pool = ProcessPoolExecutor(max_workers=os.cpu_count(),
+                                               mp_context=multiprocessing.get_context("spawn"),
+                                               initializer=_init_render_process)
+        return _render_pool
+
+
+def discard_render_pool():
+    """Shut the shared pool down (a new one starts on next use)"""
+    global _render_pool
+    with _render_pool_lock:
+        pool, _render_pool = _render_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def iter_in_pool(function, jobs, parallel=None):
+    """function(*job) for each job (a tuple of picklable arguments; function
+    must be module-level), yielded in order as each is ready.
+
+    Run in the shared process pool when parallel (by default: more than one
+    job, more than one CPU, and not already in a pool process), in this
+    process otherwise or if the pool has broken. Closing the iterator early
+    cancels the jobs not yet started.
+    """
+    jobs = list(jobs)
+    if parallel is None:
+        parallel = len(jobs) > 1 and (os.cpu_count() or 1) > 1 and not _in_render_process
+    done = 0
+    if parallel:
+        futures = []
+        try:
+            pool = render_pool()
+            futures = [pool.submit(function, *job) for job in jobs]
+            for future in futures:
+                yield future.result()
+                done += 1
+        except BrokenProcessPool as e:
+            print(f"Rendering processes failed ({e}); continuing here instead")
+            discard_render_pool()
+        finally:
+            for future in futures:
+                future.cancel()
+    for job in jobs[done:]:
+        yield function(*job)
+
+
+def iter_pngs(jobs, parallel=None):
+    """PNG bytes for each (spec, stats, dpi) in jobs, yielded in order as each is ready (see iter_in_pool)"""
+    return iter_in_pool(render_png, jobs, parallel)
+
+
+def render_pngs(jobs, parallel=None):
+    """PNG bytes for each (spec, stats, dpi) in jobs, in order"""
+    return list(iter_pngs(jobs, parallel))
+
+
+def report_charts(stats):
+    """The full report's charts for a CaseloadStats, as {heading: Figure} in report order"""
+    return {heading: render_chart(spec, stats)
+            for heading, spec in REPORT_CHARTS.items() if chart_has_data(spec, stats)}
+
+
+def report_specs(stats):
+    """{heading: ChartSpec} for the charts the PDF report has pages for, in report order"""
+    return {heading: spec for heading, spec in REPORT_CHARTS.items()
+            if heading not in PDF_EXCLUDED_CHARTS and chart_has_data(spec, stats)}
+
+
+class ExportCancelled(Exception):
+    """An export stopped because its cancel event was set"""
+
+
+def new_report_pdf():
+    """An empty A4 report in the house style"""
+    pdf = FPDF(orientation='P', unit='mm', format='A4')
+    pdf.set_auto_page_break(auto=True, margin=15)
+    return pdf
+
+
+def add_cover_page(pdf, title, lines=()):
+    """The cover every report starts with: title, generation time, then any extra lines"""
+    pdf.add_page()
+    pdf.set_font("Helvetica", "B", 24)
+    pdf.set_text_color(0, 0, 0)
+    pdf.cell(0, 20, title, 0, 1, "C")
+    pdf.ln(10)
+    pdf.set_font("Helvetica", "", 14)
+    pdf.cell(0, 10, f"Generated: {datetime.now().strftime('%d/%m/%Y %H:%M')}", 0, 1, "C")
+    for line in lines:
+        pdf.cell(0, 10, line, 0, 1, "C")
+    pdf.ln(20)
+
+
+def write_pdf_report(stats, filename, chart_cache=None, profile=DEFAULT_EXPORT_PROFILE, parallel=None,
+                     progress=None, cancel=None, title=FULL_REPORT_TITLE, cover_lines=()):
+    """Write the report for a CaseloadStats (cover page, then one chart per page) to a PDF file,
+    returning filename.
+
+    Charts are rendered at the export profile's dpi (see EXPORT_PROFILES),
+    in parallel processes where there are CPUs for it, and handed to fpdf2
+    as in-memory PNGs. They come from chart_cache when given, so
+    re-exporting unchanged data reuses the PNGs rendered last time.
+
+    progress(done, total, message), if given, is called after each chart is
+    rendered, each page is laid out and the file is written. Setting cancel
+    (a threading.Event) stops the export at the next of those steps with
+    ExportCancelled, before anything is written.
+    """
+    dpi = EXPORT_PROFILES[profile]
+    specs = report_specs(stats)
+    pngs = {heading: chart_cache.get(spec, stats, dpi) if chart_cache is not None else None
+            for heading, spec in specs.items()}
+    missing = [heading for heading, png in pngs.items() if png is None]
+    # Charts to render, the cover and chart pages, then writing the file
+    state = {"done": 0, "total": len(missing) + len(specs) + 2}
+
+    def step(message):
+        state["done"] += 1
+        if progress is not None:
+            progress(state["done"], state["total"], message)
+        if cancel is not None and cancel.is_set():
+            raise ExportCancelled(filename)
+
+    if cancel is not None and cancel.is_set():
+        raise ExportCancelled(filename)
+    with closing(iter_pngs(((specs[heading], stats, dpi) for heading in missing), parallel)) as rendered:
+        for heading, png in zip(missing, rendered):
+            pngs[heading] = png
+            if chart_cache is not None:
+                chart_cache.put(specs[heading], stats, dpi, png)
+            step(f"Rendered chart: {heading}")
+
+    pdf = new_report_pdf()
+    add_cover_page(pdf, title, cover_lines)
+    step("Laid out page 1: cover")
+
+    # Charts
+    for page, (chart_name, png) in enumerate(pngs.items(), 2):
+        pdf.add_page()
+        pdf.set_font("Helvetica", "B", 16)
+        pdf.cell(0, 10, chart_name, 0, 1)
+        pdf.image(io.BytesIO(png), x=pdf.w / 2 - 80, w=160)
+        step(f"Laid out page {page}: {chart_name}")
+
+    pdf.output(filename)
+    state["done"] += 1
+    if progress is not None:
+        progress(state["done"], state["total"], f"Saved {os.path.basename(filename)}")
+    return filename
+
+
+def batch_report_filename(dimension, value):
+    """e.g. kaimahi_Te_rangi.pdf, program_Mental_Health_and_Well_being.pdf"""
+    return f"{dimension}_{re.sub(r'[^A-Za-z0-9]+', '_', value).strip('_')}.pdf"
+
+
+def write_group_report(stats, filename, profile, title):
+    """One batch group's report, with its counts on the cover (run in a pool process)"""
+    return write_pdf_report(stats, filename, profile=profile, title=title,
+                            cover_lines=[f"{stats.total:,} participants - {stats.completed:,} completed"])
+
+
+def write_batch_index(entries, filename, label):
+    """A PDF listing each group's counts and report file; entries are
+    (value, CaseloadStats, report filename or None if the group is empty)"""
+    pdf = new_report_pdf()
+    add_cover_page(pdf, f"Tu Pono IP - {label} Reports", [f"{len(entries)} groups"])
+    widths = (60, 30, 30, 30, 40)
+    aligns = ("L", "R", "R", "R", "L")
+    pdf.set_font("Helvetica", "B", 11)
+    for width, heading in zip(widths, (label, "Participants", "Completed", "With Advocacy", "Report")):
+        pdf.cell(width, 8, heading, 1, 0, "C")
+    pdf.ln()
+    pdf.set_font("Helvetica", "", 10)
+    for value, stats, report in entries:
+        row = (value, f"{stats.total:,}", f"{stats.completed:,}", f"{stats.advocacy['With Advocacy']:,}",
+               os.path.basename(report) if report else "No participants")
+        for width, align, text in zip(widths, aligns, row):
+            pdf.cell(width, 8, text, 1, 0, align)
+        pdf.ln()
+    pdf.output(filename)
+    return filename
+
+
+def write_batch_reports(groups, dimension, folder, profile=DEFAULT_EXPORT_PROFILE,
+                        parallel=None, progress=None, cancel=None):
+    """One report per group of group_stats(participants, dimension) - each
+    kaimahi or program - written into folder, plus an index.pdf summarising
+    them. Returns the index's path.
+
+    groups is {value: CaseloadStats}; take it on the thread that edits the
+    caseload, since the stats are immutable and the collection is not. The
+    reports are written in the shared process pool, one per worker, with the
+    same cover page and style as the full report. Groups with nobody in them get a line
+    in the index but no report. progress and cancel are as for
+    write_pdf_report(), with a step per report written and one for the
+    index; reports already written when cancel is set are kept.
+    """
+    label = dimension.capitalize()
+    os.makedirs(folder, exist_ok=True)
+    entries = [(value, stats, os.path.join(folder, batch_report_filename(dimension, value)) if stats.total else None)
+               for value, stats in groups.items()]
+    jobs = [(stats, report, profile, f"Tu Pono IP - {label} Report: {value}")
+            for value, stats, report in entries if report]
+    total = len(jobs) + 1
+    if cancel is not None and cancel.is_set():
+        raise ExportCancelled(folder)
+    with closing(iter_in_pool(write_group_report, jobs, parallel)) as written:
+        for done, report in enumerate(written, 1):
+            if progress is not None:
+                progress(done, total, f"Wrote {os.path.basename(report)} ({done} of {len(jobs)})")
+            if cancel is not None and cancel.is_set():
+                raise ExportCancelled(folder)
+
+    index = write_batch_index(entries, os.path.join(folder, BATCH_INDEX_NAME), label)
+    if progress is not None:
+        progress(total, total, f"Wrote {BATCH_INDEX_NAME}")
+    return index
+
+
+class ReportExport:
+    """Runs a report writer - write_pdf_report() or write_batch_reports() - on a
+    background thread.
+
+    write(*args, progress=..., cancel=..., **kwargs) is called there, and
+    everything it does is put on events for the UI thread to poll:
+    ("progress", done, total, message) for each step, then one of
+    ("done", result) with what write returned, ("cancelled",) or
+    ("error", exception). cancel() stops it at its next step.
+    """
+
+    def __init__(self, write, *args, **kwargs):
+        self.events = queue.Queue()
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(write, args, kwargs),
+                                        name="ReportExport", daemon=True)
+        self._thread.start()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def running(self):
+        return self._thread.is_alive()
+
+    def _run(self, write, args, kwargs):
+        try:
+            result = write(*args, progress=lambda done, total, message: self.events.put(
+                ("progress", done, total, message)), cancel=self._cancel, **kwargs)
+        except ExportCancelled:
+            self.events.put(("cancelled",))
+        except Exception as e:
+            self.events.put(("error", e))
+        else:
+            self.events.put(("done", result))
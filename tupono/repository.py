@@ -0,0 +1,182 @@
+"""
+Participant operations as plain functions over data
+
+ParticipantRepository holds the caseload (a ParticipantCollection) and does
+the edits and aggregations the app offers - add, update, delete, set
+programs, save an assessment, search, statistics - taking values rather
+than widgets. The Tk app reads its form, calls these and shows the result;
+scripts and benchmarks call them directly. Saving is left to the caller
+(take the collection's pending changes, as the app's SaveWorker does).
+"""
+
+from datetime import datetime, timedelta
+
+from tupono.model import Participant, ParticipantCollection, parse_date
+from tupono.stats import caseload_stats
+
+# How far ahead a signup date may be entered
+MAX_FUTURE_SIGNUP_DAYS = 30
+
+
+class ValidationError(ValueError):
+    """Form values that can't be saved; errors is the list of "• ..." messages to show"""
+
+    def __init__(self, errors):
+        super().__init__("\n".join(errors))
+        self.errors = errors
+
+
+def validate_new_participant(name, age, gender, location, iwi, hapu, signup_date, kaimahi):
+    """Messages for every problem with the fields of a participant being added"""
+    validation_errors = []
+
+    if not name:
+        validation_errors.append("• Name is required")
+    elif len(name) < 2:
+        validation_errors.append("• Name must be at least 2 characters long")
+
+    if not age:
+        validation_errors.append("• Age is required")
+    else:
+        try:
+            age_int = int(age)
+            if age_int < 0 or age_int > 120:
+                validation_errors.append("• Age must be between 0 and 120")
+        except ValueError:
+            validation_errors.append("• Age must be a valid number")
+
+    if not gender:
+        validation_errors.append("• Gender selection is required")
+
+    if not location:
+        validation_errors.append("• Location is required")
+
+    if not iwi:
+        validation_errors.append("• Iwi affiliation is required")
+
+    if not hapu:
+        validation_errors.append("• Hapū affiliation is required")
+
+    if not signup_date:
+        validation_errors.append("• Signup date is required")
+    else:
+        try:
+            date_obj = datetime.strptime(signup_date, "%Y-%m-%d")
+            # Check if date is not too far in the future
+            if date_obj.date() > datetime.now().date() + timedelta(days=MAX_FUTURE_SIGNUP_DAYS):
+                validation_errors.append(
+                    f"• Signup date cannot be more than {MAX_FUTURE_SIGNUP_DAYS} days in the future")
+        except ValueError:
+            validation_errors.append("• Invalid date format. Use YYYY-MM-DD (e.g., 2024-03-15)")
+
+    if not kaimahi:
+        validation_errors.append("• Kaimahi assignment is required")
+
+    return validation_errors
+
+
+class ParticipantRepository:
+    """The caseload and every operation on it, with no GUI involved.
+
+    Edits go through the collection, so its indexes and change tracking stay
+    current and the next save writes only what changed.
+    """
+
+    def __init__(self, participants=None):
+        self.participants = participants if participants is not None else ParticipantCollection()
+        self._stats = None  # CaseloadStats from the last statistics() call
+
+    def __len__(self):
+        return len(self.participants)
+
+    def get(self, participant_id):
+        participant = self.participants.get(participant_id)
+        if participant is None:
+            raise KeyError(f"No participant with id {participant_id}")
+        return participant
+
+    # === Edits ===
+    def add(self, name, age, gender, location, iwi, hapu, signup_date, advocacy=None, kaimahi=None):
+        """Validate and add a participant, returning it; raises ValidationError"""
+        validation_errors = validate_new_participant(name, age, gender, location, iwi, hapu, signup_date, kaimahi)
+        # Check for duplicate names (case-insensitive)
+        if name and self.participants.has_name(name):
+            validation_errors.append("• A participant with this name already exists")
+        if validation_errors:
+            raise ValidationError(validation_errors)
+
+        participant = Participant(name, age, gender, location, iwi, hapu, signup_date, advocacy, kaimahi)
+        participant.update_progress(self.participants.as_of_date)
+        self.participants.add(participant)
+        return participant
+
+    def update(self, participant_id, name, age, gender, location, iwi, hapu, signup_date, advocacy=None,
+               kaimahi=None):
+        """Replace a participant's details, keeping programs and assessments; raises ValidationError"""
+        current = self.get(participant_id)
+        if not all([name, age, gender, location, iwi, hapu, signup_date, kaimahi]):
+            raise ValidationError(["All fields are required (including Kaimahi)"])
+        try:
+            parse_date(signup_date)
+        except ValueError:
+            raise ValidationError(["Invalid date format. Use YYYY-MM-DD"])
+
+        participant = Participant(name, age, gender, location, iwi, hapu, signup_date, advocacy, kaimahi,
+                                  participant_id=participant_id)
+        participant.programs = current.programs
+        participant._assessments = current._assessments  # Shared as-is; it may not be decoded yet
+        participant.update_progress(self.participants.as_of_date)
+        self.participants.replace(participant)
+        return participant
+
+    def delete(self, participant_id):
+        self.get(participant_id)
+        self.participants.remove(participant_id)
+
+    def set_programs(self, participant_id, programs):
+        """Set a participant's programs; raises ValidationError if there are none"""
+        self.get(participant_id)
+        if not programs:
+            raise ValidationError(["Please select at least one program"])
+        self.participants.set_programs(participant_id, list(programs))
+
+    def save_assessment(self, participant_id, week, score, notes, completed_at=None):
+        """Record a red phase assessment (week 1-6), returning the stored entry"""
+        participant = self.get(participant_id)
+        if week not in participant.red_phase_assessments:
+            raise ValidationError([f"Week {week} is not a red phase assessment week"])
+        assessment = {
+            "score": int(score),
+            "notes": notes,
+            "date_completed": (completed_at or datetime.now()).strftime("%Y-%m-%d %H:%M")
+        }
+        participant.red_phase_assessments[week] = assessment
+        self.participants.mark_assessment(participant_id, week)
+        return assessment
+
+    def refresh_progress(self, as_of_date=None):
+        self.participants.refresh_progress(as_of_date)
+
+    # === Queries ===
+    def search(self, term):
+        """Matching participants in signup order (everyone for an empty term)"""
+        return self.participants.search(term)
+
+    def quick_stats(self):
+        """Counts for the quick statistics cards"""
+        total_participants = len(self.participants)
+        completed_count = self.participants.count("phase", "completed")
+        return {
+            "total": total_participants,
+            "completed": completed_count,
+            "with_advocacy": total_participants - self.participants.count("advocacy", None),
+            "completion_rate": completed_count / total_participants * 100 if total_participants else 0.0,
+        }
+
+    def statistics(self):
+        """A CaseloadStats of everything the statistics window and the full report chart,
+        recomputed only when the caseload has changed since the last call"""
+        stats = self._stats
+        if stats is None or stats.version != self.participants.version:
+            stats = self._stats = caseload_stats(self.participants)
+        return stats
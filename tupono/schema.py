@@ -0,0 +1,86 @@
+"""
+Participant record schema versions and the migrations between them
+
+Every record written by Participant.to_dict() carries "schema_version". A
+current-version record has every field present and normalised, so
+Participant.from_dict can read it without fallbacks:
+
+    id, name, age, gender, location, iwi, hapu, kaimahi (None if unassigned),
+    signup_date (zero-padded YYYY-MM-DD), phase, weeks_completed, programs
+    and advocacy (lists), advocacy_phase, advocacy_weeks_completed, and
+    red_phase_assessments keyed by week as a string, "1".."6" all present
+
+Older records are brought up to date by upgrade_record(), which runs the
+registered migrations in order. Records without a version are version 1.
+Callers that load an outdated file rewrite it once afterwards, so the
+migrations only ever run on one load.
+"""
+
+import uuid
+from datetime import datetime
+
+SCHEMA_VERSION = 2
+
+# Version -> function upgrading a record of that version to the next one
+MIGRATIONS = {}
+
+
+def default_assessment_weeks():
+    """red_phase_assessments for a record with nothing recorded"""
+    return {str(week): {"score": 0, "notes": ""} for week in range(1, 7)}
+
+
+def migration(from_version):
+    """Register a function that upgrades a record from from_version to from_version + 1"""
+    def register(upgrade):
+        MIGRATIONS[from_version] = upgrade
+        return upgrade
+    return register
+
+
+def record_version(record):
+    return record.get("schema_version", 1)
+
+
+def upgrade_record(record):
+    """Run the migrations a record needs, returning it at SCHEMA_VERSION"""
+    version = record_version(record)
+    if version > SCHEMA_VERSION:
+        raise ValueError(f"record has schema version {version}, newer than this app ({SCHEMA_VERSION})")
+    while version < SCHEMA_VERSION:
+        record = MIGRATIONS[version](record)
+        version += 1
+        record["schema_version"] = version
+    return record
+
+
+@migration(1)
+def fill_defaults(record):
+    """Unversioned files: fill in fields older files left out and normalise the rest"""
+    record = dict(record)
+    if not record.get("id"):
+        record["id"] = uuid.uuid4().hex  # Files saved before IDs existed
+    record.setdefault("gender", "Not specified")
+    record["signup_date"] = datetime.strptime(record["signup_date"], "%Y-%m-%d").date().isoformat()
+    record.setdefault("phase", "red")
+    record.setdefault("weeks_completed", 0)
+    record["programs"] = record.get("programs") or []
+    if not isinstance(record.get("advocacy"), list):
+        record["advocacy"] = []
+    record.setdefault("kaimahi", None)
+    record.setdefault("advocacy_phase", "none")
+    record.setdefault("advocacy_weeks_completed", 0)
+    # Derived from signup_date nowadays
+    record.pop("weekly_progress", None)
+    record.pop("advocacy_weekly_progress", None)
+
+    assessments = {}
+    for week, assessment in (record.get("red_phase_assessments") or {}).items():
+        try:
+            assessments[str(int(week))] = assessment
+        except (ValueError, TypeError):
+            pass  # Skip invalid keys
+    for week, assessment in default_assessment_weeks().items():
+        assessments.setdefault(week, assessment)
+    record["red_phase_assessments"] = assessments
+    return record
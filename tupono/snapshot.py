@@ -0,0 +1,162 @@
+"""
+Binary column files, used for the participant snapshot cache
+
+A column file holds named NumPy arrays back to back after a small JSON
+header, so a reader can mmap the file and use the arrays in place without
+parsing anything:
+
+    MAGIC (8 bytes) | header length (uint32) | header JSON | arrays...
+
+The header gives each array's dtype, length and byte offset (8-byte aligned)
+plus free-form metadata. Strings are stored as one UTF-8 blob with an
+offsets array (see pack_strings / unpack_strings).
+"""
+
+import json
+import mmap
+import os
+import struct
+import tempfile
+
+import numpy as np
+
+MAGIC = b"TPCOLS1\0"
+ALIGNMENT = 8
+
+
+def pack_strings(strings):
+    """(offsets, data) arrays for a list of strings; string i is data[offsets[i]:offsets[i + 1]]"""
+    encoded = [value.encode("utf-8") for value in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.uint64)
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    return offsets, np.frombuffer(b"".join(encoded), dtype=np.uint8)
+
+
+def pack_blobs(blobs):
+    """(offsets, data) arrays for a list of byte strings, in the same layout as pack_strings"""
+    offsets = np.zeros(len(blobs) + 1, dtype=np.uint64)
+    np.cumsum([len(blob) for blob in blobs], out=offsets[1:])
+    return offsets, np.frombuffer(b"".join(blobs), dtype=np.uint8)
+
+
+def unpack_strings(offsets, data):
+    """The list of strings packed by pack_strings"""
+    offsets = offsets.tolist()
+    blob = data.tobytes()
+    return [blob[start:end].decode("utf-8") for start, end in zip(offsets, offsets[1:])]
+
+
+def write_column_file(path, arrays, meta=None):
+    """Write named arrays (and JSON-able meta) as a column file, atomically"""
+    arrays = {name: np.ascontiguousarray(values) for name, values in arrays.items()}
+    layout = {}
+    offset = 0
+    for name, values in arrays.items():
+        layout[name] = [values.dtype.str, len(values), offset]
+        offset += -(-values.nbytes // ALIGNMENT) * ALIGNMENT
+    header = json.dumps({"meta": meta or {}, "arrays": layout}).encode("utf-8")
+    start = -(-(len(MAGIC) + 4 + len(header)) // ALIGNMENT) * ALIGNMENT
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix=os.path.basename(path), suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(MAGIC + struct.pack("<I", len(header)) + header)
+            f.write(b"\0" * (start - f.tell()))
+            for name, values in arrays.items():
+                f.write(values.tobytes())
+                f.write(b"\0" * (-values.nbytes % ALIGNMENT))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+class ColumnFile:
+    """A column file opened with mmap; arrays are read-only views into the mapping"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if self._mmap[:len(MAGIC)] != MAGIC:
+                raise ValueError(f"{path} is not a column file")
+            (header_length,) = struct.unpack_from("<I", self._mmap, len(MAGIC))
+            header_end = len(MAGIC) + 4 + header_length
+            header = json.loads(self._mmap[len(MAGIC) + 4:header_end])
+            start = -(-header_end // ALIGNMENT) * ALIGNMENT
+            self.meta = header["meta"]
+            self.arrays = {
+                name: np.frombuffer(self._mmap, dtype=np.dtype(dtype), count=count, offset=start + offset)
+                for name, (dtype, count, offset) in header["arrays"].items()
+            }
+        except Exception:
+            self._mmap.close()
+            raise
+
+    def __getitem__(self, name):
+        return self.arrays[name]
+
+    def close(self):
+        """Release the mapping (views handed out must be dropped first)"""
+        self.arrays = {}
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass  # A view is still alive; the mapping goes when it is collected
+
+
+class SnapshotCache:
+    """A column-file snapshot of the caseload kept beside the data file.
+
+    The data file stays the source of truth. write() stores the storage's
+    stamp() with the columns, and open() only returns the cache while that
+    stamp still matches, so a stale or foreign cache is simply ignored.
+    encode(participants) turns a collection into the dict of arrays.
+    """
+
+    FORMAT = 1
+
+    def __init__(self, path, storage, encode):
+        self.path = path
+        self.storage = storage
+        self.encode = encode
+
+    def open(self):
+        """The cache as a ColumnFile if it is current, else None"""
+        if not os.path.exists(self.path):
+            return None
+        try:
+            columns = ColumnFile(self.path)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable snapshot cache: {e}")
+            return None
+        meta = columns.meta
+        if meta.get("format") != self.FORMAT or meta.get("stamp") != self.storage.stamp():
+            columns.close()
+            return None
+        return columns
+
+    def is_current(self):
+        columns = self.open()
+        if columns is None:
+            return False
+        columns.close()
+        return True
+
+    def write(self, participants):
+        """Snapshot participants, which must match what storage holds right now.
+
+        The stamp is read before encoding, so if a save lands while a slow
+        write is under way the cache comes out stale rather than wrong.
+        """
+        stamp = self.storage.stamp()
+        write_column_file(
+            self.path,
+            self.encode(participants),
+            {"format": self.FORMAT, "stamp": stamp, "count": len(participants)}
+        )
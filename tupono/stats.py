@@ -0,0 +1,126 @@
+"""
+Caseload statistics, aggregated once into an immutable CaseloadStats
+
+caseload_stats(participants) computes every count the statistics window
+and the full PDF report show, in one go: single-dimension counts are read
+off the collection's indexes, program-by-gender comes from index
+intersections, and advocacy durations from one vectorized pass over the
+signup dates. Nothing here scans the Participant objects, and the result
+can be handed to the Tk notebook, the PDF writer or another thread as-is.
+"""
+
+from collections import namedtuple
+from datetime import date
+from types import MappingProxyType
+
+import numpy as np
+
+from tupono.model import ADVOCACY_MAX_WEEKS, ADVOCACY_TYPES, KAIMAHI_LIST
+
+REPORT_PROGRAMS = ["Ko wai au", "Mental Health and Well-being", "Anger Management", "Domestic Violence"]
+REPORT_GENDERS = ["Male", "Female", "Non-binary"]
+DURATION_BINS = ("<1 Year", "1-2 Years", "2-3 Years", "3-4 Years", "4+ Years")
+NO_PROGRAM = "No Program"
+# Batch reports: the groups there is one report each for, by dimension
+BATCH_GROUPS = {"kaimahi": KAIMAHI_LIST, "program": REPORT_PROGRAMS}
+
+# Every count field is a read-only {label: count} mapping in display order.
+# program_by_gender is {gender: {program: count}} with the genders and
+# programs (plus NO_PROGRAM) that have any participants, both sorted, and
+# gender_programs lists those programs (the table's columns). version is the
+# collection's version the counts were taken at
+class CaseloadStats(namedtuple("CaseloadStats", [
+    "version", "total", "completed", "programs", "genders", "iwi", "program_by_gender", "gender_programs",
+    "advocacy", "advocacy_types", "advocacy_durations",
+])):
+    __slots__ = ()
+
+    def __reduce__(self):
+        # Read-only mappings can't be pickled; send plain dicts (e.g. to a
+        # chart rendering process) and freeze them again on the other side
+        return (thawed_stats, (tuple(thaw(value) for value in self),))
+
+
+def frozen(mapping):
+    return MappingProxyType(dict(mapping))
+
+
+def thaw(value):
+    """A read-only mapping (nested ones too) as a plain dict; anything else as-is"""
+    if isinstance(value, MappingProxyType):
+        return {key: thaw(item) for key, item in value.items()}
+    return value
+
+
+def thawed_stats(values):
+    """Rebuild a pickled CaseloadStats"""
+    return CaseloadStats(*(
+        MappingProxyType({key: frozen(item) if isinstance(item, dict) else item for key, item in value.items()})
+        if isinstance(value, dict) else value
+        for value in values
+    ))
+
+
+def group_iwi(counts):
+    """Fold iwi under 5% into "Other" once there are more than 8"""
+    if len(counts) <= 8:
+        return counts
+    threshold = sum(counts.values()) * 0.05
+    grouped = {iwi: count for iwi, count in counts.items() if count >= threshold}
+    other = sum(count for count in counts.values() if count < threshold)
+    if other > 0:
+        grouped["Other"] = other
+    return grouped
+
+
+def program_by_gender(participants, genders=REPORT_GENDERS):
+    """({gender: {program: count}}, programs) for the genders and programs with anyone in them"""
+    table = {}
+    for gender, columns in participants.cross_counts("gender", genders, "program").items():
+        row = {(NO_PROGRAM if program is None else program): count for program, count in columns.items() if count}
+        if row:
+            table[gender] = row
+    programs = sorted({program for row in table.values() for program in row})
+    return {gender: {program: table[gender].get(program, 0) for program in programs}
+            for gender in sorted(table)}, programs
+
+
+def advocacy_durations(participants):
+    """Participants with advocacy by years of advocacy so far, keyed by DURATION_BINS"""
+    positions = participants.positions(participants.ids_with_any("advocacy"))
+    as_of_date = participants.as_of_date or date.today()
+    weeks = (as_of_date.toordinal() - participants.signup_ordinals()[positions]) // 7
+    years = np.clip(weeks, 0, ADVOCACY_MAX_WEEKS) // 52
+    counts = np.bincount(np.minimum(years, len(DURATION_BINS) - 1), minlength=len(DURATION_BINS))
+    return dict(zip(DURATION_BINS, counts.tolist()))
+
+
+def caseload_stats(participants):
+    """A CaseloadStats for a ParticipantCollection as it is now"""
+    iwi = {}
+    for name, count in participants.counts("iwi").items():
+        name = name if name else "Not specified"
+        iwi[name] = iwi.get(name, 0) + count
+    table, gender_programs = program_by_gender(participants)
+    without_advocacy = participants.count("advocacy", None)
+    return CaseloadStats(
+        version=participants.version,
+        total=len(participants),
+        completed=participants.count("phase", "completed"),
+        programs=frozen(participants.counts("program", REPORT_PROGRAMS)),
+        genders=frozen(participants.counts("gender", REPORT_GENDERS)),
+        iwi=frozen(group_iwi(iwi)),
+        program_by_gender=frozen({gender: frozen(row) for gender, row in table.items()}),
+        gender_programs=tuple(gender_programs),
+        advocacy=frozen({"With Advocacy": len(participants) - without_advocacy,
+                         "Without Advocacy": without_advocacy}),
+        advocacy_types=frozen(participants.counts("advocacy", ADVOCACY_TYPES)),
+        advocacy_durations=frozen(advocacy_durations(participants)),
+    )
+
+
+def group_stats(participants, dimension, values=None):
+    """{value: CaseloadStats} for each group of a ParticipantCollection.partition(),
+    by default the kaimahi or programs in BATCH_GROUPS"""
+    groups = participants.partition(dimension, BATCH_GROUPS[dimension] if values is None else values)
+    return {value: caseload_stats(group) for value, group in groups.items()}
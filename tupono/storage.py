@@ -0,0 +1,915 @@
+"""
+Storage backends for participant records
+
+Backends work on plain participant dicts (the Participant.to_dict() layout,
+keyed by "id") so they don't depend on the Tk app. Saving takes the
+collection plus the ChangeSet of edits since the last save: backends that
+can update single records (SQLite, the JSON journal, per-participant files)
+write only those, the plain JSON file is rewritten whole.
+
+iter_load() streams records (JSON files are decoded a chunk at a time) and
+reports how far through the file it is, for progress displays. SaveWorker
+runs saves on a background thread so the UI never waits on disk.
+
+Migrate an existing participants.json (and its journal) into SQLite, or
+into a directory of per-participant files, with:
+
+    python -m tupono.storage participants.json participants.db
+    python -m tupono.storage participants.json participants.shards
+"""
+
+import argparse
+import codecs
+import json
+import os
+import queue
+import re
+import sqlite3
+import threading
+import uuid
+import zlib
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from urllib.parse import quote
+
+from tupono.schema import SCHEMA_VERSION, default_assessment_weeks, upgrade_record
+
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+# A directory with this suffix is a ShardedStorage
+SHARDED_SUFFIX = ".shards"
+
+# Fold the journal into a fresh snapshot once it grows past this many bytes
+JOURNAL_COMPACT_BYTES = 4 * 1024 * 1024
+# Bytes read per step when streaming a JSON array
+STREAM_CHUNK_BYTES = 64 * 1024
+# Sharded storage: record files are spread over this many subdirectories, and
+# read this many per thread pool task while loading
+SHARD_DIRECTORIES = 256
+SHARD_READ_BATCH = 256
+
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+# What may follow a complete number inside an array
+NUMBER_END = re.compile(r"[ \t\n\r,\]]")
+
+
+class RecordStream:
+    """Records from iter_load(); progress() is the fraction of the source read so far.
+
+    rows, when the backend has them up front, maps each participant ID to the
+    fields the participants list shows (see list_row()), so the list can be
+    drawn before the records are read.
+    """
+
+    def __init__(self, records, progress=lambda: 1.0, rows=None):
+        self._records = records
+        self.progress = progress
+        self.rows = rows
+
+    def __iter__(self):
+        return iter(self._records)
+
+
+class JsonArrayReader:
+    """Iterates the items of a top-level JSON array, decoding the file a chunk at a time.
+
+    Only the current chunk and the item being decoded are held in memory, so
+    a caseload file can be read without loading all of it.
+    """
+
+    def __init__(self, path, chunk_bytes=STREAM_CHUNK_BYTES):
+        self.path = path
+        self.chunk_bytes = chunk_bytes
+        self.total_bytes = os.path.getsize(path)
+        self.bytes_read = 0
+
+    def progress(self):
+        return self.bytes_read / self.total_bytes if self.total_bytes else 1.0
+
+    def _fill(self, f, decoder, buffer, pos):
+        chunk = f.read(self.chunk_bytes)
+        self.bytes_read += len(chunk)
+        return buffer[pos:] + decoder.decode(chunk, final=not chunk), 0, not chunk
+
+    def __iter__(self):
+        decode = json.JSONDecoder().raw_decode
+        with open(self.path, "rb") as f:
+            decoder = codecs.getincrementaldecoder("utf-8-sig")()
+            buffer, pos, eof = "", 0, False
+            expecting = "["  # Then "item or ]", then ", or ]" after each item, "item" after a comma
+            while True:
+                pos = WHITESPACE.match(buffer, pos).end()
+                if pos == len(buffer):
+                    if eof:
+                        raise ValueError(f"{self.path}: unexpected end of file inside the JSON array")
+                    buffer, pos, eof = self._fill(f, decoder, buffer, pos)
+                    continue
+
+                char = buffer[pos]
+                if expecting == "[":
+                    if char != "[":
+                        raise ValueError(f"{self.path}: expected a JSON array of participants")
+                    pos += 1
+                    expecting = "item or ]"
+                elif char == "]" and expecting != "item":
+                    return
+                elif expecting == ", or ]":
+                    if char != ",":
+                        raise ValueError(f"{self.path}: expected ',' or ']' between array items")
+                    pos += 1
+                    expecting = "item"
+                else:
+                    try:
+                        item, end = decode(buffer, pos)
+                    except json.JSONDecodeError:
+                        if eof:
+                            raise
+                        buffer, pos, eof = self._fill(f, decoder, buffer, pos)  # Item runs into the next chunk
+                        continue
+                    if isinstance(item, (int, float)) and not eof and not NUMBER_END.match(buffer, end):
+                        # The chunk ended inside a number ("-0" of "-0.5e3"): read on before taking it
+                        buffer, pos, eof = self._fill(f, decoder, buffer, pos)
+                        continue
+                    yield item
+                    pos = end
+                    expecting = ", or ]"
+
+
+class Storage:
+    """Base class: load() all records, write them back whole or by change set"""
+
+    incremental = False  # True if write_changes() only touches the changed records
+    rewrites = 0  # Times the data files have been written whole (full saves, compactions)
+
+    def __init__(self, path):
+        self.path = path
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def files(self):
+        """Paths whose contents make up the stored data"""
+        return [self.path]
+
+    def stamp(self):
+        """[name, size, mtime_ns] for each of files() present, to tell whether a cache is still current"""
+        stamp = []
+        for path in self.files():
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            stamp.append([os.path.basename(path), stat.st_size, stat.st_mtime_ns])
+        return stamp
+
+    def load(self):
+        """All participant dicts, in saved order"""
+        raise NotImplementedError
+
+    def iter_load(self):
+        """load() as a RecordStream; backends that can stream override this"""
+        return RecordStream(self.load())
+
+    def write_all(self, records):
+        """Replace everything stored with these participant dicts"""
+        raise NotImplementedError
+
+    def write_changes(self, participants, changes):
+        """Write just the edits in a ChangeSet, reading records from the collection"""
+        raise NotImplementedError
+
+    def save(self, participants, changes):
+        """Persist a ParticipantCollection given its pending ChangeSet"""
+        if changes.rewrite or not self.incremental:
+            self.write_all(p.to_dict() for p in participants)
+            self.rewrites += 1
+        else:
+            self.write_changes(participants, changes)
+
+    def recover(self):
+        """Repair what an interrupted save left behind, before anything reads
+        the files (or a cache keyed to them is trusted)"""
+
+    def wait_for_compaction(self):
+        """Block until any background rewrite of the data files has finished"""
+
+
+def write_json_atomic(path, records):
+    """Write a JSON snapshot beside path, fsync it, then swap it into place.
+
+    A crash part-way through leaves the previous file untouched.
+    """
+    temp_path = path + ".tmp"
+    with open(temp_path, "w") as f:
+        json.dump(list(records), f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+class JsonStorage(Storage):
+    """The original single participants.json file, rewritten on every save"""
+
+    def load(self):
+        with open(self.path, "r") as f:
+            return json.load(f)
+
+    def iter_load(self):
+        reader = JsonArrayReader(self.path)
+        return RecordStream(reader, reader.progress)
+
+    def write_all(self, records):
+        write_json_atomic(self.path, records)
+
+
+def read_journal(path):
+    """Journal entries in order, plus the byte length of the intact part of the file.
+
+    A crash mid-append can leave a torn last line; it and anything after it
+    are left out.
+    """
+    entries = []
+    valid_bytes = 0
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                break
+            valid_bytes += len(line)
+    return entries, valid_bytes
+
+
+def fold_journals(journals):
+    """Net effect of journal entries, for applying while streaming the snapshot.
+
+    Returns (overrides, assessments): overrides maps an ID to its latest full
+    record, or None once deleted; assessments maps IDs not overridden to
+    {week: assessment} edits for their snapshot record.
+    """
+    overrides = {}
+    assessments = defaultdict(dict)
+    for journal in journals:
+        if not os.path.exists(journal):
+            continue
+        entries, _ = read_journal(journal)
+        for entry in entries:
+            op = entry["op"]
+            if op in ("add", "update"):
+                overrides[entry["record"]["id"]] = entry["record"]
+                assessments.pop(entry["record"]["id"], None)
+            elif op == "delete":
+                overrides[entry["id"]] = None
+                assessments.pop(entry["id"], None)
+            elif op == "assessment":
+                week = str(entry["week"])
+                record = overrides.get(entry["id"])
+                if record is not None:
+                    record.setdefault("red_phase_assessments", {})[week] = entry["assessment"]
+                elif entry["id"] not in overrides:
+                    assessments[entry["id"]][week] = entry["assessment"]
+    return overrides, assessments
+
+
+class JournalStorage(JsonStorage):
+    """participants.json as a snapshot plus an append-only journal of edits.
+
+    Each save appends one JSON line per change (add, update, delete or a single
+    assessment) to <path>.journal and fsyncs it, so the I/O per edit doesn't
+    grow with the caseload. Once the journal passes compact_bytes a background
+    thread folds it into a fresh snapshot: the journal is renamed to
+    <path>.journal.compacting so new edits start a fresh journal, and the new
+    snapshot replaces the old one atomically before the old journal is
+    removed. Loading streams the snapshot with the journal applied; a
+    .compacting journal left by an interrupted compaction is first put back
+    in front of the journal.
+    """
+
+    incremental = True
+
+    def __init__(self, path, compact_bytes=JOURNAL_COMPACT_BYTES):
+        super().__init__(path)
+        self.journal_path = path + ".journal"
+        self.compacting_path = path + ".journal.compacting"
+        self.compact_bytes = compact_bytes
+        self._lock = threading.Lock()  # Serialises journal appends against rotation
+        self._compactor = None
+        self._needs_snapshot = False  # Snapshot has records without IDs the journal can't refer to
+
+    def exists(self):
+        return any(os.path.exists(path) for path in self.files())
+
+    def files(self):
+        return [self.path, self.journal_path, self.compacting_path]
+
+    def load(self):
+        return list(self.iter_load())
+
+    def iter_load(self):
+        self.wait_for_compaction()
+        self.recover()
+        return self._replay((self.journal_path,))
+
+    def recover(self):
+        """Put an interrupted compaction's journal back in front of the journal and
+        drop any torn last line, so appends and the next compaction start clean"""
+        interrupted = os.path.exists(self.compacting_path)
+        parts = []
+        torn = False
+        for journal in (self.compacting_path, self.journal_path):
+            if os.path.exists(journal):
+                _, valid_bytes = read_journal(journal)
+                torn = torn or valid_bytes < os.path.getsize(journal)
+                with open(journal, "rb") as f:
+                    parts.append(f.read(valid_bytes))
+        if not (interrupted or torn):
+            return
+        temp_path = self.journal_path + ".tmp"
+        with open(temp_path, "wb") as f:
+            f.write(b"".join(parts))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.journal_path)
+        if interrupted:
+            os.remove(self.compacting_path)
+
+    def _replay(self, journals):
+        """Stream the snapshot with the journals applied, as a RecordStream"""
+        overrides, assessments = fold_journals(journals)
+        reader = JsonArrayReader(self.path) if os.path.exists(self.path) else None
+
+        def records():
+            for record in reader or ():
+                participant_id = record.get("id")
+                if not participant_id:
+                    # Saved before participants had IDs - journal entries can't refer to it yet
+                    self._needs_snapshot = True
+                elif participant_id in overrides:
+                    record = overrides.pop(participant_id)
+                    if record is None:
+                        continue
+                else:
+                    for week, assessment in assessments.get(participant_id, {}).items():
+                        record.setdefault("red_phase_assessments", {})[week] = assessment
+                yield record
+            for record in overrides.values():
+                if record is not None:
+                    yield record
+
+        return RecordStream(records(), reader.progress if reader else lambda: 1.0)
+
+    def save(self, participants, changes):
+        if self._needs_snapshot:
+            changes = changes._replace(rewrite=True)
+        super().save(participants, changes)
+
+    def write_all(self, records):
+        self.wait_for_compaction()
+        with self._lock:
+            write_json_atomic(self.path, records)
+            for journal in (self.journal_path, self.compacting_path):
+                if os.path.exists(journal):
+                    os.remove(journal)
+        self._needs_snapshot = False
+
+    def write_changes(self, participants, changes):
+        entries = [{"op": "delete", "id": participant_id} for participant_id in changes.deleted]
+        for participant_id in changes.changed:
+            participant = participants.get(participant_id)
+            if participant is not None:
+                op = "add" if participant_id in changes.added else "update"
+                entries.append({"op": op, "record": participant.to_dict()})
+        for participant_id, week in changes.assessments:
+            participant = participants.get(participant_id)
+            if participant is not None and participant_id not in changes.changed:
+                entries.append({
+                    "op": "assessment",
+                    "id": participant_id,
+                    "week": week,
+                    "assessment": participant.red_phase_assessments[week]
+                })
+        if not entries:
+            return
+
+        data = "".join(json.dumps(entry, separators=(",", ":")) + "\n" for entry in entries)
+        with self._lock:
+            with open(self.journal_path, "a") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+                journal_bytes = f.tell()
+        if journal_bytes >= self.compact_bytes:
+            self.compact_in_background()
+
+    def compact_in_background(self):
+        """Start folding the journal into the snapshot unless a compaction is running"""
+        with self._lock:
+            if self._compactor is not None and self._compactor.is_alive():
+                return
+            if os.path.exists(self.compacting_path):
+                # Left by a compaction that never finished: fold it back in front of the journal
+                self.recover()
+            if not os.path.exists(self.journal_path):
+                return
+            os.replace(self.journal_path, self.compacting_path)
+            self._compactor = threading.Thread(target=self._compact, daemon=True)
+            self._compactor.start()
+
+    def _compact(self):
+        try:
+            write_json_atomic(self.path, self._replay((self.compacting_path,)))
+            os.remove(self.compacting_path)
+            self.rewrites += 1
+        except Exception as e:
+            # The .compacting journal is kept; the next compaction or load folds it back in
+            print(f"Journal compaction failed: {e}")
+
+    def wait_for_compaction(self):
+        if self._compactor is not None:
+            self._compactor.join()
+
+
+# One row per participant; list fields live in child tables keyed by participant ID
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS participants (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    age TEXT,
+    gender TEXT,
+    location TEXT,
+    iwi TEXT,
+    hapu TEXT,
+    signup_date TEXT NOT NULL,
+    phase TEXT,
+    weeks_completed INTEGER,
+    advocacy_phase TEXT,
+    advocacy_weeks_completed INTEGER,
+    kaimahi TEXT
+);
+CREATE TABLE IF NOT EXISTS programs (
+    participant_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    program TEXT NOT NULL,
+    PRIMARY KEY (participant_id, position)
+);
+CREATE TABLE IF NOT EXISTS advocacy (
+    participant_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    advocacy_type TEXT NOT NULL,
+    PRIMARY KEY (participant_id, position)
+);
+CREATE TABLE IF NOT EXISTS assessments (
+    participant_id TEXT NOT NULL,
+    week INTEGER NOT NULL,
+    score INTEGER,
+    notes TEXT,
+    date_completed TEXT,
+    PRIMARY KEY (participant_id, week)
+);
+"""
+
+PARTICIPANT_COLUMNS = (
+    "id", "name", "age", "gender", "location", "iwi", "hapu", "signup_date", "phase",
+    "weeks_completed", "advocacy_phase", "advocacy_weeks_completed", "kaimahi"
+)
+CHILD_TABLES = ("programs", "advocacy", "assessments")
+
+UPSERT_PARTICIPANT = (
+    f"INSERT INTO participants ({', '.join(PARTICIPANT_COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in PARTICIPANT_COLUMNS)}) "
+    f"ON CONFLICT(id) DO UPDATE SET "
+    + ", ".join(f"{column} = excluded.{column}" for column in PARTICIPANT_COLUMNS[1:])
+)
+
+
+class SqliteStorage(Storage):
+    """SQLite database in WAL mode; saves commit only the changed participants"""
+
+    incremental = True
+
+    def files(self):
+        return [self.path, self.path + "-wal"]
+
+    def connect(self):
+        conn = sqlite3.connect(self.path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SQLITE_SCHEMA)
+        return conn
+
+    def load(self):
+        conn = self.connect()
+        try:
+            # The schema version of the records, kept as the database's user_version
+            version = conn.execute("PRAGMA user_version").fetchone()[0] or 1
+            programs = defaultdict(list)
+            for participant_id, program in conn.execute(
+                "SELECT participant_id, program FROM programs ORDER BY participant_id, position"
+            ):
+                programs[participant_id].append(program)
+
+            advocacy = defaultdict(list)
+            for participant_id, advocacy_type in conn.execute(
+                "SELECT participant_id, advocacy_type FROM advocacy ORDER BY participant_id, position"
+            ):
+                advocacy[participant_id].append(advocacy_type)
+
+            assessments = defaultdict(default_assessment_weeks)
+            for participant_id, week, score, notes, date_completed in conn.execute(
+                "SELECT participant_id, week, score, notes, date_completed FROM assessments"
+            ):
+                assessment = {"score": score, "notes": notes or ""}
+                if date_completed is not None:
+                    assessment["date_completed"] = date_completed
+                assessments[participant_id][str(week)] = assessment
+
+            records = []
+            for row in conn.execute(f"SELECT {', '.join(PARTICIPANT_COLUMNS)} FROM participants ORDER BY rowid"):
+                record = dict(zip(PARTICIPANT_COLUMNS, row))
+                record["schema_version"] = version
+                participant_id = record["id"]
+                record["programs"] = programs.get(participant_id, [])
+                record["advocacy"] = advocacy.get(participant_id, [])
+                record["red_phase_assessments"] = assessments.get(participant_id) or default_assessment_weeks()
+                records.append(record)
+            return records
+        finally:
+            conn.close()
+
+    def write_all(self, records):
+        conn = self.connect()
+        try:
+            with conn:
+                for table in ("participants",) + CHILD_TABLES:
+                    conn.execute(f"DELETE FROM {table}")
+                self._upsert(conn, list(records))
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        finally:
+            conn.close()
+
+    def write_changes(self, participants, changes):
+        records = [participants.get(pid).to_dict() for pid in changes.changed if pid in participants]
+        assessments = []
+        for participant_id, week in changes.assessments:
+            if participant_id in participants and participant_id not in changes.changed:
+                assessment = participants.get(participant_id).red_phase_assessments[week]
+                assessments.append((participant_id, week, assessment.get("score", 0), assessment.get("notes", ""),
+                                    assessment.get("date_completed")))
+        conn = self.connect()
+        try:
+            with conn:
+                self._delete(conn, changes.deleted)
+                self._upsert(conn, records)
+                conn.executemany(
+                    "INSERT OR REPLACE INTO assessments (participant_id, week, score, notes, date_completed) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    assessments
+                )
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _delete(conn, participant_ids):
+        keys = [(participant_id,) for participant_id in participant_ids]
+        if keys:
+            conn.executemany("DELETE FROM participants WHERE id = ?", keys)
+            for table in CHILD_TABLES:
+                conn.executemany(f"DELETE FROM {table} WHERE participant_id = ?", keys)
+
+    @staticmethod
+    def _upsert(conn, records):
+        if not records:
+            return
+        conn.executemany(
+            UPSERT_PARTICIPANT,
+            ([record.get(column) for column in PARTICIPANT_COLUMNS] for record in records)
+        )
+        keys = [(record["id"],) for record in records]
+        for table in CHILD_TABLES:
+            conn.executemany(f"DELETE FROM {table} WHERE participant_id = ?", keys)
+
+        conn.executemany(
+            "INSERT INTO programs (participant_id, position, program) VALUES (?, ?, ?)",
+            ((record["id"], position, program)
+             for record in records
+             for position, program in enumerate(record.get("programs") or []))
+        )
+        conn.executemany(
+            "INSERT INTO advocacy (participant_id, position, advocacy_type) VALUES (?, ?, ?)",
+            ((record["id"], position, advocacy_type)
+             for record in records
+             for position, advocacy_type in enumerate(record.get("advocacy") or []))
+        )
+        conn.executemany(
+            "INSERT INTO assessments (participant_id, week, score, notes, date_completed) VALUES (?, ?, ?, ?, ?)",
+            ((record["id"], int(week), assessment.get("score", 0), assessment.get("notes", ""),
+              assessment.get("date_completed"))
+             for record in records
+             for week, assessment in (record.get("red_phase_assessments") or {}).items()
+             # Untouched weeks are filled back in with defaults on load
+             if assessment.get("score", 0) or assessment.get("notes") or assessment.get("date_completed"))
+        )
+
+
+def list_row(record):
+    """What the participants list shows of a record: [name, age, gender, signup_date, programs]"""
+    return [record.get("name"), record.get("age"), record.get("gender"), record.get("signup_date"),
+            record.get("programs") or []]
+
+
+def write_record_atomic(path, record):
+    """Write one record's JSON file via a temp file, fsync it, then rename it into place"""
+    temp_path = path + ".tmp"
+    with open(temp_path, "w") as f:
+        json.dump(record, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+class ShardedStorage(Storage):
+    """A directory holding each participant in its own small JSON file, plus a manifest.
+
+    Record files live in records/<xx>/, where xx comes from a hash of the
+    participant ID so no directory grows huge. manifest.jsonl is append-only,
+    like the JSON journal: one line per saved participant carrying its
+    list_row(), or a deletion. A save rewrites only the record files of the
+    participants that changed and appends their manifest lines; the manifest
+    itself is rewritten once superseded lines outnumber live ones.
+
+    Loading reads the manifest first (its rows come back on the RecordStream
+    so the list can show straight away), then the record files on a thread
+    pool, a batch per task, yielded in manifest order.
+    """
+
+    incremental = True
+
+    def __init__(self, path, workers=None):
+        super().__init__(path)
+        self.manifest_path = os.path.join(path, "manifest.jsonl")
+        self.workers = workers
+        self._manifest_lines = 0  # Lines in the manifest, live or superseded
+
+    def exists(self):
+        return os.path.exists(self.manifest_path)
+
+    def files(self):
+        return [self.manifest_path]
+
+    def record_path(self, participant_id):
+        directory = f"{zlib.crc32(participant_id.encode('utf-8')) % SHARD_DIRECTORIES:02x}"
+        return os.path.join(self.path, "records", directory, quote(participant_id, safe="") + ".json")
+
+    def read_manifest(self):
+        """Participant ID -> list row, in the order participants were first saved"""
+        entries, valid_bytes = read_journal(self.manifest_path)
+        if valid_bytes < os.path.getsize(self.manifest_path):
+            # Drop a torn last line so the next append starts on a fresh line
+            os.truncate(self.manifest_path, valid_bytes)
+        rows = {}
+        for entry in entries:
+            if entry.get("deleted"):
+                rows.pop(entry["id"], None)
+            else:
+                rows[entry["id"]] = entry["row"]
+        self._manifest_lines = len(entries)
+        return rows
+
+    def load(self):
+        return list(self.iter_load())
+
+    def iter_load(self):
+        rows = self.read_manifest()
+        ids = iter(list(rows))
+        batches = iter(lambda: list(islice(ids, SHARD_READ_BATCH)), [])
+        total = -(-len(rows) // SHARD_READ_BATCH)
+        done = [0]
+
+        def read_batch(batch):
+            records = []
+            for participant_id in batch:
+                try:
+                    with open(self.record_path(participant_id), "r") as f:
+                        records.append(json.load(f))
+                except (OSError, ValueError) as e:
+                    print(f"Skipping participant {participant_id}: record file unreadable ({e})")
+            return records
+
+        def records():
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                for batch in executor.map(read_batch, batches):
+                    done[0] += 1
+                    yield from batch
+
+        return RecordStream(records(), lambda: done[0] / total if total else 1.0, rows)
+
+    def write_all(self, records):
+        records = list(records)
+        paths = [self.record_path(record["id"]) for record in records]
+        for directory in {os.path.dirname(path) for path in paths}:
+            os.makedirs(directory, exist_ok=True)
+        # Record files first, the manifest (which makes them live) last, so a
+        # crash part-way leaves the old manifest in charge
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            list(executor.map(write_record_atomic, paths, records))
+        manifest = "".join(
+            json.dumps({"id": record["id"], "row": list_row(record)}, separators=(",", ":")) + "\n"
+            for record in records
+        )
+        temp_path = self.manifest_path + ".tmp"
+        with open(temp_path, "w") as f:
+            f.write(manifest)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.manifest_path)
+        self._manifest_lines = len(records)
+
+        keep = set(paths)
+        for directory, _, names in os.walk(os.path.join(self.path, "records")):
+            for name in names:
+                path = os.path.join(directory, name)
+                if path not in keep:
+                    os.remove(path)
+
+    def write_changes(self, participants, changes):
+        touched = set(changes.changed)
+        touched.update(participant_id for participant_id, _ in changes.assessments)
+        lines = [{"id": participant_id, "deleted": True} for participant_id in changes.deleted]
+        for participant_id in touched:
+            participant = participants.get(participant_id)
+            if participant is None:
+                continue
+            record = participant.to_dict()
+            path = self.record_path(participant_id)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            write_record_atomic(path, record)
+            lines.append({"id": participant_id, "row": list_row(record)})
+        if not lines:
+            return
+
+        os.makedirs(self.path, exist_ok=True)
+        with open(self.manifest_path, "a") as f:
+            f.write("".join(json.dumps(line, separators=(",", ":")) + "\n" for line in lines))
+            f.flush()
+            os.fsync(f.fileno())
+        self._manifest_lines += len(lines)
+        for participant_id in changes.deleted:
+            path = self.record_path(participant_id)
+            if os.path.exists(path):
+                os.remove(path)
+
+        if self._manifest_lines > 2 * len(participants) + SHARD_READ_BATCH:
+            self._rewrite_manifest(participants)
+
+    def _rewrite_manifest(self, participants):
+        """Replace the manifest with one line per live participant"""
+        temp_path = self.manifest_path + ".tmp"
+        with open(temp_path, "w") as f:
+            for participant in participants:
+                record = participant.to_dict()
+                f.write(json.dumps({"id": record["id"], "row": list_row(record)}, separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.manifest_path)
+        self._manifest_lines = len(participants)
+
+
+def merge_changes(earlier, later):
+    """One ChangeSet covering two consecutive ones"""
+    return later._replace(
+        rewrite=earlier.rewrite or later.rewrite,
+        changed=earlier.changed | later.changed,
+        added=earlier.added | later.added,
+        deleted=earlier.deleted | later.deleted,
+        assessments=earlier.assessments | later.assessments
+    )
+
+
+class SaveWorker:
+    """Runs storage saves on a background thread.
+
+    request() is called on the UI thread with a snapshot of the participants
+    and the ChangeSet taken from the collection; requests that arrive while a
+    write is running are merged, so a burst of edits becomes one write. Each
+    finished write puts (ok, error) on results for the UI to poll. A failed
+    write's changes are carried into the next request.
+
+    after_save(participants), if given, runs on the worker after a
+    successful save once the data files have been written whole since it
+    last ran (a full save, or a journal compaction that has finished), e.g.
+    to refresh a cache keyed to those files; incremental saves don't run
+    it. Its failures are only logged.
+    """
+
+    def __init__(self, storage, after_save=None):
+        self.storage = storage
+        self.after_save = after_save
+        self._rewrites_seen = storage.rewrites
+        self.results = queue.Queue()
+        self._condition = threading.Condition()
+        self._pending = None  # (participants, changes) waiting to be written
+        self._carried = None  # Changes from a failed write
+        self._busy = False
+        self._last_error = None
+        self._thread = threading.Thread(target=self._run, name="SaveWorker", daemon=True)
+        self._thread.start()
+
+    def request(self, participants, changes):
+        with self._condition:
+            if self._carried is not None:
+                changes = merge_changes(self._carried, changes)
+                self._carried = None
+            if self._pending is not None:
+                changes = merge_changes(self._pending[1], changes)
+            self._pending = (participants, changes)
+            self._condition.notify_all()
+
+    def flush(self, timeout=None):
+        """Block until every requested save has been written; returns the last error or None"""
+        with self._condition:
+            self._condition.wait_for(lambda: self._pending is None and not self._busy, timeout)
+            return self._last_error
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending is not None)
+                participants, changes = self._pending
+                self._pending = None
+                self._busy = True
+            error = None
+            try:
+                self.storage.save(participants, changes)
+            except Exception as e:
+                error = e
+            rewrites = self.storage.rewrites
+            if error is None and self.after_save is not None and rewrites != self._rewrites_seen:
+                self._rewrites_seen = rewrites
+                try:
+                    self.after_save(participants)
+                except Exception as e:
+                    print(f"After-save step failed: {e}")
+            with self._condition:
+                if error is not None:
+                    if self._pending is not None:
+                        self._pending = (self._pending[0], merge_changes(changes, self._pending[1]))
+                    else:
+                        self._carried = changes
+                self._last_error = error
+                self._busy = False
+                self._condition.notify_all()
+            self.results.put((error is None, error))
+
+
+def default_data_path(directory):
+    """Where the caseload lives in a directory: participants.db once migrated to
+    SQLite, else participants.shards if sharded, else participants.json"""
+    for name in ("participants.db", "participants.shards"):
+        path = os.path.join(directory, name)
+        if os.path.exists(path):
+            return path
+    return os.path.join(directory, "participants.json")
+
+
+def open_storage(path, journal=False):
+    """Pick the backend from the file extension; journal=True journals edits to a JSON file"""
+    if path.lower().endswith(SQLITE_SUFFIXES):
+        return SqliteStorage(path)
+    if path.lower().endswith(SHARDED_SUFFIX):
+        return ShardedStorage(path)
+    if journal:
+        return JournalStorage(path)
+    return JsonStorage(path)
+
+
+def migrate_json(json_path, target_path):
+    """Copy every participant from a participants.json file into an SQLite
+    database or a sharded directory (picked by open_storage from the name).
+
+    Records are upgraded to the current schema version on the way (which
+    gives records saved before participants had IDs one). Returns the number
+    of participants migrated.
+    """
+    records = [upgrade_record(record) for record in JournalStorage(json_path).load()]
+    seen = set()
+    for record in records:
+        if record["id"] in seen:
+            record["id"] = uuid.uuid4().hex
+        seen.add(record["id"])
+    open_storage(target_path).write_all(records)
+    return len(records)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate participants.json into SQLite or sharded storage")
+    parser.add_argument("json_path", help="existing participants.json")
+    parser.add_argument("target_path", help="to create or replace: participants.db (SQLite) or "
+                                            "participants.shards (one file per participant)")
+    args = parser.parse_args()
+    count = migrate_json(args.json_path, args.target_path)
+    print(f"✓ Migrated {count} participants to {args.target_path}")
+
+
+if __name__ == "__main__":
+    main()
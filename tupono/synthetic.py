@@ -0,0 +1,124 @@
+"""
+Reproducible synthetic caseloads for benchmarks and testing
+
+generate_participants(count, seed) builds realistic participants: Māori and
+English names, iwi with their hapū, kaimahi from KAIMAHI_LIST, a mix of
+advocacy types, signup dates spread over six years and red phase
+assessments filled in for some of the weeks already passed. The same seed
+and as-of date always give the same caseload. Write one with:
+
+    python -m tupono.synthetic 10000 participants.json
+    python -m tupono.synthetic 100000 participants.db --seed 7
+"""
+
+import argparse
+import random
+from datetime import date, datetime, timedelta
+
+from tupono.model import ADVOCACY_TYPES, KAIMAHI_LIST, Participant, ParticipantCollection, weeks_since
+from tupono.stats import REPORT_GENDERS, REPORT_PROGRAMS
+from tupono.storage import open_storage
+
+FIRST_NAMES = [
+    "Aroha", "Hemi", "Mere", "Tama", "Anahera", "Wiremu", "Kahu", "Ngaio", "Rangi", "Tui",
+    "Manaia", "Nikau", "Ataahua", "Rawiri", "Hine", "Tane", "Kiri", "Mikaere", "Huia", "Ihaia",
+    "Sarah", "James", "Emma", "Michael", "Jessica", "Daniel", "Grace", "Liam", "Olivia", "Jack",
+]
+SURNAMES = [
+    "Ngata", "Walker", "Tamihana", "Smith", "Parata", "Wilson", "Tawhiri", "Brown", "Kereama", "Taylor",
+    "Henare", "Thompson", "Rewi", "Williams", "Tipene", "Harris", "Paki", "Martin", "Waaka", "King",
+]
+# Iwi and a few of their hapū
+IWI_HAPU = {
+    "Ngāpuhi": ["Ngāti Hine", "Te Parawhau", "Ngāti Rēhia"],
+    "Ngāti Porou": ["Te Whānau a Ruataupare", "Ngāti Uepōhatu", "Te Aitanga a Hauiti"],
+    "Ngāti Kahungunu": ["Ngāti Pāhauwera", "Ngāti Hineuru", "Ngāi Te Upokoiri"],
+    "Waikato": ["Ngāti Mahuta", "Ngāti Wairere", "Ngāti Hauā"],
+    "Ngāi Tahu": ["Ngāti Waewae", "Kāti Huirapa", "Ngāti Irakehu"],
+    "Te Arawa": ["Ngāti Whakaue", "Tūhourangi", "Ngāti Pikiao"],
+    "Tūhoe": ["Ngāti Whare", "Ngāti Koura", "Te Urewera"],
+    "Ngāi Te Rangi": ["Ngāi Tūkairangi", "Ngāti Tapu", "Ngāi Tauaiti"],
+    "Ngāti Ranginui": ["Ngāti Kahu", "Ngāti Hangarau", "Pirirākau"],
+    "Ngāti Awa": ["Ngāti Pūkeko", "Te Patuwai", "Ngāti Hikakino"],
+}
+LOCATIONS = ["Tauranga", "Rotorua", "Auckland", "Hamilton", "Christchurch", "Whakatāne", "Gisborne",
+             "Te Puke", "Ōpōtiki", "Napier"]
+GENDER_WEIGHTS = [46, 50, 4]  # For REPORT_GENDERS
+ADVOCACY_COUNT_WEIGHTS = [55, 30, 12, 3]  # Participants with 0, 1, 2 or 3 advocacy types
+ASSESSMENT_NOTES = [
+    "Engaged well, shared whakapapa and goals",
+    "Quiet session, building trust",
+    "Discussed whānau support and next steps",
+    "Missed first appointment, caught up by phone",
+    "Strong progress, keen to start programme",
+]
+SIGNUP_YEARS = 6
+
+
+def generate_participants(count, seed=0, as_of_date=None):
+    """count synthetic Participants (progress computed as of as_of_date, default today)"""
+    rng = random.Random(seed)
+    as_of_date = as_of_date or date.today()
+    iwi_names = list(IWI_HAPU)
+    participants = []
+    for index in range(count):
+        iwi = rng.choice(iwi_names)
+        signup_date = as_of_date - timedelta(days=rng.randint(0, SIGNUP_YEARS * 365))
+        advocacy = rng.sample(ADVOCACY_TYPES, rng.choices(range(4), ADVOCACY_COUNT_WEIGHTS)[0])
+        participant = Participant(
+            f"{rng.choice(FIRST_NAMES)} {rng.choice(SURNAMES)} {index + 1}",
+            str(rng.randint(16, 75)),
+            rng.choices(REPORT_GENDERS, GENDER_WEIGHTS)[0],
+            rng.choice(LOCATIONS),
+            iwi,
+            rng.choice(IWI_HAPU[iwi]),
+            signup_date.isoformat(),
+            advocacy,
+            rng.choice(KAIMAHI_LIST),
+            participant_id=f"{rng.getrandbits(128):032x}",  # From the seed, so files compare equal
+        )
+        participant.programs = rng.sample(REPORT_PROGRAMS, rng.choice([0, 1, 1, 1, 2]))
+        participant.update_progress(as_of_date)
+
+        # Most participants have an assessment for some of the red phase weeks they have reached
+        weeks_reached = min(max(weeks_since(signup_date, as_of_date), 0), 6)
+        for week in range(1, weeks_reached + 1):
+            if rng.random() < 0.7:
+                completed = datetime.combine(signup_date + timedelta(weeks=week - 1), datetime.min.time())
+                participant.red_phase_assessments[week] = {
+                    "score": rng.randint(3, 10),
+                    "notes": rng.choice(ASSESSMENT_NOTES),
+                    "date_completed": completed.replace(hour=rng.randint(9, 16)).strftime("%Y-%m-%d %H:%M"),
+                }
+        participants.append(participant)
+    return participants
+
+
+def generate_collection(count, seed=0, as_of_date=None):
+    """A ParticipantCollection of generate_participants(), progress refreshed"""
+    collection = ParticipantCollection(generate_participants(count, seed, as_of_date))
+    collection.refresh_progress(as_of_date)
+    return collection
+
+
+def write_caseload(path, count, seed=0, as_of_date=None):
+    """Write a synthetic caseload to path (.json, .db or .shards, as the app would)"""
+    participants = generate_participants(count, seed, as_of_date)
+    open_storage(path).write_all(p.to_dict() for p in participants)
+    return len(participants)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic TuPono caseload")
+    parser.add_argument("count", type=int, help="number of participants")
+    parser.add_argument("path", help="participants.json, .db or .shards to create or replace")
+    parser.add_argument("--seed", type=int, default=0, help="random seed (default 0)")
+    parser.add_argument("--as-of", help="date the caseload is generated for, YYYY-MM-DD (default today)")
+    args = parser.parse_args()
+    as_of_date = date.fromisoformat(args.as_of) if args.as_of else None
+    count = write_caseload(args.path, args.count, args.seed, as_of_date)
+    print(f"✓ Wrote {count:,} synthetic participants to {args.path}")
+
+
+if __name__ == "__main__":
+    main()